@@ -0,0 +1,324 @@
+"""Offline bulk extraction over a directory tree.
+
+Walks a directory, shards the supported files across a process pool (each
+worker loads the spaCy model once) and appends one JSON line per file to
+the output. Hashes of extracted files are checkpointed as results are
+written, so an interrupted run can be restarted with the same arguments
+and only the remaining files are processed. Files that failed are not
+checkpointed and are retried on the next run.
+
+    python -m app.batch data/archive --output data/output/archive.jsonl
+    python -m app.batch data/archive --workers 8 --fields dates,key_terms
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set
+from loguru import logger
+from .extraction.metadata_extractor import METADATA_FIELDS, get_metadata_extractor
+from .utils.file_handlers import FileHandler
+from .utils.metrics import StageTimings
+
+# Per-worker state, set by _init_worker
+_done_hashes: Set[str] = set()
+_fields: FrozenSet[str] = METADATA_FIELDS
+
+
+def iter_files(root: Path) -> Iterator[Path]:
+    # Sorted walk so shards are the same from one run to the next
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if FileHandler.validate_file_type(filename):
+                yield Path(dirpath) / filename
+
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: Path) -> Set[str]:
+    if not path.exists():
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def _truncate_partial_line(path: Path):
+    # A crash mid-write can leave a partial last line; drop it so the next
+    # append starts on a fresh line
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            block = min(64 * 1024, pos)
+            f.seek(pos - block)
+            data = f.read(block)
+            newline = data.rfind(b"\n")
+            if newline != -1:
+                pos = pos - block + newline + 1
+                break
+            pos -= block
+        if pos != end:
+            f.truncate(pos)
+
+
+def _init_worker(done_hashes: Set[str], fields: FrozenSet[str], log_level: str):
+    global _done_hashes, _fields
+    _done_hashes = done_hashes
+    _fields = fields
+    logger.remove()
+    logger.add(sys.stderr, level=log_level)
+    # Load the model up front so it is paid once per worker
+    get_metadata_extractor().nlp
+
+
+def _process_batch(paths: List[str]) -> Dict:
+    # Runs in a worker: hash each file, skip known ones, extract the rest
+    # in one batched call
+    timings = StageTimings()
+    entries = []
+    files = []
+    for path in paths:
+        try:
+            with timings.time("hash"):
+                file_hash = hash_file(Path(path))
+        except OSError as e:
+            entries.append({"path": path, "status": "failed", "error": str(e)})
+            continue
+        if file_hash in _done_hashes:
+            entries.append({"path": path, "file_hash": file_hash, "status": "skipped"})
+            continue
+        entries.append({"path": path, "file_hash": file_hash, "status": "pending"})
+        files.append((Path(path).name, Path(path)))
+
+    results = iter(
+        get_metadata_extractor().extract_metadata_batch(
+            files, fields=_fields, timings=timings
+        )
+    )
+    for entry in entries:
+        if entry["status"] != "pending":
+            continue
+        metadata = next(results)
+        if isinstance(metadata, Exception):
+            entry.update(status="failed", error=str(metadata))
+        else:
+            entry.update(status="done", metadata=metadata)
+    return {"entries": entries, "timings": timings}
+
+
+class BatchRunner:
+    """Feeds file shards to a process pool and writes results as they land.
+
+    At most ``workers * 2`` shards are in flight, so memory stays flat no
+    matter how large the tree is.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        output: Path,
+        checkpoint: Optional[Path] = None,
+        workers: int = os.cpu_count() or 1,
+        shard_size: int = 16,
+        fields: FrozenSet[str] = METADATA_FIELDS,
+        log_level: str = "WARNING",
+        report_every: float = 10.0,
+    ):
+        self.root = root
+        self.output = output
+        self.checkpoint = checkpoint or output.with_name(output.name + ".checkpoint")
+        self.workers = workers
+        self.shard_size = shard_size
+        self.fields = fields
+        self.log_level = log_level
+        self.report_every = report_every
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self.timings: Dict[str, float] = {}
+        self.done_hashes: Set[str] = set()
+        self._started = 0.0
+        self._last_report = 0.0
+
+    def _shards(self) -> Iterator[List[str]]:
+        shard = []
+        for path in iter_files(self.root):
+            shard.append(str(path))
+            if len(shard) >= self.shard_size:
+                yield shard
+                shard = []
+        if shard:
+            yield shard
+
+    def _record(self, entry: Dict) -> Dict:
+        path = Path(entry["path"])
+        record = {
+            "path": str(path.relative_to(self.root)),
+            "file_name": path.name,
+            "file_hash": entry.get("file_hash"),
+            "saved_at": time.time(),
+        }
+        if entry["status"] == "failed":
+            record["error"] = entry["error"]
+        else:
+            record["fields"] = sorted(self.fields)
+            record.update(entry["metadata"])
+        return record
+
+    def _write(self, result: Dict, out, checkpoint):
+        start = time.perf_counter()
+        lines = []
+        hashes = []
+        for entry in result["entries"]:
+            file_hash = entry.get("file_hash")
+            if entry["status"] == "skipped" or (
+                file_hash is not None and file_hash in self.done_hashes
+            ):
+                # Known from an earlier run, or a duplicate seen in this one
+                self.counts["skipped"] += 1
+                continue
+            self.counts[entry["status"]] += 1
+            lines.append(json.dumps(self._record(entry)) + "\n")
+            # A failure may be transient (a killed worker, a busy disk), so
+            # only extracted files are marked as done
+            if file_hash is not None and entry["status"] == "done":
+                self.done_hashes.add(file_hash)
+                hashes.append(file_hash + "\n")
+        # Results first, then the checkpoint: a crash in between at worst
+        # reprocesses a shard rather than losing it
+        out.write("".join(lines))
+        out.flush()
+        checkpoint.write("".join(hashes))
+        checkpoint.flush()
+        # Only totals are kept here; a long run would pile up observations
+        totals = result["timings"].totals()
+        totals["write"] = time.perf_counter() - start
+        for stage, seconds in totals.items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def stats(self) -> Dict:
+        elapsed = time.perf_counter() - self._started
+        processed = self.counts["done"] + self.counts["failed"]
+        return {
+            **self.counts,
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(processed / elapsed, 2) if elapsed else 0.0,
+            # Worker stages are summed across processes
+            "stage_seconds": {k: round(v, 3) for k, v in self.timings.items()},
+            "stage_ms_per_file": {
+                k: round(1000 * v / processed, 2) if processed else 0.0
+                for k, v in self.timings.items()
+            },
+        }
+
+    def _maybe_report(self, force: bool = False):
+        now = time.perf_counter()
+        if force or now - self._last_report >= self.report_every:
+            self._last_report = now
+            stats = self.stats()
+            print(
+                f"{stats['done']} done, {stats['failed']} failed, "
+                f"{stats['skipped']} skipped, {stats['files_per_second']} files/s",
+                file=sys.stderr,
+            )
+
+    def run(self) -> Dict:
+        self._started = self._last_report = time.perf_counter()
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        _truncate_partial_line(self.output)
+        self.done_hashes = load_checkpoint(self.checkpoint)
+        if self.done_hashes:
+            logger.info(f"Resuming: {len(self.done_hashes)} files already processed")
+
+        shards = self._shards()
+        in_flight: Set[Future] = set()
+        with open(self.output, "a") as out, open(self.checkpoint, "a") as checkpoint:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.done_hashes, self.fields, self.log_level),
+            ) as pool:
+                for shard in shards:
+                    in_flight.add(pool.submit(_process_batch, shard))
+                    if len(in_flight) >= self.workers * 2:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            self._write(future.result(), out, checkpoint)
+                        self._maybe_report()
+                for future in in_flight:
+                    self._write(future.result(), out, checkpoint)
+        self._maybe_report(force=True)
+        if self.counts["failed"]:
+            logger.warning(
+                f"{self.counts['failed']} files failed; run again to retry them"
+            )
+        return self.stats()
+
+
+def _parse_fields(value: Optional[str]) -> FrozenSet[str]:
+    if not value:
+        return METADATA_FIELDS
+    fields = frozenset(f.strip() for f in value.split(",") if f.strip())
+    unknown = fields - METADATA_FIELDS
+    if unknown or not fields:
+        raise argparse.ArgumentTypeError(
+            f"Unknown fields: {', '.join(sorted(unknown)) or value}"
+        )
+    return fields
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", type=Path, help="Directory to walk")
+    parser.add_argument(
+        "--output", type=Path, default=Path("data/output/batch.jsonl")
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Processed-hash file (default: <output>.checkpoint)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--shard-size", type=int, default=16, help="Files per worker task"
+    )
+    parser.add_argument("--fields", type=_parse_fields, default=METADATA_FIELDS)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument(
+        "--report-every", type=float, default=10.0, help="Progress interval (s)"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.root.is_dir():
+        parser.error(f"Not a directory: {args.root}")
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    runner = BatchRunner(
+        args.root,
+        args.output,
+        checkpoint=args.checkpoint,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        fields=args.fields,
+        log_level=args.log_level,
+        report_every=args.report_every,
+    )
+    print(json.dumps(runner.run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+from typing import Tuple
+
+
+def _env_list(name: str, default: str) -> Tuple[str, ...]:
+    value = os.getenv(name, default)
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+# spaCy model shared by every extractor in the process
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# Components no extractor uses; they are never loaded into memory
+SPACY_EXCLUDE = _env_list("SPACY_EXCLUDE", "parser,lemmatizer")
+
+# nlp.pipe settings for multi-file requests
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "64"))
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+
+# Off-loop extraction pool: "thread", "process" or "nlp" (dedicated NLP
+# worker processes, see NLP_WORKER_*)
+EXTRACTION_EXECUTOR = os.getenv("EXTRACTION_EXECUTOR", "thread")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to wait for a worker before requests are rejected with 503
+EXTRACTION_MAX_QUEUE = int(os.getenv("EXTRACTION_MAX_QUEUE", "32"))
+EXTRACTION_RETRY_AFTER = int(os.getenv("EXTRACTION_RETRY_AFTER", "5"))
+
+# Content-addressed result cache: in-memory LRU plus optional SQLite tier
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Empty disables the on-disk tier
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "")
+RESULT_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("RESULT_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+
+# Per-chunk cache for incremental re-extraction: long texts are split into
+# content-defined chunks of about CHUNK_TARGET_CHARS, and only chunks not
+# seen before are parsed (0 bytes disables it). Texts shorter than
+# CHUNK_CACHE_MIN_CHARS are parsed whole; PDFs always go by chunk.
+CHUNK_CACHE_MAX_BYTES = int(os.getenv("CHUNK_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CHUNK_CACHE_PATH = os.getenv("CHUNK_CACHE_PATH", "")
+CHUNK_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("CHUNK_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+CHUNK_TARGET_CHARS = int(os.getenv("CHUNK_TARGET_CHARS", "4000"))
+CHUNK_CACHE_MIN_CHARS = int(os.getenv("CHUNK_CACHE_MIN_CHARS", "20000"))
+
+# Upload limits, enforced while the request body is still streaming
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "10"))
+# .txt/.md uploads stream through extraction (see TEXT_IN_MEMORY_MB), so
+# their limit can be set well above MAX_UPLOAD_MB
+MAX_TEXT_UPLOAD_MB = int(os.getenv("MAX_TEXT_UPLOAD_MB", str(MAX_UPLOAD_MB)))
+MAX_FILES_PER_REQUEST = int(os.getenv("MAX_FILES_PER_REQUEST", "32"))
+# By default just enough for the most files allowed at the largest size,
+# plus 1 MB for the multipart framing
+MAX_REQUEST_MB = int(
+    os.getenv(
+        "MAX_REQUEST_MB",
+        str(max(MAX_UPLOAD_MB, MAX_TEXT_UPLOAD_MB) * MAX_FILES_PER_REQUEST + 1),
+    )
+)
+# Where uploads are spooled before extraction (None = system temp dir)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Text longer than this is fed to spaCy in chunks (well below nlp.max_length)
+NLP_CHUNK_CHARS = int(os.getenv("NLP_CHUNK_CHARS", "100000"))
+# Each chunk is parsed with up to this many characters of its neighbours on
+# either side, so entities and dates cut by a chunk boundary are still found
+NLP_CHUNK_OVERLAP_CHARS = int(os.getenv("NLP_CHUNK_OVERLAP_CHARS", "200"))
+# Text files larger than this are never held in memory as one string: they
+# are decoded TEXT_READ_BYTES at a time and parsed chunk by chunk
+TEXT_IN_MEMORY_MB = float(os.getenv("TEXT_IN_MEMORY_MB", "8"))
+TEXT_READ_BYTES = int(os.getenv("TEXT_READ_BYTES", str(1024 * 1024)))
+# Stop reading PDFs after this many pages (0 = no limit)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "0"))
+# Only the first N pages feed authors, dates and entities; later pages only
+# contribute key terms (0 = every page gets the full pipeline)
+PDF_METADATA_PAGES = int(os.getenv("PDF_METADATA_PAGES", "0"))
+# Default for ?metadata_first: fields that a PDF's Info dictionary or a
+# DOCX's core properties already answer (authors, dates) are not extracted
+# from the text, so NER, or text extraction altogether, can be skipped
+METADATA_FIRST = os.getenv("METADATA_FIRST", "0").lower() not in ("0", "false", "no")
+
+# Append-only JSON Lines results sink
+RESULTS_PATH = os.getenv("RESULTS_PATH", "data/output/results.jsonl")
+# "always" fsyncs every batch, "interval" at most every RESULTS_FLUSH_INTERVAL
+# seconds, "never" leaves it to the OS
+RESULTS_FSYNC = os.getenv("RESULTS_FSYNC", "interval")
+RESULTS_FLUSH_INTERVAL = float(os.getenv("RESULTS_FLUSH_INTERVAL", "1.0"))
+RESULTS_MAX_BYTES = int(os.getenv("RESULTS_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Key-term dictionary: every *.txt under KEY_TERMS_DIR, one term per line
+KEY_TERMS_DIR = os.getenv("KEY_TERMS_DIR", "data/key_terms")
+KEY_TERMS_ARTIFACT = os.getenv("KEY_TERMS_ARTIFACT", "data/cache/key_terms.msgpack")
+# How often term files are checked for changes (0 disables hot reload)
+KEY_TERMS_RELOAD_SECONDS = float(os.getenv("KEY_TERMS_RELOAD_SECONDS", "30"))
+
+# Background jobs: uploads are kept under JOBS_DIR until processed and job
+# state lives in a SQLite database so it survives a restart
+JOBS_DIR = os.getenv("JOBS_DIR", "data/jobs")
+JOBS_DB = os.getenv("JOBS_DB", "data/jobs/jobs.sqlite")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# How often result streams poll the job store for newly finished files
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+# Finished jobs and their results are dropped after this long (0 = keep)
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+# Stage timers and the Prometheus /metrics endpoint; when off, extraction
+# runs without any timing calls
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Pre-screen that gives empty, binary or image-only documents an empty
+# result with a reason code before any text extraction or NLP
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "1").lower() not in ("0", "false", "no")
+# Bytes of a text file sampled to judge encoding and text density
+PRESCREEN_SAMPLE_BYTES = int(os.getenv("PRESCREEN_SAMPLE_BYTES", str(64 * 1024)))
+
+# Warm-up at startup: loads the model and compiles the matchers in the
+# background (GET /ready answers 503 until done), then runs
+# WARMUP_DOCUMENT through the full pipeline if set
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+WARMUP_DOCUMENT = os.getenv("WARMUP_DOCUMENT", "")
+
+# Lanes in front of the extraction pools: small .txt/.md uploads (up to
+# FAST_LANE_MAX_BYTES) run in a low-latency pool of their own, PDFs, DOCX
+# and large files in the bulk pool sized by EXTRACTION_WORKERS and
+# EXTRACTION_MAX_QUEUE
+FAST_LANE_MAX_BYTES = int(os.getenv("FAST_LANE_MAX_BYTES", str(256 * 1024)))
+FAST_LANE_WORKERS = int(os.getenv("FAST_LANE_WORKERS", "2"))
+FAST_LANE_MAX_QUEUE = int(os.getenv("FAST_LANE_MAX_QUEUE", "64"))
+
+# NLP worker processes (EXTRACTION_EXECUTOR=nlp): each loads the model once
+# and is replaced after NLP_WORKER_MAX_DOCUMENTS documents (0 = never) to
+# bound memory creep
+NLP_WORKER_MAX_DOCUMENTS = int(os.getenv("NLP_WORKER_MAX_DOCUMENTS", "1000"))
+NLP_WORKER_START_METHOD = os.getenv("NLP_WORKER_START_METHOD", "forkserver")
+# Consecutive workers failing to start (e.g. missing model) before the pool
+# gives up and fails its batches instead of retrying forever
+NLP_WORKER_MAX_START_FAILURES = int(os.getenv("NLP_WORKER_MAX_START_FAILURES", "3"))
@@ -0,0 +1,110 @@
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+def split_text(text: str, max_chars: int) -> Iterator[str]:
+    # Cut oversized text at the last line break (or space) before the limit
+    # so words and, where possible, lines stay intact
+    while len(text) > max_chars:
+        cut = text.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield text[:cut]
+        text = text[cut:]
+    if text:
+        yield text
+
+
+def iter_text_chunks(pieces: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Regroup a stream of text pieces (e.g. pages) into chunks of at most
+    ``max_chars`` characters, holding only one chunk in memory at a time."""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        for part in split_text(piece, max_chars):
+            if size + len(part) > max_chars and buffer:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+            buffer.append(part)
+            size += len(part)
+    if buffer:
+        yield "".join(buffer)
+
+
+def _is_boundary(line: str, target_chars: int) -> bool:
+    # Picked by the line's own content, with a chance proportional to its
+    # length, so chunks average about ``target_chars``
+    return zlib.crc32(line.encode("utf-8")) % target_chars < len(line)
+
+
+def iter_content_chunks(
+    pieces: Iterable[str], target_chars: int, max_chars: int
+) -> Iterator[str]:
+    """Regroup a stream of text pieces into content-defined chunks.
+
+    Chunks end at line breaks (page breaks included) chosen by a hash of
+    the line's text rather than by position, so an edit only changes the
+    chunk it falls in and at most its neighbours: the rest of the document
+    comes out as the same chunks as before. Chunks are at least a quarter
+    of ``target_chars`` (unless the text ends) and at most ``max_chars``.
+    """
+    min_chars = target_chars // 4
+    buffer = []
+    size = 0
+    for piece in pieces:
+        for line in piece.splitlines(keepends=True):
+            for part in split_text(line, max_chars):
+                if size + len(part) > max_chars and buffer:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+                buffer.append(part)
+                size += len(part)
+                if size >= min_chars and _is_boundary(part, target_chars):
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _head(text: str, chars: int) -> str:
+    # Up to ``chars`` leading characters, ending at a word boundary
+    if len(text) <= chars:
+        return text
+    cut = text.rfind(" ", 0, chars)
+    return text[:cut] if cut > 0 else text[:chars]
+
+
+def _tail(text: str, chars: int) -> str:
+    # Up to ``chars`` trailing characters, starting at a word boundary
+    if len(text) <= chars:
+        return text
+    cut = text.find(" ", len(text) - chars)
+    return text[cut + 1 :] if cut >= 0 else text[-chars:]
+
+
+def iter_windows(
+    chunks: Iterable[str], overlap_chars: int
+) -> Iterator[Tuple[str, Tuple[int, int]]]:
+    """Pair each chunk with up to ``overlap_chars`` of its neighbours' text.
+
+    Yields ``(window, (start, end))`` where ``window[start:end]`` is the
+    chunk itself, preceded by the tail of the previous chunk and followed
+    by the head of the next one. Reads one chunk ahead. Keeping only the
+    matches and entities that start inside ``(start, end)`` counts each
+    exactly once, and one cut by a chunk boundary is seen whole in the
+    window it starts in.
+    """
+    chunks = iter(chunks)
+    current: Optional[str] = next(chunks, None)
+    before = ""
+    while current is not None:
+        following = next(chunks, None)
+        after = _head(following, overlap_chars) if following and overlap_chars else ""
+        yield before + current + after, (len(before), len(before) + len(current))
+        before = _tail(current, overlap_chars) if overlap_chars else ""
+        current = following
@@ -0,0 +1,107 @@
+import io
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List
+from xml.etree.ElementTree import iterparse
+from .text_extractor import Source
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+DCTERMS = "{http://purl.org/dc/terms/}"
+
+BODY_PART = "word/document.xml"
+CORE_PART = "docProps/core.xml"
+
+# Core properties read from docProps/core.xml, by result key
+CORE_PROPERTIES = {
+    f"{DC}title": "title",
+    f"{DC}creator": "creator",
+    f"{DCTERMS}created": "created",
+    f"{DCTERMS}modified": "modified",
+}
+
+# Subtrees whose content is not document text: paragraph properties hold
+# tab stop definitions, and the fallback of an alternate-content block
+# repeats its text box for older readers
+_SKIPPED = (f"{W}pPr", f"{MC}Fallback")
+# Paragraph-level elements released as soon as they are done
+_RELEASED = (f"{W}p", f"{W}tbl")
+
+
+def _open(content: Source) -> zipfile.ZipFile:
+    if isinstance(content, Path):
+        return zipfile.ZipFile(str(content))
+    return zipfile.ZipFile(io.BytesIO(content))
+
+
+def _part_order(name: str):
+    # header2.xml after header1.xml, header10.xml after header9.xml
+    return len(name), name
+
+
+class DocxReader:
+    """Reads DOCX text and core properties straight from the zip archive.
+
+    Each XML part is stream-parsed and every paragraph is released once its
+    text has been emitted, so no python-docx object model is built and
+    memory stays flat however long the document is. Text comes from the
+    headers, the body (tables and text boxes included) and the footers.
+    """
+
+    @classmethod
+    def iter_paragraphs(cls, content: Source) -> Iterator[str]:
+        with _open(content) as archive:
+            names = archive.namelist()
+            headers = sorted(
+                (n for n in names if n.startswith("word/header")), key=_part_order
+            )
+            footers = sorted(
+                (n for n in names if n.startswith("word/footer")), key=_part_order
+            )
+            for name in [*headers, BODY_PART, *footers]:
+                with archive.open(name) as part:
+                    yield from cls._iter_part(part)
+
+    @staticmethod
+    def _iter_part(part) -> Iterator[str]:
+        # A stack, because text boxes nest paragraphs inside a paragraph
+        paragraphs: List[List[str]] = []
+        skipping = 0
+        for event, elem in iterparse(part, events=("start", "end")):
+            tag = elem.tag
+            if tag in _SKIPPED:
+                skipping += 1 if event == "start" else -1
+                continue
+            if event == "start":
+                if tag == f"{W}p" and not skipping:
+                    paragraphs.append([])
+                continue
+            if skipping or not paragraphs:
+                pass
+            elif tag == f"{W}t":
+                paragraphs[-1].append(elem.text or "")
+            elif tag == f"{W}tab":
+                paragraphs[-1].append("\t")
+            elif tag in (f"{W}br", f"{W}cr"):
+                paragraphs[-1].append("\n")
+            elif tag == f"{W}p":
+                text = "".join(paragraphs.pop())
+                if text.strip():
+                    yield text
+            if tag in _RELEASED:
+                elem.clear()
+
+    @staticmethod
+    def core_properties(content: Source) -> Dict[str, str]:
+        # Author and W3CDTF dates as stored; empty when the part is missing
+        properties: Dict[str, str] = {}
+        with _open(content) as archive:
+            if CORE_PART not in archive.namelist():
+                return properties
+            with archive.open(CORE_PART) as part:
+                for _, elem in iterparse(part):
+                    key = CORE_PROPERTIES.get(elem.tag)
+                    if key is not None and elem.text and elem.text.strip():
+                        properties[key] = elem.text.strip()
+        return properties
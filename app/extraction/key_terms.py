@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import srsly
+from spacy.language import Language
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc
+from loguru import logger
+from ..config import KEY_TERMS_ARTIFACT, KEY_TERMS_DIR, KEY_TERMS_RELOAD_SECONDS
+from .model_registry import ModelRegistry
+
+
+class KeyTermDictionary:
+    """Key terms loaded from text files and matched with a PhraseMatcher.
+
+    Term lists are compiled once into a serialized artifact keyed by a hash
+    of the source files and of the tokenizer that split them. It holds each
+    term as the sequence of LOWER hashes the PhraseMatcher indexes (the
+    form it uses when unpickling), so later startups skip tokenizing and
+    building a Doc for every term. Files are re-checked every
+    ``reload_interval`` seconds and the matcher is swapped in place when
+    they change.
+    """
+
+    label = "KEY_TERM"
+    artifact_format = 1
+
+    def __init__(
+        self,
+        nlp: Optional[Language] = None,
+        terms_dir: str = KEY_TERMS_DIR,
+        artifact_path: Optional[str] = KEY_TERMS_ARTIFACT,
+        reload_interval: float = KEY_TERMS_RELOAD_SECONDS,
+    ):
+        self._nlp = nlp
+        self.terms_dir = Path(terms_dir)
+        self.artifact_path = Path(artifact_path) if artifact_path else None
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._matcher: Optional[PhraseMatcher] = None
+        self._signature: Optional[Tuple] = None
+        self._fingerprint: Optional[str] = None
+        self._built_fingerprint: Optional[str] = None
+        self._tokenizer_id: Optional[str] = None
+        self._last_check = 0.0
+        self.term_count = 0
+        self.loaded_from = None
+        self.load_seconds = 0.0
+
+    @property
+    def nlp(self) -> Language:
+        if self._nlp is None:
+            self._nlp = ModelRegistry.get()
+        return self._nlp
+
+    def term_files(self) -> List[Path]:
+        if not self.terms_dir.is_dir():
+            return []
+        return sorted(self.terms_dir.glob("*.txt"))
+
+    def _stat_signature(self) -> Tuple:
+        return tuple(
+            (path.name, path.stat().st_mtime_ns, path.stat().st_size)
+            for path in self.term_files()
+        )
+
+    def _due_for_check(self) -> bool:
+        if self._signature is None:
+            return True
+        if self.reload_interval <= 0:
+            return False
+        return time.monotonic() - self._last_check >= self.reload_interval
+
+    def fingerprint(self) -> str:
+        # Content hash of the term files; only re-read when their stats change
+        if self._due_for_check():
+            self._last_check = time.monotonic()
+            signature = self._stat_signature()
+            if signature != self._signature or self._fingerprint is None:
+                digest = hashlib.sha256()
+                for path in self.term_files():
+                    digest.update(path.name.encode("utf-8"))
+                    digest.update(path.read_bytes())
+                self._fingerprint = digest.hexdigest()[:16]
+                self._signature = signature
+        return self._fingerprint
+
+    def tokenizer_id(self) -> str:
+        # Term token sequences are only valid for the tokenizer that made
+        # them, so a different model or version rebuilds the artifact
+        if self._tokenizer_id is None:
+            meta = self.nlp.meta
+            digest = hashlib.sha256(self.nlp.tokenizer.to_bytes()).hexdigest()[:16]
+            self._tokenizer_id = (
+                f"{meta.get('lang')}_{meta.get('name')}@{meta.get('version')}-{digest}"
+            )
+        return self._tokenizer_id
+
+    def read_terms(self) -> List[str]:
+        terms = {}
+        for path in self.term_files():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    term = line.strip()
+                    if term and not term.startswith("#"):
+                        terms.setdefault(term.lower(), term)
+        return sorted(terms.values())
+
+    def _load_artifact(self, fingerprint: str) -> Optional[List[List[int]]]:
+        if self.artifact_path is None or not self.artifact_path.exists():
+            return None
+        try:
+            data = srsly.msgpack_loads(self.artifact_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable key-term artifact: {e}")
+            return None
+        if (
+            data.get("format") != self.artifact_format
+            or data.get("fingerprint") != fingerprint
+            or data.get("tokenizer") != self.tokenizer_id()
+        ):
+            return None
+        return data["keywords"]
+
+    def _save_artifact(self, fingerprint: str, keywords: List[List[int]]):
+        if self.artifact_path is None:
+            return
+        payload = srsly.msgpack_dumps(
+            {
+                "format": self.artifact_format,
+                "fingerprint": fingerprint,
+                "tokenizer": self.tokenizer_id(),
+                "keywords": keywords,
+            }
+        )
+        self.artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so other workers never read a partial artifact
+        tmp_path = self.artifact_path.with_name(
+            f"{self.artifact_path.name}.{os.getpid()}.tmp"
+        )
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self.artifact_path)
+
+    def _build(self):
+        start = time.perf_counter()
+        fingerprint = self.fingerprint()
+        keywords = self._load_artifact(fingerprint)
+        loaded_from = "artifact"
+        if keywords is None:
+            keywords = [
+                [token.lower for token in doc]
+                for doc in self.nlp.tokenizer.pipe(self.read_terms())
+            ]
+            self._save_artifact(fingerprint, keywords)
+            loaded_from = "term files"
+
+        matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+        if keywords:
+            matcher.add(self.label, keywords)
+
+        self._matcher = matcher
+        self._built_fingerprint = fingerprint
+        self.term_count = len(keywords)
+        self.loaded_from = loaded_from
+        self.load_seconds = time.perf_counter() - start
+        logger.info(
+            f"Loaded {self.term_count} key terms from {loaded_from} "
+            f"in {self.load_seconds:.3f}s"
+        )
+
+    @property
+    def matcher(self) -> PhraseMatcher:
+        if self._matcher is None or self.fingerprint() != self._built_fingerprint:
+            with self._lock:
+                if self._matcher is None or self.fingerprint() != self._built_fingerprint:
+                    self._build()
+        return self._matcher
+
+    def reload(self):
+        with self._lock:
+            self._signature = None
+            self._build()
+
+    def match(self, doc: Doc) -> List[str]:
+        key_terms = set()
+        for _, start, end in self.matcher(doc):
+            key_terms.add(doc[start:end].text.lower())
+        return sorted(list(key_terms))
+
+    def stats(self) -> Dict:
+        return {
+            "terms": self.term_count,
+            "fingerprint": self._fingerprint,
+            "loaded_from": self.loaded_from,
+            "load_seconds": round(self.load_seconds, 4),
+            "files": [path.name for path in self.term_files()],
+        }
+
+
+_shared_dictionary: Optional[KeyTermDictionary] = None
+
+
+def get_key_term_dictionary() -> KeyTermDictionary:
+    global _shared_dictionary
+    if _shared_dictionary is None:
+        _shared_dictionary = KeyTermDictionary()
+    return _shared_dictionary
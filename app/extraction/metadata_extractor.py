@@ -1,17 +1,148 @@
-import spacy
-from typing import Dict, List
+import contextlib
+import functools
+import hashlib
+import itertools
+import threading
+import time
+from collections import Counter
+from spacy.language import Language
+from spacy.tokens import Doc
+from pathlib import Path
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from ..config import (
+    CHUNK_CACHE_DISK_MAX_BYTES,
+    CHUNK_CACHE_MAX_BYTES,
+    CHUNK_CACHE_MIN_CHARS,
+    CHUNK_CACHE_PATH,
+    CHUNK_TARGET_CHARS,
+    NLP_BATCH_SIZE,
+    NLP_CHUNK_CHARS,
+    NLP_CHUNK_OVERLAP_CHARS,
+    NLP_N_PROCESS,
+    METADATA_FIRST,
+    PDF_MAX_PAGES,
+    PDF_METADATA_PAGES,
+    PRESCREEN_ENABLED,
+    TEXT_IN_MEMORY_MB,
+    WARMUP_DOCUMENT,
+)
+from .chunking import iter_content_chunks, iter_text_chunks, iter_windows
+from .model_registry import ModelRegistry
 from .patterns import PatternMatcher
-from .text_extractor import TextExtractor
+from .postprocess import normalize_dates, rank_entities
+from .prescreen import EMPTY, LITTLE_TEXT, PreScreen
+from .text_extractor import EMBEDDED_FORMATS, Source, TextExtractor
+from ..utils.cache import ResultCache
+from ..utils.metrics import StageTimings
 from loguru import logger
 
+# Bump whenever the shape or post-processing of results changes so cached
+# results from older code are no longer served
+EXTRACTOR_VERSION = "6"
+
+METADATA_FIELDS = frozenset(
+    ["dates", "authors", "key_terms", "organizations", "locations"]
+)
+# Fields that can only come from the statistical NER component
+NER_FIELDS = frozenset(["authors", "organizations", "locations"])
+
+T = TypeVar("T")
+
+
+def _stage(timings: Optional[StageTimings], stage: str):
+    return timings.time(stage) if timings is not None else contextlib.nullcontext()
+
 
 class MetadataExtractor:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.pattern_matcher = PatternMatcher()
+    _model_fingerprint: Optional[str] = None
 
-    def extract_authors_ner(self, text: str) -> List[str]:
-        doc = self.nlp(text)
+    def __init__(self, nlp: Optional[Language] = None):
+        self._nlp = nlp
+        self.pattern_matcher = PatternMatcher(nlp=nlp)
+        self._variants: Dict[FrozenSet[str], Tuple[str, ...]] = {}
+
+    @property
+    def nlp(self) -> Language:
+        if self._nlp is None:
+            self._nlp = ModelRegistry.get()
+        return self._nlp
+
+    @classmethod
+    def version(cls) -> str:
+        # Cache version covering the code, the model, the pattern set and
+        # the page limits, which change what a PDF's result holds
+        if cls._model_fingerprint is None:
+            cls._model_fingerprint = ModelRegistry.fingerprint()
+        parts = [
+            EXTRACTOR_VERSION,
+            cls._model_fingerprint,
+            PatternMatcher.fingerprint(),
+            f"pages={PDF_MAX_PAGES},{PDF_METADATA_PAGES}",
+        ]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def disabled_for(self, fields: FrozenSet[str] = METADATA_FIELDS) -> Tuple[str, ...]:
+        # Each field set maps to the smallest pipeline variant able to answer
+        # it: key terms need only the tokenizer, date patterns add POS and
+        # authors/organizations/locations add NER. The parser and lemmatizer
+        # never run. Variants are computed once per field set.
+        disabled = self._variants.get(fields)
+        if disabled is None:
+            needed = set()
+            if "dates" in fields:
+                needed.update(["tagger", "attribute_ruler"])
+            if fields & NER_FIELDS:
+                needed.add("ner")
+            if "tok2vec" in self.nlp.pipe_names:
+                listeners = self.nlp.get_pipe("tok2vec").listening_components
+                if needed.intersection(listeners):
+                    needed.add("tok2vec")
+            disabled = tuple(name for name in self.nlp.pipe_names if name not in needed)
+            self._variants[fields] = disabled
+        return disabled
+
+    def _parse(self, text: str, fields: FrozenSet[str] = METADATA_FIELDS) -> Doc:
+        return self.nlp(text, disable=self.disabled_for(fields))
+
+    @staticmethod
+    def empty_metadata() -> Dict[str, List[str]]:
+        return {
+            "dates": [],
+            "authors": [],
+            "key_terms": [],
+            "organizations": [],
+            "locations": [],
+        }
+
+    @classmethod
+    def skipped_metadata(cls, reason: str) -> Dict[str, Union[List[str], str]]:
+        # Empty result plus the reason no metadata could be extracted
+        return {**cls.empty_metadata(), "skipped": reason}
+
+    @staticmethod
+    def prescreen(
+        filename: str, content: Source, timings: Optional[StageTimings] = None
+    ) -> Optional[str]:
+        if not PRESCREEN_ENABLED:
+            return None
+        with _stage(timings, "screen"):
+            reason = PreScreen.screen(filename, content)
+        if reason is not None:
+            logger.info(f"Skipping {filename}: {reason}")
+        return reason
+
+    @staticmethod
+    def authors_from_doc(doc: Doc) -> List[str]:
         authors = set()
         for ent in doc.ents:
             if ent.label_ == "PERSON":
@@ -20,51 +151,654 @@ class MetadataExtractor:
                     authors.add(name)
         return sorted(list(authors))
 
-    def extract_additional_entities(self, text: str) -> Dict[str, List[str]]:
-        doc = self.nlp(text)
+    @staticmethod
+    def entities_from_doc(doc: Doc) -> Dict[str, List[str]]:
         entities = {"organizations": [], "locations": [], "dates_ner": []}
         for ent in doc.ents:
+            text = " ".join(ent.text.split())
             if ent.label_ == "ORG":
-                entities["organizations"].append(ent.text)
+                entities["organizations"].append(text)
             elif ent.label_ in ["GPE", "LOC"]:
-                entities["locations"].append(ent.text)
+                entities["locations"].append(text)
             elif ent.label_ == "DATE":
-                entities["dates_ner"].append(ent.text)
+                entities["dates_ner"].append(text)
         return entities
 
-    def extract_metadata(self, filename: str, content: bytes) -> Dict[str, List[str]]:
-        try:
-            text = TextExtractor.extract_text(filename, content)
-            if not text or len(text.strip()) < 10:
-                logger.warning(f"Very little text extracted from {filename}")
-                return {
-                    "dates": [],
-                    "authors": [],
-                    "key_terms": [],
-                    "organizations": [],
-                    "locations": [],
-                }
-
-            dates_pattern, key_terms_pattern = self.pattern_matcher.extract_patterns(
-                text
-            )
-            authors_ner = self.extract_authors_ner(text)
-            additional_entities = self.extract_additional_entities(text)
+    def extract_authors_ner(self, text: str) -> List[str]:
+        return self.authors_from_doc(self._parse(text, NER_FIELDS))
 
-            all_dates = set(dates_pattern + additional_entities["dates_ner"])
+    def extract_additional_entities(self, text: str) -> Dict[str, List[str]]:
+        return self.entities_from_doc(self._parse(text, NER_FIELDS))
 
-            logger.info(
-                f"Extracted from {filename}: {len(all_dates)} dates, "
-                f"{len(authors_ner)} authors, {len(key_terms_pattern)} key terms"
-            )
+    def collect_from_doc(
+        self,
+        doc: Doc,
+        fields: FrozenSet[str] = METADATA_FIELDS,
+        core: Optional[Tuple[int, int]] = None,
+    ) -> Dict:
+        # Every extractor reads the same parsed Doc, so the pipeline runs once.
+        # Fields that were not requested are left empty. Organizations and
+        # locations stay as Counters so chunk results merge with their counts.
+        # For a window (see iter_windows), ``core`` is the character range of
+        # its own chunk: entities and dates starting in the overlap belong to
+        # the neighbouring window.
+        if core is not None:
+            doc.ents = [ent for ent in doc.ents if core[0] <= ent.start_char < core[1]]
+        collected = {
+            **self.empty_metadata(),
+            "organizations": Counter(),
+            "locations": Counter(),
+        }
+        ner_ran = bool(fields & NER_FIELDS)
+        additional_entities = self.entities_from_doc(doc) if ner_ran else None
 
-            return {
-                "dates": sorted(list(all_dates)),
-                "authors": authors_ner,
-                "key_terms": key_terms_pattern,
-                "organizations": additional_entities["organizations"],
-                "locations": additional_entities["locations"],
+        if "dates" in fields:
+            dates = self.pattern_matcher.match_dates(doc, core)
+            if additional_entities is not None:
+                # NER dates that do not parse ("last year") are dropped
+                dates = normalize_dates(dates + additional_entities["dates_ner"])
+            collected["dates"] = dates
+        if "key_terms" in fields:
+            collected["key_terms"] = self.pattern_matcher.match_key_terms(doc)
+        if "authors" in fields:
+            collected["authors"] = self.authors_from_doc(doc)
+        if "organizations" in fields:
+            collected["organizations"] = Counter(additional_entities["organizations"])
+        if "locations" in fields:
+            collected["locations"] = Counter(additional_entities["locations"])
+        return collected
+
+    @staticmethod
+    def finalize(collected: Dict) -> Dict[str, List[str]]:
+        return {
+            **collected,
+            "organizations": rank_entities(collected["organizations"]),
+            "locations": rank_entities(collected["locations"]),
+        }
+
+    def extract_from_doc(
+        self, doc: Doc, fields: FrozenSet[str] = METADATA_FIELDS
+    ) -> Dict[str, List[str]]:
+        return self.finalize(self.collect_from_doc(doc, fields))
+
+    @classmethod
+    def merge_metadata(cls, partials: Iterable[Dict]) -> Dict[str, List[str]]:
+        # Merges collect_from_doc results into one final result
+        dates, authors, key_terms = [], set(), set()
+        organizations, locations = Counter(), Counter()
+        for partial in partials:
+            dates.extend(partial["dates"])
+            authors.update(partial["authors"])
+            key_terms.update(partial["key_terms"])
+            organizations.update(partial["organizations"])
+            locations.update(partial["locations"])
+        return cls.finalize(
+            {
+                "dates": normalize_dates(dates),
+                "authors": sorted(list(authors)),
+                "key_terms": sorted(list(key_terms)),
+                "organizations": organizations,
+                "locations": locations,
             }
+        )
+
+    def _extract_timed(
+        self,
+        doc: Doc,
+        fields: FrozenSet[str],
+        timings: Optional[StageTimings],
+    ) -> Dict[str, List[str]]:
+        with _stage(timings, "match"):
+            return self.extract_from_doc(doc, fields)
+
+    def _collect_timed(
+        self,
+        doc: Doc,
+        fields: FrozenSet[str],
+        timings: Optional[StageTimings],
+        core: Optional[Tuple[int, int]] = None,
+    ) -> Dict:
+        with _stage(timings, "match"):
+            return self.collect_from_doc(doc, fields, core)
+
+    @staticmethod
+    def incremental(text_chars: Optional[int] = None) -> bool:
+        # Whether to go by cached chunks: PDFs (size unknown up front) always,
+        # texts once they are long enough to be worth it
+        if get_chunk_cache() is None:
+            return False
+        return text_chars is None or text_chars >= CHUNK_CACHE_MIN_CHARS
+
+    def extract_from_text(
+        self,
+        text: str,
+        fields: FrozenSet[str] = METADATA_FIELDS,
+        timings: Optional[StageTimings] = None,
+    ) -> Dict[str, List[str]]:
+        incremental = self.incremental(len(text))
+        if len(text) <= NLP_CHUNK_CHARS and not incremental:
+            with _stage(timings, "nlp"):
+                doc = self._parse(text, fields)
+            return self._extract_timed(doc, fields, timings)
+        return self.extract_from_pages(
+            [text], fields=fields, timings=timings, incremental=incremental
+        )
+
+    def extract_from_pages(
+        self,
+        pages: Iterable[str],
+        metadata_pages: int = PDF_METADATA_PAGES,
+        chunk_chars: int = NLP_CHUNK_CHARS,
+        fields: FrozenSet[str] = METADATA_FIELDS,
+        timings: Optional[StageTimings] = None,
+        incremental: bool = False,
+        overlap_chars: int = NLP_CHUNK_OVERLAP_CHARS,
+    ) -> Dict[str, List[str]]:
+        # Pages are regrouped into bounded chunks and parsed as they stream
+        # in, each within a window overlapping its neighbours; per-chunk
+        # results are merged into one document result. When incremental,
+        # chunks are content-defined and cached, and the result reports how
+        # much of the document had to be parsed again.
+        usage = (
+            {"total": 0, "cached": 0, "bytes": 0, "bytes_reprocessed": 0}
+            if incremental
+            else None
+        )
+        if incremental:
+            chunker = functools.partial(
+                iter_content_chunks, target_chars=CHUNK_TARGET_CHARS, max_chars=chunk_chars
+            )
+        else:
+            chunker = functools.partial(iter_text_chunks, max_chars=chunk_chars)
+        pages = iter(pages)
+        front = itertools.islice(pages, metadata_pages) if metadata_pages else pages
+        partials = self._collect_chunks(
+            iter_windows(chunker(front), overlap_chars), fields, timings, usage
+        )
+        if metadata_pages and "key_terms" in fields:
+            # Past the front pages only key terms are collected, so the
+            # statistical components are skipped entirely
+            partials.extend(
+                self._collect_chunks(
+                    iter_windows(chunker(pages), overlap_chars),
+                    frozenset(["key_terms"]),
+                    timings,
+                    usage,
+                )
+            )
+        with _stage(timings, "match"):
+            metadata = self.merge_metadata(partials)
+        if usage is not None:
+            total = usage["total"]
+            usage["hit_ratio"] = round(usage["cached"] / total, 4) if total else 0.0
+            metadata["chunks"] = usage
+        return metadata
+
+    def _collect_chunks(
+        self,
+        windows: Iterable[Tuple[str, Tuple[int, int]]],
+        fields: FrozenSet[str],
+        timings: Optional[StageTimings],
+        usage: Optional[Dict] = None,
+    ) -> List[Dict]:
+        # Collected results of each chunk, from ``(window, core)`` pairs as
+        # made by iter_windows. Given ``usage``, chunks already in the chunk
+        # cache (same window, fields and extractor version) are served from
+        # it and only the rest go through spaCy.
+        disable = self.disabled_for(fields)
+        if usage is None:
+            docs = self.nlp.pipe(windows, as_tuples=True, batch_size=1, disable=disable)
+            return [
+                self._collect_timed(doc, fields, timings, core)
+                for doc, core in self._timed(docs, timings, "nlp")
+            ]
+        cache = get_chunk_cache()
+        version = self.version()
+        variant = ",".join(sorted(fields))
+        partials = []
+
+        def misses() -> Iterator[Tuple[str, Tuple[Tuple[int, int], str]]]:
+            for window, core in windows:
+                digest = hashlib.blake2b(window.encode("utf-8"), digest_size=16)
+                key = ResultCache.make_key(
+                    digest.hexdigest(), f"{variant};{core[0]}:{core[1]}"
+                )
+                with _stage(timings, "chunk_cache"):
+                    partial = cache.get(key, version)
+                # Sizes count the chunk itself, not the overlap
+                size = len(window[core[0] : core[1]].encode("utf-8"))
+                usage["total"] += 1
+                usage["bytes"] += size
+                if partial is not None:
+                    usage["cached"] += 1
+                    partials.append(partial)
+                else:
+                    usage["bytes_reprocessed"] += size
+                    yield window, (core, key)
+
+        docs = self.nlp.pipe(misses(), as_tuples=True, batch_size=1, disable=disable)
+        for doc, (core, key) in self._timed(docs, timings, "nlp"):
+            partial = self._collect_timed(doc, fields, timings, core)
+            with _stage(timings, "chunk_cache"):
+                cache.put(key, version, partial)
+            partials.append(partial)
+        return partials
+
+    @staticmethod
+    def _count_text(pages: Iterable[str], counter: List[int]) -> Iterator[str]:
+        for page in pages:
+            counter[0] += len(page.strip())
+            yield page
+
+    @staticmethod
+    def _timed(
+        items: Iterable[T], timings: Optional[StageTimings], stage: str
+    ) -> Iterator[T]:
+        # Charges the time spent producing each item to ``stage``. Time an
+        # inner stage records meanwhile, such as PDF pages pulled while
+        # spaCy consumes them, is not counted twice.
+        if timings is None:
+            yield from items
+            return
+        items = iter(items)
+        while True:
+            before = timings.total
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            timings.add(stage, time.perf_counter() - start - (timings.total - before))
+            yield item
+
+    @staticmethod
+    def _timed_batches(
+        items: Iterable[T], timings: Optional[StageTimings], stage: str, batch_size: int
+    ) -> Iterator[T]:
+        # Like _timed for a batched nlp.pipe, whose first document of each
+        # batch would carry the whole batch: items are pulled a batch at a
+        # time and its time is spread evenly over them.
+        if timings is None:
+            yield from items
+            return
+        items = iter(items)
+        while True:
+            before = timings.total
+            start = time.perf_counter()
+            batch = list(itertools.islice(items, max(1, batch_size)))
+            if not batch:
+                return
+            elapsed = time.perf_counter() - start - (timings.total - before)
+            for item in batch:
+                timings.add(stage, elapsed / len(batch))
+                yield item
+
+    def _extract_pdf(
+        self,
+        filename: str,
+        content: Source,
+        fields: FrozenSet[str],
+        timings: Optional[StageTimings] = None,
+    ) -> Dict[str, List[str]]:
+        pages = TextExtractor.iter_pdf_pages(content, max_pages=PDF_MAX_PAGES)
+        return self._extract_streamed(
+            filename, self._timed(pages, timings, "text_pdf"), fields, timings
+        )
+
+    @staticmethod
+    def streams_text(filename: str, content: Source) -> bool:
+        # Text files too large to decode into one string in memory
+        if Path(filename).suffix.lower() not in (".txt", ".md"):
+            return False
+        size = content.stat().st_size if isinstance(content, Path) else len(content)
+        return size > TEXT_IN_MEMORY_MB * 1024 * 1024
+
+    def _extract_text_stream(
+        self,
+        filename: str,
+        content: Source,
+        fields: FrozenSet[str],
+        timings: Optional[StageTimings] = None,
+    ) -> Dict[str, List[str]]:
+        stage = "text_" + Path(filename).suffix.lower()[1:]
+        pieces = TextExtractor.iter_txt(content)
+        return self._extract_streamed(
+            filename, self._timed(pieces, timings, stage), fields, timings, metadata_pages=0
+        )
+
+    def _extract_streamed(
+        self,
+        filename: str,
+        pieces: Iterable[str],
+        fields: FrozenSet[str],
+        timings: Optional[StageTimings] = None,
+        metadata_pages: int = PDF_METADATA_PAGES,
+    ) -> Dict[str, List[str]]:
+        # Text that arrives piece by piece (PDF pages, blocks of a large text
+        # file) is parsed as it comes; whether there was any is only known
+        # at the end
+        counter = [0]
+        metadata = self.extract_from_pages(
+            self._count_text(pieces, counter),
+            metadata_pages=metadata_pages,
+            fields=fields,
+            timings=timings,
+            incremental=self.incremental(),
+        )
+        if counter[0] < 10:
+            logger.warning(f"Very little text extracted from {filename}")
+            return self.skipped_metadata(EMPTY if counter[0] == 0 else LITTLE_TEXT)
+        return metadata
+
+    @staticmethod
+    def read_embedded(
+        filename: str, content: Source, timings: Optional[StageTimings] = None
+    ) -> Dict[str, str]:
+        # A file whose own metadata cannot be read is still extracted as usual
+        if Path(filename).suffix.lower() not in EMBEDDED_FORMATS:
+            return {}
+        try:
+            with _stage(timings, "embedded"):
+                return TextExtractor.extract_embedded(filename, content)
+        except Exception as e:
+            logger.warning(f"Skipping embedded metadata of {filename}: {e}")
+            return {}
+
+    @staticmethod
+    def embedded_values(embedded: Dict[str, str]) -> Dict[str, List[str]]:
+        # Result fields the embedded metadata has values for
+        values = {}
+        if embedded.get("author"):
+            values["authors"] = [embedded["author"]]
+        dates = [embedded[key] for key in ("created", "modified") if key in embedded]
+        if dates:
+            values["dates"] = dates
+        return values
+
+    def text_fields(
+        self, fields: FrozenSet[str], embedded: Dict[str, str], metadata_first: bool
+    ) -> FrozenSet[str]:
+        # Fields still to be extracted from the text. In metadata-first mode
+        # those the embedded metadata already answers are dropped, and with
+        # them the pipeline components only they need.
+        if not metadata_first:
+            return fields
+        return fields - frozenset(self.embedded_values(embedded))
+
+    @classmethod
+    def merge_embedded(
+        cls,
+        metadata: Dict[str, List[str]],
+        embedded: Dict[str, str],
+        fields: FrozenSet[str],
+        text_fields: FrozenSet[str],
+    ) -> Dict[str, List[str]]:
+        """Add the document's own author and dates to a result.
+
+        The result also gets the embedded metadata as read and, per field,
+        where its values came from: "embedded", "text" or both.
+        """
+        if not embedded or metadata.get("skipped"):
+            return metadata
+        values = cls.embedded_values(embedded)
+        metadata = {**metadata, "embedded": embedded}
+        if "authors" in fields and "authors" in values:
+            authors = set(metadata["authors"]) | set(values["authors"])
+            metadata["authors"] = sorted(list(authors))
+        if "dates" in fields and "dates" in values:
+            metadata["dates"] = normalize_dates(metadata["dates"] + values["dates"])
+        sources = {}
+        for field in sorted(fields):
+            if field not in values:
+                sources[field] = "text"
+            elif field in text_fields:
+                sources[field] = "embedded+text"
+            else:
+                sources[field] = "embedded"
+        metadata["sources"] = sources
+        return metadata
+
+    @staticmethod
+    def _log_extracted(filename: str, metadata: Dict[str, List[str]]):
+        logger.info(
+            f"Extracted from {filename}: {len(metadata['dates'])} dates, "
+            f"{len(metadata['authors'])} authors, "
+            f"{len(metadata['key_terms'])} key terms"
+        )
+
+    @staticmethod
+    def _little_text_reason(filename: str, text: str) -> Optional[str]:
+        if not text or len(text.strip()) < 10:
+            logger.warning(f"Very little text extracted from {filename}")
+            return EMPTY if not text or not text.strip() else LITTLE_TEXT
+        return None
+
+    def extract_metadata(
+        self,
+        filename: str,
+        content: Source,
+        fields: FrozenSet[str] = METADATA_FIELDS,
+        metadata_first: bool = METADATA_FIRST,
+    ) -> Dict[str, List[str]]:
+        try:
+            reason = self.prescreen(filename, content)
+            if reason is not None:
+                return self.skipped_metadata(reason)
+            embedded = self.read_embedded(filename, content)
+            text_fields = self.text_fields(fields, embedded, metadata_first)
+            if not text_fields:
+                metadata = self.empty_metadata()
+            elif filename.lower().endswith(".pdf"):
+                metadata = self._extract_pdf(filename, content, text_fields)
+            elif self.streams_text(filename, content):
+                metadata = self._extract_text_stream(filename, content, text_fields)
+            else:
+                text = TextExtractor.extract_text(filename, content)
+                reason = self._little_text_reason(filename, text)
+                if reason is not None:
+                    return self.skipped_metadata(reason)
+                metadata = self.extract_from_text(text, text_fields)
+            metadata = self.merge_embedded(metadata, embedded, fields, text_fields)
+            self._log_extracted(filename, metadata)
+            return metadata
         except Exception as e:
             logger.error(f"Error extracting metadata from {filename}: {e}")
             raise ValueError(f"Failed to extract metadata: {str(e)}")
+
+    def extract_metadata_batch(
+        self,
+        files: List[Tuple[str, Source]],
+        batch_size: int = NLP_BATCH_SIZE,
+        n_process: int = NLP_N_PROCESS,
+        fields: FrozenSet[str] = METADATA_FIELDS,
+        timings: Optional[StageTimings] = None,
+        metadata_first: bool = METADATA_FIRST,
+    ) -> List[Union[Dict[str, List[str]], ValueError]]:
+        # Returns one entry per input file, in order: the metadata dict or the
+        # ValueError that file raised, so one bad file never fails the batch.
+        # If given, ``timings`` collects seconds spent per stage.
+        results: List[Optional[Union[Dict[str, List[str]], ValueError]]] = [
+            None
+        ] * len(files)
+        texts = []
+        positions = []
+        embedded_by_file: Dict[int, Dict[str, str]] = {}
+
+        for i, (filename, content) in enumerate(files):
+            try:
+                reason = self.prescreen(filename, content, timings)
+                if reason is not None:
+                    results[i] = self.skipped_metadata(reason)
+                    continue
+                embedded = embedded_by_file[i] = self.read_embedded(
+                    filename, content, timings
+                )
+                text_fields = self.text_fields(fields, embedded, metadata_first)
+                if not text_fields:
+                    # Metadata-first and the file's own metadata is enough
+                    results[i] = self.merge_embedded(
+                        self.empty_metadata(), embedded, fields, text_fields
+                    )
+                    self._log_extracted(filename, results[i])
+                    continue
+                # PDFs stream page by page and large text files block by
+                # block; neither gains anything from batching
+                if filename.lower().endswith(".pdf"):
+                    stream = self._extract_pdf
+                elif self.streams_text(filename, content):
+                    stream = self._extract_text_stream
+                else:
+                    stream = None
+                if stream is not None:
+                    metadata = stream(filename, content, text_fields, timings)
+                    results[i] = self.merge_embedded(metadata, embedded, fields, text_fields)
+                    self._log_extracted(filename, results[i])
+                    continue
+                stage = "text_" + (Path(filename).suffix.lower()[1:] or "txt")
+                with _stage(timings, stage):
+                    text = TextExtractor.extract_text(filename, content)
+                reason = self._little_text_reason(filename, text)
+                if reason is not None:
+                    results[i] = self.skipped_metadata(reason)
+                elif (
+                    len(text) > NLP_CHUNK_CHARS
+                    or self.incremental(len(text))
+                    or text_fields != fields
+                ):
+                    # The batch below runs one pipeline variant for all fields
+                    metadata = self.extract_from_text(text, text_fields, timings)
+                    results[i] = self.merge_embedded(metadata, embedded, fields, text_fields)
+                    self._log_extracted(filename, results[i])
+                else:
+                    texts.append(text)
+                    positions.append(i)
+            except Exception as e:
+                logger.error(f"Error extracting metadata from {filename}: {e}")
+                results[i] = ValueError(f"Failed to extract metadata: {str(e)}")
+
+        try:
+            docs = self.nlp.pipe(
+                texts,
+                batch_size=batch_size,
+                n_process=n_process,
+                disable=self.disabled_for(fields),
+            )
+            timed = self._timed_batches(docs, timings, "nlp", batch_size)
+            for i, doc in zip(positions, timed):
+                metadata = self._extract_timed(doc, fields, timings)
+                results[i] = self.merge_embedded(metadata, embedded_by_file[i], fields, fields)
+                self._log_extracted(files[i][0], results[i])
+        except Exception as e:
+            # The batch cannot tell which document failed, so finish the
+            # remaining ones individually to isolate the bad file
+            logger.warning(f"Batched NLP failed ({e}), retrying files one by one")
+            for i, text in zip(positions, texts):
+                if results[i] is not None:
+                    continue
+                filename = files[i][0]
+                try:
+                    metadata = self.extract_from_text(text, fields, timings)
+                    results[i] = self.merge_embedded(
+                        metadata, embedded_by_file[i], fields, fields
+                    )
+                    self._log_extracted(filename, results[i])
+                except Exception as e:
+                    logger.error(f"Error extracting metadata from {filename}: {e}")
+                    results[i] = ValueError(f"Failed to extract metadata: {str(e)}")
+
+        return results
+
+
+_default_extractor: Optional[MetadataExtractor] = None
+
+
+def get_metadata_extractor() -> MetadataExtractor:
+    # One extractor per process; pool workers build their own on first use
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = MetadataExtractor()
+    return _default_extractor
+
+
+_chunk_cache: Optional[ResultCache] = None
+_chunk_cache_lock = threading.Lock()
+
+
+def get_chunk_cache() -> Optional[ResultCache]:
+    # Per-chunk results, one cache per process (plus the optional SQLite
+    # tier shared by all of them); None when disabled
+    global _chunk_cache
+    if _chunk_cache is None:
+        with _chunk_cache_lock:
+            if _chunk_cache is None:
+                _chunk_cache = ResultCache(
+                    CHUNK_CACHE_MAX_BYTES,
+                    disk_path=CHUNK_CACHE_PATH,
+                    disk_max_bytes=CHUNK_CACHE_DISK_MAX_BYTES,
+                )
+    return _chunk_cache if _chunk_cache.enabled else None
+
+
+_warm_up_lock = threading.Lock()
+_warm_up_stats: Optional[Dict] = None
+
+# Touches dates, entities and key terms, so every component and matcher runs
+WARMUP_TEXT = (
+    "Annual Report by Jane Smith of Stanford University, California, "
+    "published on March 15, 2024 about machine learning."
+)
+
+
+def warm_up(document: str = WARMUP_DOCUMENT) -> Dict:
+    """Load the model, compile the matchers and run a first extraction.
+
+    ``document`` is an optional file run through the full pipeline as
+    well. Only the first call does any work; a process forked after it
+    inherits the warm state.
+    """
+    global _warm_up_stats
+    with _warm_up_lock:
+        if _warm_up_stats is None:
+            start = time.perf_counter()
+            extractor = get_metadata_extractor()
+            extractor.extract_from_text(WARMUP_TEXT)
+            if document:
+                path = Path(document)
+                extractor.extract_metadata(path.name, path)
+            _warm_up_stats = {
+                "model": ModelRegistry.fingerprint(),
+                "warm_up_document": document or None,
+                "warm_up_seconds": round(time.perf_counter() - start, 4),
+            }
+            logger.info(f"Warm-up finished in {_warm_up_stats['warm_up_seconds']}s")
+    return _warm_up_stats
+
+
+def warm_up_stats() -> Optional[Dict]:
+    # None until warm_up has finished in this process
+    return _warm_up_stats
+
+
+def extract_metadata_batch(
+    files: List[Tuple[str, Source]],
+    fields: FrozenSet[str] = METADATA_FIELDS,
+    metadata_first: bool = METADATA_FIRST,
+) -> List[Union[Dict[str, List[str]], ValueError]]:
+    # Module-level so it can be shipped to a process pool by reference
+    return get_metadata_extractor().extract_metadata_batch(
+        files, fields=fields, metadata_first=metadata_first
+    )
+
+
+def extract_metadata_batch_timed(
+    files: List[Tuple[str, Source]],
+    fields: FrozenSet[str] = METADATA_FIELDS,
+    metadata_first: bool = METADATA_FIRST,
+) -> Tuple[List[Union[Dict[str, List[str]], ValueError]], StageTimings]:
+    # Same as extract_metadata_batch, plus the stage timings so the caller
+    # (possibly in another process) can record them
+    timings = StageTimings()
+    results = get_metadata_extractor().extract_metadata_batch(
+        files, fields=fields, timings=timings, metadata_first=metadata_first
+    )
+    return results, timings
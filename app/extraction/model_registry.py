@@ -0,0 +1,107 @@
+import threading
+import time
+from pathlib import Path
+import spacy
+from spacy.language import Language
+from typing import Dict, Iterable, Optional, Tuple
+from loguru import logger
+from ..config import SPACY_EXCLUDE, SPACY_MODEL
+from ..utils.memory import get_rss_bytes
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded spaCy pipelines.
+
+    Models are loaded lazily on first ``get`` and shared by every caller in
+    the process. Callers that only need part of the pipeline pass their own
+    ``disable`` list when running it instead of loading another copy. A
+    different ``exclude`` list loads a separate copy, since excluded
+    components are not in the pipeline at all.
+    """
+
+    _models: Dict[Tuple[str, Tuple[str, ...]], Language] = {}
+    _stats: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, exclude: Iterable[str]) -> Tuple[str, Tuple[str, ...]]:
+        return name, tuple(sorted(exclude))
+
+    @classmethod
+    def get(
+        cls, name: str = SPACY_MODEL, exclude: Iterable[str] = SPACY_EXCLUDE
+    ) -> Language:
+        key = cls._key(name, exclude)
+        nlp = cls._models.get(key)
+        if nlp is None:
+            with cls._lock:
+                nlp = cls._models.get(key)
+                if nlp is None:
+                    nlp = cls._load(*key)
+        return nlp
+
+    @classmethod
+    def _load(cls, name: str, exclude: Tuple[str, ...]) -> Language:
+        rss_before = get_rss_bytes()
+        start = time.perf_counter()
+        nlp = spacy.load(name, exclude=list(exclude))
+        load_seconds = time.perf_counter() - start
+        rss_after = get_rss_bytes()
+
+        cls._models[(name, exclude)] = nlp
+        cls._stats[(name, exclude)] = {
+            "version": nlp.meta.get("version"),
+            "pipeline": list(nlp.pipe_names),
+            "excluded": list(exclude),
+            "load_seconds": round(load_seconds, 4),
+            "rss_before_bytes": rss_before,
+            "rss_after_bytes": rss_after,
+            "rss_delta_bytes": rss_after - rss_before,
+            "loaded_at": time.time(),
+        }
+        logger.info(
+            f"Loaded spaCy model {name} in {load_seconds:.2f}s "
+            f"(+{(rss_after - rss_before) / (1024 * 1024):.1f} MB RSS)"
+        )
+        return nlp
+
+    @classmethod
+    def fingerprint(
+        cls, name: str = SPACY_MODEL, exclude: Iterable[str] = SPACY_EXCLUDE
+    ) -> str:
+        # Identifies the model without loading it, for cache versioning
+        key = cls._key(name, exclude)
+        if key in cls._models:
+            version = cls._models[key].meta.get("version")
+        elif Path(name).exists():
+            version = spacy.util.load_meta(Path(name) / "meta.json").get("version")
+        else:
+            version = spacy.util.get_package_version(name)
+        return f"{name}@{version}-{','.join(sorted(exclude))}"
+
+    @classmethod
+    def is_loaded(
+        cls, name: str = SPACY_MODEL, exclude: Iterable[str] = SPACY_EXCLUDE
+    ) -> bool:
+        return cls._key(name, exclude) in cls._models
+
+    @classmethod
+    def stats(
+        cls, name: Optional[str] = None, exclude: Iterable[str] = SPACY_EXCLUDE
+    ) -> Dict:
+        if name is not None:
+            return dict(cls._stats.get(cls._key(name, exclude), {}))
+        # Listed by name, followed by the excluded components if any
+        return {
+            "models": {
+                "-".join([name, ",".join(exclude)]) if exclude else name: dict(value)
+                for (name, exclude), value in cls._stats.items()
+            },
+            "rss_bytes": get_rss_bytes(),
+        }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._models.clear()
+            cls._stats.clear()
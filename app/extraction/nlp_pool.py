@@ -0,0 +1,326 @@
+import multiprocessing
+import queue
+import signal
+import sys
+import threading
+from concurrent.futures import Executor, Future
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import srsly
+from loguru import logger
+from ..config import (
+    NLP_WORKER_MAX_DOCUMENTS,
+    NLP_WORKER_MAX_START_FAILURES,
+    NLP_WORKER_START_METHOD,
+)
+from ..utils.metrics import StageTimings
+
+# POSIX shared memory blocks show up here as files
+SHM_DIR = Path("/dev/shm")
+
+
+class WorkerStartError(RuntimeError):
+    pass
+
+
+def _share_sources(files: List[Tuple]) -> Tuple[List[Tuple], List[shared_memory.SharedMemory]]:
+    # In-memory documents are copied once into shared memory and handed over
+    # as a path, which the extractors map or read like any spooled upload.
+    # Spooled uploads already are paths and pass through untouched.
+    shared, blocks = [], []
+    try:
+        for filename, content in files:
+            if isinstance(content, (bytes, bytearray)) and content and SHM_DIR.is_dir():
+                block = shared_memory.SharedMemory(create=True, size=len(content))
+                blocks.append(block)
+                block.buf[: len(content)] = content
+                block.close()
+                content = SHM_DIR / block.name
+            shared.append((filename, content))
+    except BaseException:
+        # e.g. /dev/shm full: blocks are not freed by their process exiting
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+    return shared, blocks
+
+
+def _encode(result) -> bytes:
+    # Batch results as msgpack: plain dicts, errors as strings, and the
+    # stage timings when the timed variant was called
+    timings = None
+    if isinstance(result, tuple):
+        result, timings = result
+    return srsly.msgpack_dumps(
+        {
+            "results": [
+                {"__error__": str(item)} if isinstance(item, Exception) else item
+                for item in result
+            ],
+            "timings": timings.observations if timings is not None else None,
+        }
+    )
+
+
+def _decode(payload: bytes):
+    data = srsly.msgpack_loads(payload)
+    results = [
+        ValueError(item["__error__"]) if "__error__" in item else item
+        for item in data["results"]
+    ]
+    if data["timings"] is None:
+        return results
+    timings = StageTimings()
+    for stage, seconds in data["timings"].items():
+        for value in seconds:
+            timings.add(stage, value)
+    return results, timings
+
+
+def _worker_main(conn, max_documents: int, log_level: Optional[str]):
+    # Runs in the worker process: load the model once, then serve batches
+    # until the parent hangs up or the document budget is spent
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if log_level is not None:
+        logger.remove()
+        logger.add(sys.stderr, level=log_level)
+    try:
+        from .metadata_extractor import warm_up
+
+        warm_up()
+    except Exception as e:
+        # Sent back so the parent can log why, instead of a bare EOF
+        conn.send(("failed", f"{type(e).__name__}: {e}", False))
+        conn.close()
+        return
+    conn.send(("ready", None, False))
+    handled = 0
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            break
+        try:
+            reply = ("ok", _encode(fn(*args)))
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        handled += len(args[0])
+        retiring = max_documents > 0 and handled >= max_documents
+        conn.send((*reply, retiring))
+        if retiring:
+            break
+    conn.close()
+
+
+class NLPWorkerPool(Executor):
+    """Long-lived extraction processes, each with the model loaded once.
+
+    Runs the module-level batch functions of ``metadata_extractor``
+    (``fn(files, fields)``). Files travel as paths; in-memory bytes go
+    through shared memory rather than being pickled, and results come
+    back as msgpack. A worker is replaced after ``max_documents``
+    documents, or when it dies, in which case its current batch fails.
+    After ``max_start_failures`` workers in a row fail to start (e.g. the
+    model is missing), the pool gives up and fails every queued and later
+    batch with the startup error.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        max_documents: int = NLP_WORKER_MAX_DOCUMENTS,
+        start_method: str = NLP_WORKER_START_METHOD,
+        log_level: Optional[str] = None,
+        max_start_failures: int = NLP_WORKER_MAX_START_FAILURES,
+    ):
+        self.processes = processes
+        self.max_documents = max_documents
+        self.log_level = log_level
+        self.max_start_failures = max_start_failures
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # Workers fork with spaCy already imported
+            self._context.set_forkserver_preload([f"{__package__}.metadata_extractor"])
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        # Workers alive now, and slots whose first worker has started
+        self._live = 0
+        self._started = 0
+        self._error: Optional[str] = None
+        self.restarts = 0
+        self.documents = 0
+        self._threads = [
+            threading.Thread(target=self._feed, name=f"nlp-feeder-{slot}", daemon=True)
+            for slot in range(processes)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.max_documents, self.log_level),
+            daemon=True,
+        )
+        try:
+            process.start()
+        except OSError as e:
+            parent_conn.close()
+            raise WorkerStartError(f"NLP worker failed to start: {e!r}")
+        child_conn.close()
+        # Blocks this feeder only, until the worker has loaded the model
+        try:
+            status, error, _ = parent_conn.recv()
+        except EOFError:
+            status, error = "failed", f"exited with code {self._reap(process)}"
+        if status != "ready":
+            parent_conn.close()
+            self._reap(process)
+            raise WorkerStartError(f"NLP worker failed to start: {error}")
+        with self._lock:
+            self._live += 1
+        logger.info(f"NLP worker {process.pid} ready")
+        return process, parent_conn
+
+    @staticmethod
+    def _reap(process) -> Optional[int]:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        return process.exitcode
+
+    def _retire(self, process, conn):
+        with self._lock:
+            self._live -= 1
+        conn.close()
+        self._reap(process)
+
+    def _fail(self, error: str):
+        # The pool cannot serve: fail what is queued, and wake the other
+        # feeders so they stop too
+        with self._lock:
+            self._error = error
+            tasks = []
+            while True:
+                try:
+                    tasks.append(self._tasks.get_nowait())
+                except queue.Empty:
+                    break
+        for task in tasks:
+            if task is not None and task[2].set_running_or_notify_cancel():
+                task[2].set_exception(RuntimeError(error))
+        for _ in self._threads:
+            self._tasks.put(None)
+
+    def _feed(self):
+        # One feeder thread per worker process: takes the next batch, sends
+        # it over, waits for the reply
+        process, conn = None, None
+        first, failures = True, 0
+        while True:
+            if process is None:
+                if self._closing.is_set() or self._error is not None:
+                    break
+                try:
+                    process, conn = self._spawn()
+                except WorkerStartError as e:
+                    failures += 1
+                    logger.error(str(e))
+                    if failures >= self.max_start_failures:
+                        self._fail(f"{e} ({failures} attempts)")
+                        break
+                    self._closing.wait(1)
+                    continue
+                failures = 0
+                if first:
+                    first = False
+                    with self._lock:
+                        self._started += 1
+            task = self._tasks.get()
+            if task is None:
+                break
+            fn, args, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                files, blocks = _share_sources(args[0])
+            except OSError as e:
+                future.set_exception(e)
+                continue
+            with self._lock:
+                self.documents += len(files)
+            try:
+                conn.send((fn, (files, *args[1:])))
+                status, payload, retiring = conn.recv()
+            except (EOFError, OSError) as e:
+                status = "died"
+                payload = f"NLP worker {process.pid} exited mid-batch: {e}"
+                retiring = True
+            except Exception as e:
+                # e.g. an argument that does not pickle; the worker is fine
+                status, payload, retiring = "error", f"{type(e).__name__}: {e}", False
+            # Released before the caller sees the result
+            for block in blocks:
+                block.unlink()
+            if status == "ok":
+                future.set_result(_decode(payload))
+            else:
+                future.set_exception(RuntimeError(payload))
+            if retiring:
+                self._retire(process, conn)
+                with self._lock:
+                    self.restarts += 1
+                process = None
+        if process is not None:
+            self._retire(process, conn)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._error is None:
+                self._tasks.put((fn, args, future))
+                return future
+        future.set_exception(RuntimeError(self._error))
+        return future
+
+    @property
+    def ready(self) -> bool:
+        # Once every worker has started for the first time; a worker being
+        # replaced after its document budget does not make the pool unready
+        return self._error is None and self._started == self.processes
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    def stats(self) -> Dict:
+        return {
+            "processes": self.processes,
+            "ready": self._live,
+            "error": self._error,
+            "documents": self.documents,
+            "restarts": self.restarts,
+            "max_documents": self.max_documents,
+        }
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        # Also ends feeders still trying to start a worker
+        self._closing.set()
+        if cancel_futures:
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is not None:
+                    task[2].cancel()
+        for _ in self._threads:
+            self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
@@ -1,98 +1,109 @@
-import spacy
+import hashlib
+import json
+from spacy.language import Language
 from spacy.matcher import Matcher
-from typing import List, Tuple
+from spacy.tokens import Doc
+from spacy.util import filter_spans
+from typing import List, Optional, Tuple
+from .key_terms import KeyTermDictionary, get_key_term_dictionary
+from .model_registry import ModelRegistry
+from .postprocess import normalize_dates, parse_date
+
+# Date patterns (various common date formats)
+DATE_PATTERNS = [
+    [
+        {"SHAPE": "dddd"},
+        {"TEXT": "-"},
+        {"SHAPE": "dd"},
+        {"TEXT": "-"},
+        {"SHAPE": "dd"},
+    ],  # 2025-07-28
+    [
+        {"SHAPE": "dd"},
+        {"TEXT": "/"},
+        {"SHAPE": "dd"},
+        {"TEXT": "/"},
+        {"SHAPE": "dddd"},
+    ],  # 28/07/2025
+    [
+        {"POS": "PROPN", "IS_TITLE": True},
+        {"SHAPE": "dd"},
+        {"TEXT": ","},
+        {"SHAPE": "dddd"},
+    ],  # July 28, 2025
+    [
+        {"SHAPE": "dd"},
+        {"POS": "PROPN", "IS_TITLE": True},
+        {"SHAPE": "dddd"},
+    ],  # 28 July 2025
+    [{"POS": "PROPN", "IS_TITLE": True}, {"SHAPE": "dddd"}],  # July 2025
+    # Year only; plausible years, so page numbers and quantities stay out
+    [{"TEXT": {"REGEX": r"^(1[89]|20)\d\d$"}}],
+]
 
 
 class PatternMatcher:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.matcher = Matcher(self.nlp.vocab)
-        self._setup_patterns()
+    # The patterns only read TEXT, SHAPE, LOWER and POS (tagger + attribute_ruler)
+    disabled_components = ("parser", "ner", "lemmatizer")
+
+    def __init__(
+        self,
+        nlp: Optional[Language] = None,
+        key_terms: Optional[KeyTermDictionary] = None,
+    ):
+        self._nlp = nlp
+        self._matcher: Optional[Matcher] = None
+        if key_terms is None:
+            key_terms = (
+                get_key_term_dictionary() if nlp is None else KeyTermDictionary(nlp=nlp)
+            )
+        self.key_terms = key_terms
+
+    @property
+    def nlp(self) -> Language:
+        if self._nlp is None:
+            self._nlp = ModelRegistry.get()
+        return self._nlp
 
-    def _setup_patterns(self):
-        # Date patterns (various common date formats)
-        date_patterns = [
-            [
-                {"SHAPE": "dddd"},
-                {"TEXT": "-"},
-                {"SHAPE": "dd"},
-                {"TEXT": "-"},
-                {"SHAPE": "dd"},
-            ],  # 2025-07-28
-            [
-                {"SHAPE": "dd"},
-                {"TEXT": "/"},
-                {"SHAPE": "dd"},
-                {"TEXT": "/"},
-                {"SHAPE": "dddd"},
-            ],  # 28/07/2025
-            [
-                {"POS": "PROPN", "IS_TITLE": True},
-                {"SHAPE": "dd"},
-                {"TEXT": ","},
-                {"SHAPE": "dddd"},
-            ],  # July 28, 2025
-            [
-                {"SHAPE": "dd"},
-                {"POS": "PROPN", "IS_TITLE": True},
-                {"SHAPE": "dddd"},
-            ],  # 28 July 2025
-            [{"POS": "PROPN", "IS_TITLE": True}, {"SHAPE": "dddd"}],  # July 2025
-            [{"SHAPE": "dddd"}],  # Year only
-        ]
+    @property
+    def matcher(self) -> Matcher:
+        if self._matcher is None:
+            matcher = Matcher(self.nlp.vocab)
+            self._setup_patterns(matcher)
+            self._matcher = matcher
+        return self._matcher
 
-        # Key term patterns (domain-specific)
-        key_term_patterns = [
-            [{"LOWER": "machine"}, {"LOWER": "learning"}],
-            [{"LOWER": "artificial"}, {"LOWER": "intelligence"}],
-            [{"LOWER": "natural"}, {"LOWER": "language"}, {"LOWER": "processing"}],
-            [{"LOWER": "deep"}, {"LOWER": "learning"}],
-            [{"LOWER": "neural"}, {"LOWER": "network"}],
-            [{"LOWER": "data"}, {"LOWER": "science"}],
-            [{"LOWER": "computer"}, {"LOWER": "vision"}],
-            [{"LOWER": "reinforcement"}, {"LOWER": "learning"}],
-            [{"LOWER": "supervised"}, {"LOWER": "learning"}],
-            [{"LOWER": "unsupervised"}, {"LOWER": "learning"}],
-            [{"LOWER": "big"}, {"LOWER": "data"}],
-            [{"LOWER": "data"}, {"LOWER": "mining"}],
-            [{"LOWER": "predictive"}, {"LOWER": "analytics"}],
-            [{"LOWER": "statistical"}, {"LOWER": "analysis"}],
-            [{"LOWER": "regression"}, {"LOWER": "analysis"}],
-            [{"LOWER": "classification"}],
-            [{"LOWER": "clustering"}],
-            [{"LOWER": "cloud"}, {"LOWER": "computing"}],
-            [{"LOWER": "blockchain"}],
-            [{"LOWER": "internet"}, {"LOWER": "of"}, {"LOWER": "things"}],
-            [{"LOWER": "cybersecurity"}],
-            [{"LOWER": "software"}, {"LOWER": "engineering"}],
-            [{"LOWER": "digital"}, {"LOWER": "transformation"}],
-            [{"LOWER": "business"}, {"LOWER": "intelligence"}],
-            [{"LOWER": "enterprise"}, {"LOWER": "resource"}, {"LOWER": "planning"}],
-            [{"LOWER": "customer"}, {"LOWER": "relationship"}, {"LOWER": "management"}],
-            [{"LOWER": "research"}, {"LOWER": "methodology"}],
-            [{"LOWER": "literature"}, {"LOWER": "review"}],
-            [{"LOWER": "case"}, {"LOWER": "study"}],
-            [{"LOWER": "empirical"}, {"LOWER": "analysis"}],
-            [{"LOWER": "quantitative"}, {"LOWER": "research"}],
-            [{"LOWER": "qualitative"}, {"LOWER": "research"}],
-        ]
+    def _setup_patterns(self, matcher: Matcher):
+        matcher.add("DATE_PATTERN", DATE_PATTERNS)
 
-        self.matcher.add("DATE_PATTERN", date_patterns)
-        self.matcher.add("KEY_TERM", key_term_patterns)
+    @staticmethod
+    def fingerprint() -> str:
+        # Changes whenever a date pattern or the key-term files change
+        payload = json.dumps(DATE_PATTERNS, sort_keys=True)
+        payload += get_key_term_dictionary().fingerprint()
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
 
     def extract_patterns(self, text: str) -> Tuple[List[str], List[str]]:
-        doc = self.nlp(text)
-        matches = self.matcher(doc)
-        dates = set()
-        key_terms = set()
+        return self.match_doc(self.nlp(text, disable=self.disabled_components))
 
-        for match_id, start, end in matches:
-            label = self.nlp.vocab.strings[match_id]
-            span_text = doc[start:end].text
+    def match_doc(self, doc: Doc) -> Tuple[List[str], List[str]]:
+        return self.match_dates(doc), self.match_key_terms(doc)
 
-            if label == "DATE_PATTERN":
-                dates.add(span_text)
-            elif label == "KEY_TERM":
-                key_terms.add(span_text.lower())
+    def match_dates(self, doc: Doc, core: Optional[Tuple[int, int]] = None) -> List[str]:
+        # Date patterns read POS, so the doc needs tagger + attribute_ruler.
+        # Overlapping matches ("March 15, 2024" and "2024") collapse to the
+        # longest one that parses; results are ISO strings. With ``core``,
+        # only matches starting in that character range count.
+        parsed = {}
+        for _, start, end in self.matcher(doc):
+            if core is not None and not core[0] <= doc[start].idx < core[1]:
+                continue
+            value = parse_date(doc[start:end].text)
+            if value is not None:
+                parsed[start, end] = value
+        spans = filter_spans([doc[start:end] for start, end in parsed])
+        return normalize_dates(parsed[span.start, span.end] for span in spans)
 
-        return sorted(list(dates)), sorted(list(key_terms))
+    def match_key_terms(self, doc: Doc) -> List[str]:
+        # Key terms only read LOWER, so this works on a bare tokenized Doc
+        return self.key_terms.match(doc)
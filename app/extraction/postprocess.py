@@ -0,0 +1,112 @@
+import datetime
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [
+            ("january", "jan"),
+            ("february", "feb"),
+            ("march", "mar"),
+            ("april", "apr"),
+            ("may",),
+            ("june", "jun"),
+            ("july", "jul"),
+            ("august", "aug"),
+            ("september", "sep", "sept"),
+            ("october", "oct"),
+            ("november", "nov"),
+            ("december", "dec"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+
+_MONTH = r"(?P<month>[a-z]+)\.?"
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?P<year>\d{4})"
+# Tried in order against the whole (lowercased, whitespace-collapsed) string
+DATE_FORMATS = [
+    re.compile(rf"{_YEAR}-(?P<month>\d{{1,2}})-{_DAY}"),  # 2025-07-28
+    re.compile(rf"{_YEAR}-(?P<month>\d{{1,2}})"),  # 2025-07
+    re.compile(rf"{_DAY}[/.](?P<month>\d{{1,2}})[/.]{_YEAR}"),  # 28/07/2025
+    re.compile(rf"{_MONTH} {_DAY},? {_YEAR}"),  # July 28, 2025
+    re.compile(rf"(?:the )?{_DAY} (?:of )?{_MONTH},? {_YEAR}"),  # 28 July 2025
+    re.compile(rf"{_MONTH},? {_YEAR}"),  # July 2025
+    re.compile(_YEAR),  # 2025
+]
+
+# Dates stored by the documents themselves: PDF ("D:20240315103000+01'00'")
+# and W3CDTF, as used by DOCX core properties ("2024-03-15T10:30:00Z")
+EMBEDDED_DATE = re.compile(
+    r"(?:D:)?(?P<year>\d{4})(?:-?(?P<month>\d{2})(?:-?(?P<day>\d{2}))?)?"
+)
+
+# Distinct date strings per process stay small (the same headers and
+# boilerplate dates repeat across documents)
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text: str) -> Optional[str]:
+    """Parse a date string into ISO form: YYYY-MM-DD, YYYY-MM or YYYY.
+
+    Returns None when the string is not a complete, valid date in one of
+    the formats the date patterns match.
+    """
+    text = " ".join(text.lower().split())
+    for pattern in DATE_FORMATS:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        parts = match.groupdict()
+        year = int(parts["year"])
+        month = parts.get("month")
+        if month is None:
+            return f"{year:04d}"
+        month = int(month) if month.isdigit() else MONTHS.get(month)
+        day = parts.get("day")
+        if day is not None and pattern is DATE_FORMATS[2] and month > 12 >= int(day):
+            # Day-first unless that is impossible, then read it US-style
+            day, month = month, int(day)
+        if month is None or not 1 <= month <= 12:
+            return None
+        if day is None:
+            return f"{year:04d}-{month:02d}"
+        try:
+            return datetime.date(year, month, int(day)).isoformat()
+        except ValueError:
+            return None
+    return None
+
+
+def parse_embedded_date(value: str) -> Optional[str]:
+    # Calendar date of an embedded timestamp; the time of day is dropped
+    match = EMBEDDED_DATE.match(value.strip())
+    if match is None:
+        return None
+    return parse_date("-".join(part for part in match.groups() if part))
+
+
+def normalize_dates(values: Iterable[str]) -> List[str]:
+    """Parse, dedupe and sort date strings in one pass.
+
+    Unparsable strings are dropped, and a coarser value is dropped when a
+    finer one in the same period is present ("2024" next to "2024-03-15").
+    """
+    parsed = sorted({iso for iso in map(parse_date, values) if iso is not None})
+    # Sorted ISO strings put "2024" directly before "2024-03"
+    return [
+        value
+        for value, following in zip(parsed, parsed[1:] + [""])
+        if not following.startswith(value + "-")
+    ]
+
+
+def rank_entities(counts: Counter) -> List[str]:
+    # Unique names, most frequent first, ties alphabetical
+    return [name for name, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))]
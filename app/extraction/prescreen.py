@@ -0,0 +1,169 @@
+import codecs
+import contextlib
+import io
+import mmap
+from pathlib import Path
+from typing import Iterator, Optional, Union
+from loguru import logger
+from ..config import PRESCREEN_SAMPLE_BYTES
+from .text_extractor import Source
+
+# Reason codes for documents that get an empty result without extraction
+EMPTY = "empty"
+BINARY_CONTENT = "binary_content"
+UNSUPPORTED_ENCODING = "unsupported_encoding"
+LOW_TEXT_DENSITY = "low_text_density"
+NON_LATIN_SCRIPT = "non_latin_script"
+NO_TEXT_LAYER = "no_text_layer"
+# Set after extraction when a document yields almost no text
+LITTLE_TEXT = "little_text"
+
+# Signatures of common binary formats that sometimes arrive as .txt
+BINARY_MAGIC = (
+    b"%PDF-",
+    b"PK\x03\x04",
+    b"\x89PNG",
+    b"\xff\xd8\xff",
+    b"GIF8",
+    b"II*\x00",
+    b"MM\x00*",
+    b"\x7fELF",
+    b"\x1f\x8b",
+    b"\xd0\xcf\x11\xe0",
+)
+# UTF-16/32 byte order marks; the text decoder only handles UTF-8/Latin-1
+WIDE_BOMS = (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+
+class PreScreen:
+    """Cheap checks that run before text extraction and NLP.
+
+    ``screen`` returns a reason code for documents that cannot yield
+    metadata (empty files, binary data behind a text extension, image-only
+    PDFs) and None for everything else. It only ever reads a sample, or
+    scans a PDF for font objects without laying out any page. Files that
+    are merely malformed pass and fail in extraction as before.
+    """
+
+    # Control characters (other than whitespace) above this share mean binary
+    max_control_ratio = 0.05
+    # Letters below this share of the sample mean there is no prose to parse
+    min_letter_ratio = 0.1
+    # Latin letters below this share of all letters mean a script the
+    # English pipeline cannot handle
+    min_latin_ratio = 0.2
+
+    @classmethod
+    def screen(
+        cls, filename: str, content: Source, sample_bytes: int = PRESCREEN_SAMPLE_BYTES
+    ) -> Optional[str]:
+        size = content.stat().st_size if isinstance(content, Path) else len(content)
+        if size == 0:
+            return EMPTY
+        suffix = Path(filename).suffix.lower()
+        if suffix == ".pdf":
+            return None if cls.pdf_has_fonts(content) else NO_TEXT_LAYER
+        if suffix in (".txt", ".md"):
+            return cls.screen_text(cls._read_sample(content, sample_bytes))
+        return None
+
+    @staticmethod
+    def _read_sample(content: Source, sample_bytes: int) -> bytes:
+        if isinstance(content, Path):
+            with open(content, "rb") as f:
+                return f.read(sample_bytes)
+        return bytes(content[:sample_bytes])
+
+    @classmethod
+    def screen_text(cls, sample: bytes) -> Optional[str]:
+        if sample.startswith(WIDE_BOMS):
+            return UNSUPPORTED_ENCODING
+        if sample.startswith(BINARY_MAGIC) or b"\x00" in sample:
+            return BINARY_CONTENT
+
+        # The sample may end mid-character, so decode incrementally
+        try:
+            text = codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        except UnicodeDecodeError:
+            text = sample.decode("latin-1")
+        if not text.strip():
+            return EMPTY
+
+        control = letters = latin = 0
+        for ch in text:
+            if ch.isalpha():
+                letters += 1
+                if ch < "\u0250":
+                    latin += 1
+            elif (ch < " " and ch not in "\t\n\r\f") or "\x7f" <= ch < "\xa0":
+                control += 1
+        if control > len(text) * cls.max_control_ratio:
+            return BINARY_CONTENT
+        if letters < len(text) * cls.min_letter_ratio:
+            return LOW_TEXT_DENSITY
+        if latin < letters * cls.min_latin_ratio:
+            return NON_LATIN_SCRIPT
+        return None
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _buffer(content: Source) -> Iterator[Union[bytes, mmap.mmap]]:
+        if isinstance(content, Path):
+            with open(content, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+        else:
+            yield content
+
+    @classmethod
+    def pdf_has_fonts(cls, content: Source) -> bool:
+        # Text can only be drawn with a font, so a PDF without any /Font
+        # resource is image-only. Font dictionaries are plain objects, so a
+        # byte scan settles it unless they may hide in compressed object
+        # streams; only then are the page resources walked.
+        with cls._buffer(content) as buf:
+            if buf.find(b"%PDF-", 0, 1024) == -1:
+                # Not a PDF at all; extraction reports the real error
+                return True
+            if buf.find(b"/Font") != -1:
+                return True
+            if buf.find(b"/ObjStm") == -1:
+                return False
+        try:
+            if isinstance(content, Path):
+                with open(content, "rb") as f:
+                    return cls._pages_have_fonts(f)
+            return cls._pages_have_fonts(io.BytesIO(content))
+        except Exception as e:
+            # Let full extraction decide (and report) on unparsable files
+            logger.debug(f"PDF pre-screen could not read page resources: {e}")
+            return True
+
+    @classmethod
+    def _pages_have_fonts(cls, fp) -> bool:
+        from pdfminer.pdfpage import PDFPage
+
+        return any(
+            cls._resources_have_fonts(page.resources) for page in PDFPage.get_pages(fp)
+        )
+
+    @classmethod
+    def _resources_have_fonts(cls, resources, depth: int = 0) -> bool:
+        from pdfminer.pdftypes import PDFStream, resolve1
+
+        resources = resolve1(resources)
+        if not isinstance(resources, dict):
+            return False
+        if resolve1(resources.get("Font")):
+            return True
+        if depth >= 2:
+            return False
+        # Form XObjects carry their own resources
+        xobjects = resolve1(resources.get("XObject")) or {}
+        for xobject in xobjects.values():
+            xobject = resolve1(xobject)
+            if isinstance(xobject, PDFStream) and cls._resources_have_fonts(
+                xobject.attrs.get("Resources"), depth + 1
+            ):
+                return True
+        return False
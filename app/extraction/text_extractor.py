@@ -1,41 +1,273 @@
+import codecs
+import functools
 import io
-from pdfminer.high_level import extract_text
-from docx import Document
+import mmap
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
 from loguru import logger
+from ..config import PRESCREEN_SAMPLE_BYTES, TEXT_READ_BYTES
+from .postprocess import parse_embedded_date
+
+# pdfminer is imported on first use, so processes that never see a PDF
+# do not pay for loading it
+
+# Raw upload bytes, or the path of an upload spooled to disk
+Source = Union[bytes, Path]
+
+# Embedded metadata keys, from the PDF Info dictionary and DOCX core properties
+PDF_INFO_KEYS = {
+    "Title": "title",
+    "Author": "author",
+    "CreationDate": "created",
+    "ModDate": "modified",
+}
+DOCX_CORE_KEYS = {
+    "title": "title",
+    "creator": "author",
+    "created": "created",
+    "modified": "modified",
+}
+EMBEDDED_DATE_KEYS = ("created", "modified")
+# Authors filled in by tools, templates or unnamed accounts rather than a
+# person, compared case-insensitively
+PLACEHOLDER_AUTHORS = frozenset(
+    [
+        "python-docx",
+        "microsoft office user",
+        "administrator",
+        "windows user",
+        "user",
+        "owner",
+        "author",
+        "unknown",
+    ]
+)
+# Raw timestamps that come with a default template, not with the document
+# (python-docx's template is dated 2013-12-23)
+TEMPLATE_TIMESTAMPS = frozenset(["2013-12-23T23:15:00Z"])
+# Formats that carry embedded metadata
+EMBEDDED_FORMATS = (".pdf", ".docx")
 
 
 class TextExtractor:
     @staticmethod
-    def extract_from_pdf(content: bytes) -> str:
+    def extract_from_pdf(content: Source) -> str:
+        from pdfminer.high_level import extract_text
+
         try:
+            if isinstance(content, Path):
+                # pdfminer seeks within the file, so it never needs a full copy
+                with open(content, "rb") as f:
+                    return extract_text(f)
             return extract_text(io.BytesIO(content))
         except Exception as e:
             logger.error(f"PDF extraction error: {e}")
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
     @staticmethod
-    def extract_from_docx(content: bytes) -> str:
+    def iter_pdf_pages(content: Source, max_pages: Optional[int] = None) -> Iterator[str]:
+        # Lays out and yields one page at a time instead of the whole document
         try:
-            doc = Document(io.BytesIO(content))
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            return "\n".join(paragraphs)
+            if isinstance(content, Path):
+                with open(content, "rb") as f:
+                    yield from TextExtractor._iter_layout_pages(f, max_pages)
+            else:
+                yield from TextExtractor._iter_layout_pages(
+                    io.BytesIO(content), max_pages
+                )
+        except Exception as e:
+            logger.error(f"PDF extraction error: {e}")
+            raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+    @staticmethod
+    def _iter_layout_pages(fp, max_pages: Optional[int]) -> Iterator[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+
+        for page in extract_pages(fp, maxpages=max_pages or 0):
+            text = "".join(
+                element.get_text()
+                for element in page
+                if isinstance(element, LTTextContainer)
+            )
+            # Form feed between pages, as pdfminer's extract_text does
+            yield text + "\f"
+
+    @staticmethod
+    def extract_from_docx(content: Source) -> str:
+        # Streams the XML parts directly; python-docx is not involved
+        from .docx_reader import DocxReader
+
+        try:
+            return "\n".join(DocxReader.iter_paragraphs(content))
         except Exception as e:
             logger.error(f"DOCX extraction error: {e}")
             raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
 
     @staticmethod
-    def extract_from_txt(content: bytes) -> str:
+    def extract_from_txt(content: Source) -> str:
+        if isinstance(content, Path):
+            with open(content, "rb") as f:
+                if content.stat().st_size == 0:
+                    return ""
+                # Decode straight from the page cache instead of reading a copy
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        return TextExtractor._decode(view)
+        return TextExtractor._decode(content)
+
+    @staticmethod
+    def _decode(content) -> str:
+        # One pass in the encoding detected from the prefix, rather than a
+        # full UTF-8 attempt followed by a second full Latin-1 decode
+        try:
+            sample = bytes(content[:PRESCREEN_SAMPLE_BYTES])
+            try:
+                return str(content, TextExtractor.detect_encoding(sample))
+            except UnicodeDecodeError as e:
+                return TextExtractor._latin1_from(e)
+        except Exception as e:
+            logger.error(f"TXT extraction error: {e}")
+            raise ValueError(f"Failed to extract text from TXT: {str(e)}")
+
+    @staticmethod
+    def detect_encoding(sample: bytes) -> str:
+        # UTF-8 (BOM stripped) when the sample decodes as such, else Latin-1,
+        # which accepts any byte. The sample may end mid-character.
+        if sample.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig"
         try:
-            return content.decode("utf-8")
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+            return "utf-8"
         except UnicodeDecodeError:
+            return "latin-1"
+
+    @staticmethod
+    def _latin1_from(error: UnicodeDecodeError) -> str:
+        # The prefix looked like UTF-8 but a later byte is not: keep the text
+        # decoded so far and read the rest as Latin-1, as a file that fails
+        # UTF-8 as a whole would be
+        logger.debug(f"Not UTF-8 past byte {error.start}, reading the rest as Latin-1")
+        data = error.object
+        return str(data[: error.start], "utf-8") + str(data[error.start :], "latin-1")
+
+    @staticmethod
+    def iter_txt(content: Source, read_bytes: int = TEXT_READ_BYTES) -> Iterator[str]:
+        # Decodes ``read_bytes`` at a time and yields whole lines (a line
+        # longer than a block is yielded in parts), so a file of any size is
+        # read with a bounded buffer. Characters split between blocks are
+        # carried over by the incremental decoder.
+        try:
+            if isinstance(content, Path):
+                with open(content, "rb") as f:
+                    sample = f.read(PRESCREEN_SAMPLE_BYTES)
+                    f.seek(0)
+                    blocks = iter(functools.partial(f.read, read_bytes), b"")
+                    yield from TextExtractor._iter_decoded(
+                        blocks, TextExtractor.detect_encoding(sample), read_bytes
+                    )
+            else:
+                view = memoryview(content)
+                sample = bytes(view[:PRESCREEN_SAMPLE_BYTES])
+                blocks = (view[i : i + read_bytes] for i in range(0, len(view), read_bytes))
+                yield from TextExtractor._iter_decoded(
+                    blocks, TextExtractor.detect_encoding(sample), read_bytes
+                )
+        except Exception as e:
+            logger.error(f"TXT extraction error: {e}")
+            raise ValueError(f"Failed to extract text from TXT: {str(e)}")
+
+    @staticmethod
+    def _iter_decoded(blocks: Iterator, encoding: str, read_bytes: int) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending = ""
+        for block in blocks:
             try:
-                return content.decode("latin-1")
-            except Exception as e:
-                logger.error(f"TXT extraction error: {e}")
-                raise ValueError(f"Failed to extract text from TXT: {str(e)}")
+                decoded = decoder.decode(block)
+            except UnicodeDecodeError as e:
+                # Latin-1 accepts any byte, so this happens at most once
+                decoder = codecs.getincrementaldecoder("latin-1")()
+                decoded = TextExtractor._latin1_from(e)
+            text = pending + decoded
+            cut = text.rfind("\n") + 1
+            if cut == 0 and len(text) < read_bytes:
+                pending = text
+                continue
+            if cut == 0:
+                cut = len(text)
+            if text[:cut]:
+                yield text[:cut]
+            pending = text[cut:]
+        try:
+            pending += decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut off by the end of the file
+            pending += TextExtractor._latin1_from(e)
+        if pending:
+            yield pending
+
+    @staticmethod
+    def pdf_info(content: Source) -> Dict[str, str]:
+        # Reads the trailer and Info dictionary only; no page is laid out
+        if isinstance(content, Path):
+            with open(content, "rb") as f:
+                return TextExtractor._read_info(f)
+        return TextExtractor._read_info(io.BytesIO(content))
+
+    @staticmethod
+    def _read_info(fp) -> Dict[str, str]:
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import resolve1
+        from pdfminer.utils import decode_text
+
+        info: Dict[str, str] = {}
+        for entries in PDFDocument(PDFParser(fp)).info:
+            for key, value in entries.items():
+                value = resolve1(value)
+                if isinstance(value, bytes):
+                    value = decode_text(value)
+                if isinstance(value, str) and value.strip():
+                    info[key] = value.strip()
+        return info
+
+    @classmethod
+    def extract_embedded(cls, filename: str, content: Source) -> Dict[str, str]:
+        """Title, author and created/modified dates stored in the file itself.
+
+        Dates are returned in ISO form; keys the file does not carry (or
+        carries unparsable) are left out, as is every key for formats
+        without embedded metadata. Placeholder authors and template
+        timestamps are left out too.
+        """
+        fname_lower = filename.lower()
+        try:
+            if fname_lower.endswith(".pdf"):
+                raw, keys = cls.pdf_info(content), PDF_INFO_KEYS
+            elif fname_lower.endswith(".docx"):
+                from .docx_reader import DocxReader
+
+                raw, keys = DocxReader.core_properties(content), DOCX_CORE_KEYS
+            else:
+                return {}
+        except Exception as e:
+            logger.error(f"Embedded metadata error: {e}")
+            raise ValueError(f"Failed to read embedded metadata: {str(e)}")
+        embedded = {}
+        for raw_key, key in keys.items():
+            value = raw.get(raw_key)
+            if key == "author" and value and value.strip().lower() in PLACEHOLDER_AUTHORS:
+                continue
+            if value and key in EMBEDDED_DATE_KEYS:
+                if value.strip() in TEMPLATE_TIMESTAMPS:
+                    continue
+                value = parse_embedded_date(value)
+            if value:
+                embedded[key] = value
+        return embedded
 
     @classmethod
-    def extract_text(cls, filename: str, content: bytes) -> str:
+    def extract_text(cls, filename: str, content: Source) -> str:
         fname_lower = filename.lower()
         if fname_lower.endswith(".pdf"):
             return cls.extract_from_pdf(content)
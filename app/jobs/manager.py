@@ -0,0 +1,150 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from loguru import logger
+from .store import JobStore
+
+# Called with (file_name, path, file_hash, fields); returns the result dict
+# for the file or raises
+JobFileHandler = Callable[[str, Path, str, FrozenSet[str]], Dict]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """Runs submitted jobs on a local thread pool, one task per file.
+
+    State lives in a JobStore, so progress and finished results survive a
+    restart; ``resume`` re-queues whatever a dead process left behind.
+    Uploads stay under ``jobs_dir/<job id>`` until their file is done.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: JobFileHandler,
+        jobs_dir: str = "data/jobs",
+        max_workers: int = 2,
+        retention_seconds: int = 24 * 3600,
+    ):
+        self.store = store
+        self.handler = handler
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        # pid plus a per-process token, so a restarted server that happens to
+        # get the same pid still recognises rows claimed by its predecessor
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="job"
+                )
+        return self._pool
+
+    def new_job_dir(self) -> Tuple[str, Path]:
+        job_id = uuid.uuid4().hex
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        return job_id, job_dir
+
+    def submit(self, job_id: str, fields: FrozenSet[str], files: List[Dict]) -> Dict:
+        self.purge_expired()
+        self.store.create_job(job_id, sorted(fields), files)
+        for idx, file in enumerate(files):
+            if not file.get("error"):
+                self._get_pool().submit(self._run_file, job_id, idx)
+        self._cleanup_if_finished(job_id)
+        logger.info(f"Submitted job {job_id} with {len(files)} files")
+        return self.store.get_job(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get_job(job_id)
+
+    def results_after(self, job_id: str, after: int = 0, limit: int = 100) -> List[Dict]:
+        return self.store.results_after(job_id, after, limit)
+
+    def _is_orphaned(self, owner: Optional[str]) -> bool:
+        if not owner:
+            return True
+        pid, _, _ = owner.partition(":")
+        if owner == self.owner:
+            return False
+        if int(pid) == os.getpid():
+            return True
+        return not _pid_alive(int(pid))
+
+    def resume(self) -> int:
+        # Called at startup: reclaim files whose worker died and queue every
+        # file that has not started yet
+        requeued = self.store.requeue_orphans(self._is_orphaned)
+        queued = self.store.queued_files()
+        for job_id, idx in queued:
+            self._get_pool().submit(self._run_file, job_id, idx)
+        if queued:
+            logger.info(
+                f"Resumed {len(queued)} queued job files ({requeued} from dead workers)"
+            )
+        return len(queued)
+
+    def _run_file(self, job_id: str, idx: int):
+        file = self.store.claim_file(job_id, idx, self.owner)
+        if file is None:
+            return
+        path = Path(file["path"])
+        try:
+            result = self.handler(
+                file["file_name"], path, file["file_hash"], frozenset(file["fields"])
+            )
+            finished = self.store.finish_file(job_id, idx, result, None, self.owner)
+        except Exception as e:
+            logger.error(f"Job {job_id}: error processing {file['file_name']}: {e}")
+            finished = self.store.finish_file(job_id, idx, None, str(e), self.owner)
+        if not finished:
+            # Another worker reclaimed the file; it owns the upload now
+            return
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        self._cleanup_if_finished(job_id)
+
+    def _cleanup_if_finished(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is not None and job["status"] == "completed":
+            shutil.rmtree(self.jobs_dir / job_id, ignore_errors=True)
+            logger.info(
+                f"Job {job_id} finished: {job['completed']} done, {job['failed']} failed"
+            )
+
+    def purge_expired(self) -> int:
+        if not self.retention_seconds:
+            return 0
+        purged = self.store.purge_finished(time.time() - self.retention_seconds)
+        for job_id in purged:
+            shutil.rmtree(self.jobs_dir / job_id, ignore_errors=True)
+        return len(purged)
+
+    def shutdown(self, wait: bool = False):
+        # Files still queued stay queued in the store and resume on restart
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,237 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class JobStore:
+    """SQLite-backed job and per-file state.
+
+    Every file of a job is a row that moves from ``queued`` to ``running``
+    to ``done`` or ``failed``. Finished rows get a per-job sequence number,
+    which is the order results are streamed in and the cursor clients
+    resume from. WAL mode lets several uvicorn workers share one database.
+    """
+
+    def __init__(self, path: str = "data/jobs/jobs.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, fields TEXT, total INTEGER, "
+            "created REAL, finished REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_files ("
+            "job_id TEXT, idx INTEGER, file_name TEXT, path TEXT, "
+            "file_hash TEXT, status TEXT, owner TEXT, seq INTEGER, "
+            "result TEXT, error TEXT, PRIMARY KEY (job_id, idx))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS job_files_status ON job_files (status)"
+        )
+        self._conn.commit()
+
+    def create_job(self, job_id: str, fields: List[str], files: List[Dict]):
+        # ``files`` holds file_name plus either path/file_hash or an error
+        # for uploads that were rejected before the job started
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, NULL)",
+                (job_id, ",".join(sorted(fields)), len(files), now),
+            )
+            for idx, file in enumerate(files):
+                self._conn.execute(
+                    "INSERT INTO job_files VALUES (?, ?, ?, ?, ?, 'queued', "
+                    "NULL, NULL, NULL, NULL)",
+                    (
+                        job_id,
+                        idx,
+                        file["file_name"],
+                        file.get("path"),
+                        file.get("file_hash"),
+                    ),
+                )
+            for idx, file in enumerate(files):
+                if file.get("error"):
+                    self._finish(job_id, idx, None, file["error"], None)
+            self._conn.commit()
+
+    def claim_file(self, job_id: str, idx: int, owner: str) -> Optional[Dict]:
+        # Atomically takes a queued file; None if someone else already has it
+        with self._lock:
+            claimed = self._conn.execute(
+                "UPDATE job_files SET status = 'running', owner = ? "
+                "WHERE job_id = ? AND idx = ? AND status = 'queued'",
+                (owner, job_id, idx),
+            ).rowcount
+            self._conn.commit()
+            if not claimed:
+                return None
+            row = self._conn.execute(
+                "SELECT f.file_name, f.path, f.file_hash, j.fields "
+                "FROM job_files f JOIN jobs j ON j.id = f.job_id "
+                "WHERE f.job_id = ? AND f.idx = ?",
+                (job_id, idx),
+            ).fetchone()
+        return {
+            "file_name": row[0],
+            "path": row[1],
+            "file_hash": row[2],
+            "fields": row[3].split(","),
+        }
+
+    def finish_file(
+        self,
+        job_id: str,
+        idx: int,
+        result: Optional[Dict],
+        error: Optional[str],
+        owner: Optional[str],
+    ) -> bool:
+        # False if the file was reclaimed from ``owner`` in the meantime
+        with self._lock:
+            finished = self._finish(job_id, idx, result, error, owner)
+            self._conn.commit()
+        return finished
+
+    def _finish(
+        self,
+        job_id: str,
+        idx: int,
+        result: Optional[Dict],
+        error: Optional[str],
+        owner: Optional[str],
+    ) -> bool:
+        # The sequence number is assigned inside the UPDATE, so it is unique
+        # per job even with several processes writing
+        finished = self._conn.execute(
+            "UPDATE job_files SET status = ?, result = ?, error = ?, seq = "
+            "(SELECT COALESCE(MAX(seq), 0) + 1 FROM job_files WHERE job_id = ?) "
+            "WHERE job_id = ? AND idx = ? AND owner IS ? "
+            "AND status NOT IN ('done', 'failed')",
+            (
+                "failed" if error else "done",
+                json.dumps(result) if result is not None else None,
+                error,
+                job_id,
+                job_id,
+                idx,
+                owner,
+            ),
+        ).rowcount
+        remaining = self._conn.execute(
+            "SELECT COUNT(*) FROM job_files "
+            "WHERE job_id = ? AND status NOT IN ('done', 'failed')",
+            (job_id,),
+        ).fetchone()[0]
+        if not remaining:
+            self._conn.execute(
+                "UPDATE jobs SET finished = ? WHERE id = ? AND finished IS NULL",
+                (time.time(), job_id),
+            )
+        return bool(finished)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT fields, total, created, finished FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM job_files "
+                    "WHERE job_id = ? GROUP BY status",
+                    (job_id,),
+                ).fetchall()
+            )
+        if job[3] is not None:
+            state = "completed"
+        elif counts.get("running") or counts.get("done") or counts.get("failed"):
+            state = "running"
+        else:
+            state = "queued"
+        return {
+            "job_id": job_id,
+            "status": state,
+            "fields": job[0].split(","),
+            "total": job[1],
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "completed": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "created_at": job[2],
+            "finished_at": job[3],
+        }
+
+    def results_after(self, job_id: str, after: int = 0, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, idx, file_name, status, result, error FROM job_files "
+                "WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+        return [
+            {
+                "seq": seq,
+                "index": idx,
+                "file_name": file_name,
+                "status": file_status,
+                "result": json.loads(result) if result is not None else None,
+                "error": error,
+            }
+            for seq, idx, file_name, file_status, result, error in rows
+        ]
+
+    def requeue_orphans(self, is_orphaned: Callable[[str], bool]) -> int:
+        # Files left running by a process that is gone go back to the queue
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, idx, owner FROM job_files WHERE status = 'running'"
+            ).fetchall()
+            requeued = 0
+            for job_id, idx, owner in rows:
+                if is_orphaned(owner):
+                    requeued += self._conn.execute(
+                        "UPDATE job_files SET status = 'queued', owner = NULL "
+                        "WHERE job_id = ? AND idx = ? AND status = 'running' "
+                        "AND owner = ?",
+                        (job_id, idx, owner),
+                    ).rowcount
+            self._conn.commit()
+        return requeued
+
+    def queued_files(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT f.job_id, f.idx FROM job_files f "
+                "JOIN jobs j ON j.id = f.job_id "
+                "WHERE f.status = 'queued' ORDER BY j.created, f.idx"
+            ).fetchall()
+
+    def purge_finished(self, older_than: float) -> List[str]:
+        with self._lock:
+            job_ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT id FROM jobs WHERE finished IS NOT NULL AND finished < ?",
+                    (older_than,),
+                ).fetchall()
+            ]
+            for job_id in job_ids:
+                self._conn.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.commit()
+        return job_ids
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,76 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, status
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import FastAPI, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 import sys
 from loguru import logger
-from .models import ExtractedMetadata, UploadResponse
-from .extraction.metadata_extractor import MetadataExtractor
-from .utils.file_handlers import FileHandler
+from .models import ExtractedMetadata, JobStatus, UploadResponse
+from .config import (
+    EXTRACTION_EXECUTOR,
+    EXTRACTION_MAX_QUEUE,
+    EXTRACTION_RETRY_AFTER,
+    EXTRACTION_WORKERS,
+    FAST_LANE_MAX_BYTES,
+    FAST_LANE_MAX_QUEUE,
+    FAST_LANE_WORKERS,
+    JOB_POLL_INTERVAL,
+    JOB_RETENTION_SECONDS,
+    JOB_WORKERS,
+    JOBS_DB,
+    JOBS_DIR,
+    MAX_FILES_PER_REQUEST,
+    MAX_REQUEST_MB,
+    METRICS_ENABLED,
+    MAX_TEXT_UPLOAD_MB,
+    MAX_UPLOAD_MB,
+    METADATA_FIRST,
+    RESULT_CACHE_DISK_MAX_BYTES,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_PATH,
+    RESULTS_FLUSH_INTERVAL,
+    RESULTS_FSYNC,
+    RESULTS_MAX_BYTES,
+    RESULTS_PATH,
+    UPLOAD_SPOOL_DIR,
+    WARMUP_ON_STARTUP,
+)
+from .extraction.metadata_extractor import (
+    METADATA_FIELDS,
+    MetadataExtractor,
+    extract_metadata_batch,
+    extract_metadata_batch_timed,
+    warm_up,
+    warm_up_stats,
+)
+from .extraction.key_terms import get_key_term_dictionary
+from .extraction.model_registry import ModelRegistry
+from .jobs.manager import JobManager
+from .jobs.store import JobStore
+from .utils.cache import ResultCache
+from .utils.executor import ExtractionExecutor, QueueFullError
+from .utils.file_handlers import FileHandler, FileTooLargeError
+from .utils.metrics import (
+    BYTES,
+    CHUNK_BYTES,
+    CHUNKS,
+    DOCUMENTS,
+    LANE_SERVICE_SECONDS,
+    LANE_WAIT_SECONDS,
+    REGISTRY,
+    STAGE_SECONDS,
+    Gauge,
+    StageTimings,
+    observe_timings,
+)
+from .utils.middleware import MaxBodySizeMiddleware
+from .utils.results_sink import JsonlResultsSink
+from .utils.scheduler import BULK, FAST, LaneScheduler
 
 # Setup logging
 logger.remove()
@@ -17,14 +82,101 @@ app = FastAPI(
     description="Extract metadata (dates, authors, key terms) from documents",
     version="1.0.0",
 )
+app.add_middleware(MaxBodySizeMiddleware, max_body_bytes=MAX_REQUEST_MB * 1024 * 1024)
+
+
+def _lane_observer(lane: str):
+    if not METRICS_ENABLED:
+        return None
+
+    def observe(kind: str, seconds: float):
+        histogram = LANE_WAIT_SECONDS if kind == "wait" else LANE_SERVICE_SECONDS
+        histogram.observe(seconds, lane=lane)
+
+    return observe
+
+
+scheduler = LaneScheduler(
+    {
+        FAST: ExtractionExecutor(
+            kind=EXTRACTION_EXECUTOR,
+            max_workers=FAST_LANE_WORKERS,
+            max_queue=FAST_LANE_MAX_QUEUE,
+            name=FAST,
+            observe=_lane_observer(FAST),
+        ),
+        BULK: ExtractionExecutor(
+            kind=EXTRACTION_EXECUTOR,
+            max_workers=EXTRACTION_WORKERS,
+            max_queue=EXTRACTION_MAX_QUEUE,
+            name=BULK,
+            observe=_lane_observer(BULK),
+        ),
+    },
+    fast_max_bytes=FAST_LANE_MAX_BYTES,
+)
+
+result_cache = ResultCache(
+    RESULT_CACHE_MAX_BYTES,
+    disk_path=RESULT_CACHE_PATH,
+    disk_max_bytes=RESULT_CACHE_DISK_MAX_BYTES,
+)
 
-metadata_extractor = MetadataExtractor()
+results_sink = JsonlResultsSink(
+    RESULTS_PATH,
+    fsync=RESULTS_FSYNC,
+    flush_interval=RESULTS_FLUSH_INTERVAL,
+    max_bytes=RESULTS_MAX_BYTES,
+    observe=(
+        (lambda seconds: STAGE_SECONDS.observe(seconds, stage="write"))
+        if METRICS_ENABLED
+        else None
+    ),
+)
+
+# Read at scrape time, so they follow the scheduler even if it is replaced
+REGISTRY.register(
+    Gauge(
+        "metadata_extraction_queue_depth",
+        "Extraction calls waiting for a free worker, all lanes",
+        lambda: scheduler.queue_depth,
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "metadata_extraction_in_flight",
+        "Extraction calls running or waiting, all lanes",
+        lambda: scheduler.in_flight,
+    )
+)
+
+
+def _warm_up():
+    try:
+        warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
 
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Metadata Extraction API")
     FileHandler.create_sample_files()
+    job_manager.resume()
+    if WARMUP_ON_STARTUP:
+        if EXTRACTION_EXECUTOR == "nlp":
+            # The model lives in the NLP workers; they load it as they start
+            scheduler.start()
+        else:
+            # In the background, so /health answers while the model loads
+            asyncio.get_running_loop().run_in_executor(None, _warm_up)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    job_manager.shutdown()
+    scheduler.shutdown()
+    results_sink.close()
 
 
 @app.get("/")
@@ -32,58 +184,574 @@ async def root():
     return {"message": "Metadata Extraction API is running!", "status": "healthy"}
 
 
-@app.post("/extract", response_model=UploadResponse)
-async def extract_metadata(files: List[UploadFile] = File(...)):
-    if not files:
+@app.get("/health")
+async def health():
+    # Liveness only; see /ready for whether requests will be served fast
+    return {"status": "healthy"}
+
+
+def _readiness() -> Optional[Dict]:
+    if EXTRACTION_EXECUTOR == "nlp":
+        if not scheduler.ready:
+            return None
+        return {
+            "workers": {
+                name: lane["workers"] for name, lane in scheduler.stats()["lanes"].items()
+            }
+        }
+    return warm_up_stats()
+
+
+@app.get("/ready")
+async def ready():
+    stats = _readiness()
+    if stats is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up"},
+        )
+    return {"status": "ready", **stats}
+
+
+@app.get("/models")
+async def model_stats():
+    # Load time and RSS growth per model, used to size workers per node
+    return ModelRegistry.stats()
+
+
+@app.get("/key-terms")
+async def key_term_stats():
+    dictionary = get_key_term_dictionary()
+    dictionary.fingerprint()
+    return dictionary.stats()
+
+
+@app.get("/cache")
+async def cache_stats():
+    return result_cache.stats()
+
+
+@app.get("/scheduler")
+async def scheduler_stats():
+    # Per-lane queue depth, rejections and cumulative wait/service time
+    return scheduler.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text format; counters are per process
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated subset of "
+    + ", ".join(sorted(METADATA_FIELDS))
+    + "; only the pipeline components those fields need are run",
+)
+
+
+TIMINGS_QUERY = Query(
+    False, description="Include per-stage timings in milliseconds in the response"
+)
+
+
+METADATA_FIRST_QUERY = Query(
+    None,
+    description="Take authors and dates from the file's own metadata (PDF Info, "
+    "DOCX core properties) when present and skip extracting them from the text; "
+    "defaults to METADATA_FIRST",
+)
+
+
+def _parse_fields(fields: Optional[str]) -> FrozenSet[str]:
+    if not fields:
+        return METADATA_FIELDS
+    requested = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = requested - METADATA_FIELDS
+    if unknown or not requested:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="No files provided"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown)) or fields}",
         )
+    return requested
+
+
+def _upload_limit(filename: str) -> int:
+    # Text files stream through extraction, so they may be larger
+    if Path(filename or "").suffix.lower() in (".txt", ".md"):
+        return MAX_TEXT_UPLOAD_MB
+    return MAX_UPLOAD_MB
+
+
+def _cache_key(
+    content_hash: str, fields: FrozenSet[str], metadata_first: bool = METADATA_FIRST
+) -> str:
+    variant = "" if fields == METADATA_FIELDS else ",".join(sorted(fields))
+    if metadata_first:
+        variant += ";metadata-first"
+    return ResultCache.make_key(content_hash, variant)
+
+
+def _to_record(
+    result: ExtractedMetadata, content_hash: str, fields: FrozenSet[str]
+) -> Dict:
+    return {
+        "file_hash": content_hash,
+        "saved_at": time.time(),
+        "fields": sorted(fields),
+        **result.dict(exclude={"timings", "chunks"}),
+    }
+
+
+def _metadata_first(requested: Optional[bool]) -> bool:
+    return METADATA_FIRST if requested is None else requested
+
+
+def _client_id(request: Request) -> str:
+    # Fair-queuing key: an explicit client id, else the peer address
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    return request.client.host if request.client else ""
+
+
+def _file_format(filename: str) -> str:
+    return Path(filename).suffix.lower()[1:] or "unknown"
+
+
+def _timings_block(timings: StageTimings, started: float) -> Dict[str, float]:
+    block = {stage: round(seconds * 1000, 3) for stage, seconds in timings.totals().items()}
+    block["total"] = round((time.perf_counter() - started) * 1000, 3)
+    return block
 
-    results = []
-    errors = []
 
-    for file in files:
+def _record_extraction(
+    items: List[Tuple[str, Path, str]],
+    batch: List[Union[Dict[str, List[str]], Exception]],
+    worker_timings: Optional[StageTimings],
+    timings: Optional[StageTimings] = None,
+):
+    # Worker timings come back with the results, so this works the same
+    # for thread and process pools
+    if timings is not None and worker_timings is not None:
+        timings.merge(worker_timings)
+    if not METRICS_ENABLED:
+        return
+    observe_timings(worker_timings)
+    for (filename, path, _), metadata in zip(items, batch):
+        if isinstance(metadata, Exception):
+            outcome = "failed"
+        else:
+            outcome = "skipped" if metadata.get("skipped") else "extracted"
+        DOCUMENTS.inc(format=_file_format(filename), outcome=outcome)
+        chunks = None if isinstance(metadata, Exception) else metadata.get("chunks")
+        if chunks:
+            CHUNKS.inc(chunks["cached"], outcome="cached")
+            CHUNKS.inc(chunks["total"] - chunks["cached"], outcome="parsed")
+            CHUNK_BYTES.inc(chunks["bytes"] - chunks["bytes_reprocessed"], outcome="cached")
+            CHUNK_BYTES.inc(chunks["bytes_reprocessed"], outcome="parsed")
         try:
-            if not FileHandler.validate_file_type(file.filename):
-                errors.append(f"Unsupported file type: {file.filename}")
-                continue
+            BYTES.inc(path.stat().st_size, format=_file_format(filename))
+        except OSError:
+            pass
 
-            content = await file.read()
 
-            if not FileHandler.validate_file_size(content):
-                errors.append(f"File too large: {file.filename} (max 10MB)")
-                continue
+def _run_batch_fn(timings: Optional[StageTimings]):
+    # Timing is only collected when something will read it
+    if METRICS_ENABLED or timings is not None:
+        return extract_metadata_batch_timed
+    return extract_metadata_batch
 
-            metadata = metadata_extractor.extract_metadata(file.filename, content)
 
-            result = ExtractedMetadata(
-                file_name=file.filename,
-                dates=metadata["dates"],
-                authors=metadata["authors"],
-                key_terms=metadata["key_terms"],
-                organizations=metadata.get("organizations", []),
-                locations=metadata.get("locations", []),
+def _split_batch(result) -> Tuple[List, Optional[StageTimings]]:
+    return result if isinstance(result, tuple) else (result, None)
+
+
+def _to_result(filename: str, metadata: Dict[str, List[str]]) -> ExtractedMetadata:
+    return ExtractedMetadata(
+        file_name=filename,
+        dates=metadata["dates"],
+        authors=metadata["authors"],
+        key_terms=metadata["key_terms"],
+        organizations=metadata.get("organizations", []),
+        locations=metadata.get("locations", []),
+        skipped=metadata.get("skipped"),
+        embedded=metadata.get("embedded"),
+        sources=metadata.get("sources"),
+        chunks=metadata.get("chunks"),
+    )
+
+
+def _cacheable(metadata: Dict) -> Dict:
+    # Chunk-cache use describes one extraction, not the document
+    return {key: value for key, value in metadata.items() if key != "chunks"}
+
+
+def _chunk_totals(results: List[ExtractedMetadata]) -> Optional[Dict[str, float]]:
+    usages = [result.chunks for result in results if result.chunks]
+    if not usages:
+        return None
+    totals = {
+        key: sum(usage[key] for usage in usages)
+        for key in ("total", "cached", "bytes", "bytes_reprocessed")
+    }
+    total = totals["total"]
+    totals["hit_ratio"] = round(totals["cached"] / total, 4) if total else 0.0
+    return totals
+
+
+def _multipart_files(field: str, many: bool = True) -> Dict:
+    # Uploads are parsed from the raw request stream (see _spool_request),
+    # so the OpenAPI request body is described here instead of by File()
+    schema = {"type": "string", "format": "binary"}
+    if many:
+        schema = {"type": "array", "items": schema}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {field: schema},
+                        "required": [field],
+                    }
+                }
+            },
+        }
+    }
+
+
+async def _spool_request(
+    request: Request,
+    field: str,
+    spool_dir: Optional[str] = UPLOAD_SPOOL_DIR,
+    max_files: int = MAX_FILES_PER_REQUEST,
+    fail_fast: bool = False,
+) -> List[Dict]:
+    # Spool the uploads to disk as the body streams in, so no file is ever
+    # held in memory whole and oversized files stop being stored at the limit
+    try:
+        entries = await FileHandler.spool_multipart(
+            request.headers,
+            request.stream(),
+            field,
+            _upload_limit,
+            spool_dir=spool_dir,
+            max_files=max_files,
+            fail_fast=fail_fast,
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not entries:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body", field), "msg": "Field required"}]
+        )
+    return entries
+
+
+async def _extract_pending(
+    pending: List[Tuple[str, Path, str]],
+    fields: FrozenSet[str] = METADATA_FIELDS,
+    timings: Optional[StageTimings] = None,
+    client: str = "",
+    metadata_first: bool = METADATA_FIRST,
+) -> List[Union[Dict[str, List[str]], Exception]]:
+    # Serve repeated uploads from the cache and only extract the misses
+    cache_version = MetadataExtractor.version()
+    extracted = [
+        result_cache.get(_cache_key(content_hash, fields, metadata_first), cache_version)
+        for _, _, content_hash in pending
+    ]
+    misses = [i for i, metadata in enumerate(extracted) if metadata is None]
+    if METRICS_ENABLED:
+        for (filename, _, _), metadata in zip(pending, extracted):
+            if metadata is not None:
+                DOCUMENTS.inc(format=_file_format(filename), outcome="cached")
+
+    if misses:
+        # Small text files go to the fast lane as one nlp.pipe batch; bulk
+        # files are spread over at most as many calls as there are workers
+        sizes = [pending[i][1].stat().st_size for i in misses]
+        groups = scheduler.group((pending[i][0], size) for i, size in zip(misses, sizes))
+        tasks = []
+        try:
+            for lane, positions in groups.items():
+                items = [(misses[p], sizes[p]) for p in positions]
+                for chunk in scheduler.batches(lane, items):
+                    future = scheduler.submit(
+                        lane,
+                        _run_batch_fn(timings),
+                        [pending[i][:2] for i in chunk],
+                        fields,
+                        metadata_first,
+                        client=client,
+                    )
+                    tasks.append((chunk, future))
+        except QueueFullError as e:
+            # Queued calls are cancelled; calls already running still read
+            # the spooled files, so they finish before the caller removes them
+            started = [future for _, future in tasks if not future.cancel()]
+            if started:
+                await asyncio.gather(
+                    *(asyncio.wrap_future(future) for future in started),
+                    return_exceptions=True,
+                )
+            logger.warning(f"Rejecting request: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, retry later",
+                headers={"Retry-After": str(EXTRACTION_RETRY_AFTER)},
             )
-            results.append(result)
-            logger.info(f"Successfully processed: {file.filename}")
+        for chunk, future in tasks:
+            batch, worker_timings = _split_batch(await asyncio.wrap_future(future))
+            _record_extraction([pending[i] for i in chunk], batch, worker_timings, timings)
+            for i, metadata in zip(chunk, batch):
+                extracted[i] = metadata
+                if not isinstance(metadata, Exception):
+                    result_cache.put(
+                        _cache_key(pending[i][2], fields, metadata_first),
+                        cache_version,
+                        _cacheable(metadata),
+                    )
+
+    return extracted
+
+
+def _extract_job_file(
+    filename: str, path: Path, content_hash: str, fields: FrozenSet[str]
+) -> Dict:
+    # Runs on a job thread; shares the cache, extraction lanes and results
+    # sink with the synchronous endpoints. All jobs queue as one client, so
+    # interactive requests keep their fair share.
+    cache_version = MetadataExtractor.version()
+    key = _cache_key(content_hash, fields)
+    metadata = result_cache.get(key, cache_version)
+    if metadata is None:
+        # Jobs wait for a free slot instead of failing
+        future = scheduler.submit(
+            scheduler.classify(filename, path.stat().st_size),
+            _run_batch_fn(None),
+            [(filename, path)],
+            fields,
+            client="jobs",
+            block=True,
+        )
+        batch, worker_timings = _split_batch(future.result())
+        _record_extraction([(filename, path, content_hash)], batch, worker_timings)
+        metadata = batch[0]
+        if isinstance(metadata, Exception):
+            raise metadata
+        result_cache.put(key, cache_version, _cacheable(metadata))
+    elif METRICS_ENABLED:
+        DOCUMENTS.inc(format=_file_format(filename), outcome="cached")
+
+    result = _to_result(filename, metadata)
+    results_sink.write([_to_record(result, content_hash, fields)])
+    return result.dict(exclude={"timings", "chunks"})
+
+
+job_manager = JobManager(
+    JobStore(JOBS_DB),
+    _extract_job_file,
+    jobs_dir=JOBS_DIR,
+    max_workers=JOB_WORKERS,
+    retention_seconds=JOB_RETENTION_SECONDS,
+)
+
+
+@app.get("/results/{file_hash}")
+async def get_results(file_hash: str):
+    records = await run_in_threadpool(results_sink.find, file_hash)
+    if not records:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No results for {file_hash}",
+        )
+    return {"file_hash": file_hash, "results": records}
+
 
-        except Exception as e:
-            error_msg = f"Error processing {file.filename}: {str(e)}"
+@app.post(
+    "/extract",
+    response_model=UploadResponse,
+    response_model_exclude_none=True,
+    openapi_extra=_multipart_files("files"),
+)
+async def extract_metadata(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    timings: bool = TIMINGS_QUERY,
+    metadata_first: Optional[bool] = METADATA_FIRST_QUERY,
+):
+    requested_fields = _parse_fields(fields)
+    started = time.perf_counter()
+    stage_timings = StageTimings() if timings else None
+
+    results = []
+    records = []
+    entries = await _spool_request(request, "files")
+    pending = [
+        (entry["file_name"], entry["path"], entry["file_hash"])
+        for entry in entries
+        if "error" not in entry
+    ]
+    errors = [entry["error"] for entry in entries if "error" in entry]
+
+    try:
+        extracted = await _extract_pending(
+            pending,
+            requested_fields,
+            stage_timings,
+            _client_id(request),
+            _metadata_first(metadata_first),
+        )
+    finally:
+        FileHandler.remove_spooled([path for _, path, _ in pending])
+
+    for (filename, _, content_hash), metadata in zip(pending, extracted):
+        if isinstance(metadata, Exception):
+            error_msg = f"Error processing {filename}: {str(metadata)}"
             errors.append(error_msg)
             logger.error(error_msg)
+            continue
 
-    if results:
-        FileHandler.save_results_to_json([r.dict() for r in results])
+        result = _to_result(filename, metadata)
+        results.append(result)
+        records.append(_to_record(result, content_hash, requested_fields))
+        logger.info(f"Successfully processed: {filename}")
+
+    if records:
+        # Enqueued only; a background thread appends them to the sink
+        results_sink.write(records)
 
     message = f"Processed {len(results)} files successfully"
     if errors:
         message += f", {len(errors)} files failed"
 
-    response = UploadResponse(message=message, results=results)
+    response = UploadResponse(
+        message=message, results=results, chunks=_chunk_totals(results)
+    )
+    if stage_timings is not None:
+        response.timings = _timings_block(stage_timings, started)
 
     if errors:
         return JSONResponse(
             status_code=status.HTTP_207_MULTI_STATUS,
-            content={**response.dict(), "errors": errors},
+            content={**response.dict(exclude_none=True), "errors": errors},
         )
     return response
+
+
+@app.post(
+    "/extract-single",
+    response_model=ExtractedMetadata,
+    response_model_exclude_none=True,
+    openapi_extra=_multipart_files("file", many=False),
+)
+async def extract_single(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    timings: bool = TIMINGS_QUERY,
+    metadata_first: Optional[bool] = METADATA_FIRST_QUERY,
+):
+    requested_fields = _parse_fields(fields)
+    started = time.perf_counter()
+    stage_timings = StageTimings() if timings else None
+    [entry] = await _spool_request(request, "file", max_files=1, fail_fast=True)
+    filename, path, content_hash = entry["file_name"], entry["path"], entry["file_hash"]
+
+    try:
+        metadata = (
+            await _extract_pending(
+                [(filename, path, content_hash)],
+                requested_fields,
+                stage_timings,
+                _client_id(request),
+                _metadata_first(metadata_first),
+            )
+        )[0]
+    finally:
+        FileHandler.remove_spooled([path])
+
+    if isinstance(metadata, Exception):
+        logger.error(f"Error processing {filename}: {metadata}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(metadata)
+        )
+
+    result = _to_result(filename, metadata)
+    results_sink.write([_to_record(result, content_hash, requested_fields)])
+    logger.info(f"Successfully processed: {filename}")
+    if stage_timings is not None:
+        result.timings = _timings_block(stage_timings, started)
+    return result
+
+
+@app.post(
+    "/jobs",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=_multipart_files("files"),
+)
+async def submit_job(request: Request, fields: Optional[str] = FIELDS_QUERY):
+    # Spools the uploads under the job directory and returns immediately;
+    # files are extracted in the background
+    requested_fields = _parse_fields(fields)
+    job_id, job_dir = job_manager.new_job_dir()
+    try:
+        job_files = await _spool_request(request, "files", spool_dir=str(job_dir))
+    except BaseException:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        raise
+    for entry in job_files:
+        if "path" in entry:
+            entry["path"] = str(entry["path"])
+
+    return await run_in_threadpool(
+        job_manager.submit, job_id, requested_fields, job_files
+    )
+
+
+async def _get_job(job_id: str) -> Dict:
+    job = await run_in_threadpool(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown job {job_id}"
+        )
+    return job
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    return await _get_job(job_id)
+
+
+@app.get("/jobs/{job_id}/results")
+async def stream_job_results(job_id: str, after: int = 0):
+    # NDJSON, one line per finished file in completion order. Each line
+    # carries a ``seq``; reconnect with ?after=<last seq> to resume.
+    await _get_job(job_id)
+
+    async def lines():
+        cursor = after
+        while True:
+            # Read the state before the rows so a file finishing in between
+            # is still picked up by the next poll
+            job = await run_in_threadpool(job_manager.get, job_id)
+            rows = await run_in_threadpool(job_manager.results_after, job_id, cursor)
+            for row in rows:
+                cursor = row["seq"]
+                yield json.dumps(row) + "\n"
+            if job is None or (job["status"] == "completed" and not rows):
+                break
+            if not rows:
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
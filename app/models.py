@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 
 class ExtractedMetadata(BaseModel):
@@ -9,13 +9,40 @@ class ExtractedMetadata(BaseModel):
     key_terms: List[str]
     organizations: Optional[List[str]] = []
     locations: Optional[List[str]] = []
+    # Reason code when the document was skipped without extraction
+    skipped: Optional[str] = None
+    # Title, author and dates stored in the file itself (PDF, DOCX)
+    embedded: Optional[Dict[str, str]] = None
+    # Per field: "embedded", "text" or "embedded+text"; set with ``embedded``
+    sources: Optional[Dict[str, str]] = None
+    # Per-stage milliseconds, only when requested with ?timings=true
+    timings: Optional[Dict[str, float]] = None
+    # Chunk-cache use when the text was extracted by chunk: chunks and
+    # bytes in total, how many were cached, and bytes parsed again
+    chunks: Optional[Dict[str, Union[int, float]]] = None
 
 
 class UploadResponse(BaseModel):
     message: str
     results: List[ExtractedMetadata]
+    timings: Optional[Dict[str, float]] = None
+    # Chunk-cache use summed over the files extracted by chunk
+    chunks: Optional[Dict[str, Union[int, float]]] = None
 
 
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    fields: List[str]
+    total: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    created_at: float
+    finished_at: Optional[float] = None
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+
+class LRUCache:
+    """In-memory LRU bounded by the serialized size of its values."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, value: Dict, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk tier shared by every worker process on the node."""
+
+    _PRUNE_EVERY = 100
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, version TEXT, value TEXT, "
+            "size INTEGER, accessed REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, version: str, serialized: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, version, serialized, len(serialized), time.time()),
+            )
+            self._puts += 1
+            if self._puts % self._PRUNE_EVERY == 0:
+                self._prune()
+            self._conn.commit()
+
+    def purge_stale(self, version: str) -> int:
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM results WHERE version != ?", (version,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def _prune(self):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until we are back under the limit
+        excess = total - self.max_bytes
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM results ORDER BY accessed"
+        ).fetchall():
+            if freed >= excess:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            freed += size
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """Extraction results keyed by content hash and extractor version.
+
+    The version is part of every key, so a model or pattern change makes
+    old entries unreachable; stale disk rows are purged when the version
+    seen by this process changes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_path: str = "",
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.memory = LRUCache(max_bytes) if max_bytes > 0 else None
+        self.disk = SQLiteCache(disk_path, disk_max_bytes) if disk_path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._version: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory is not None or self.disk is not None
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, variant: str = "") -> str:
+        # Variants (e.g. a field subset) cache separately from full results
+        return f"{content_hash}:{variant}" if variant else content_hash
+
+    def _check_version(self, version: str):
+        if version == self._version:
+            return
+        self._version = version
+        if self.memory is not None:
+            self.memory.clear()
+        if self.disk is not None:
+            purged = self.disk.purge_stale(version)
+            if purged:
+                logger.info(f"Purged {purged} cached results from an older version")
+
+    def get(self, content_hash: str, version: str) -> Optional[Dict]:
+        self._check_version(version)
+        key = f"{version}:{content_hash}"
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                self.memory_hits += 1
+                return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                if self.memory is not None:
+                    self.memory.put(key, value, len(json.dumps(value)))
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, content_hash: str, version: str, value: Dict):
+        if not self.enabled:
+            return
+        self._check_version(version)
+        key = f"{version}:{content_hash}"
+        serialized = json.dumps(value, ensure_ascii=False)
+        if self.memory is not None:
+            self.memory.put(key, value, len(serialized))
+        if self.disk is not None:
+            self.disk.put(key, version, serialized)
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "version": self._version,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.memory_hits + self.disk_hits) / lookups, 4)
+                if lookups
+                else 0.0
+            ),
+            "memory_entries": len(self.memory) if self.memory is not None else 0,
+            "memory_bytes": self.memory.current_bytes if self.memory else 0,
+            "memory_evictions": self.memory.evictions if self.memory else 0,
+            "disk_enabled": self.disk is not None,
+        }
@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Callable, Deque, Dict, Optional, Tuple, TypeVar
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class ExtractionExecutor:
+    """Runs blocking extraction work off the event loop.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more
+    may wait; anything beyond that is rejected with QueueFullError. Waiting
+    jobs are queued per client and started round-robin across clients, so
+    one client's burst does not hold back everyone else's requests.
+    ``submit(..., block=True)`` waits for a free slot instead of raising.
+    ``observe(kind, seconds)`` is called with the queue wait ("wait") and
+    run time ("service") of every job.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 32,
+        name: str = "extract",
+        observe: Optional[Callable[[str, float], None]] = None,
+    ):
+        if kind not in ("thread", "process", "nlp"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self.observe = observe
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        # Notified whenever a job gives its slot back
+        self._slot_freed = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_seconds = 0.0
+        self._service_seconds = 0.0
+        # Waiting jobs per client, and the order clients are served in
+        self._waiting: Dict[str, Deque[Tuple]] = {}
+        self._clients: Deque[str] = deque()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif self.kind == "nlp":
+                from ..extraction.nlp_pool import NLPWorkerPool
+
+                self._pool = NLPWorkerPool(self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            logger.info(
+                f"Started {self.kind} pool {self.name} with {self.max_workers} workers"
+            )
+        return self._pool
+
+    def _acquire(self, block: bool = False):
+        with self._lock:
+            limit = self.max_workers + self.max_queue
+            if block:
+                self._slot_freed.wait_for(lambda: self._in_flight < limit)
+            elif self._in_flight >= limit:
+                self._rejected += 1
+                raise QueueFullError(
+                    f"Extraction queue is full ({self._in_flight} jobs in flight)"
+                )
+            self._in_flight += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+            self._slot_freed.notify()
+
+    def _release_if_cancelled(self, future: Future):
+        # A job cancelled while waiting gives its slot back right away; the
+        # dispatcher drops it from the queue when its turn comes
+        if future.cancelled():
+            self._release()
+
+    def _next_job(self) -> Optional[Tuple]:
+        # Called with the lock held: the first waiting job of the next client
+        while self._clients and self._running < self.max_workers:
+            client = self._clients.popleft()
+            queue = self._waiting[client]
+            job = queue.popleft()
+            if queue:
+                self._clients.append(client)
+            else:
+                del self._waiting[client]
+            future = job[2]
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._running += 1
+            return job
+        return None
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                job = self._next_job()
+            if job is None:
+                return
+            fn, args, future, queued_at = job
+            started = time.perf_counter()
+            self._record("wait", started - queued_at)
+            try:
+                inner = self._get_pool().submit(fn, *args)
+            except Exception as e:
+                self._finish(started)
+                future.set_exception(e)
+                continue
+            inner.add_done_callback(
+                lambda inner, future=future, started=started: self._complete(
+                    inner, future, started
+                )
+            )
+
+    def _complete(self, inner: Future, future: Future, started: float):
+        self._finish(started)
+        error = CancelledError() if inner.cancelled() else inner.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(inner.result())
+        self._dispatch()
+
+    def _finish(self, started: float):
+        service = time.perf_counter() - started
+        with self._lock:
+            self._running -= 1
+            self._in_flight -= 1
+            self._completed += 1
+            self._slot_freed.notify()
+        self._record("service", service)
+
+    def _record(self, kind: str, seconds: float):
+        with self._lock:
+            if kind == "wait":
+                self._wait_seconds += seconds
+            else:
+                self._service_seconds += seconds
+        if self.observe is not None:
+            self.observe(kind, seconds)
+
+    def submit(
+        self, fn: Callable[..., T], *args, client: str = "", block: bool = False
+    ) -> "Future[T]":
+        # In process mode ``fn`` and its arguments must be picklable
+        self._acquire(block)
+        future: "Future[T]" = Future()
+        with self._lock:
+            if client not in self._waiting:
+                self._waiting[client] = deque()
+                self._clients.append(client)
+            self._waiting[client].append((fn, args, future, time.perf_counter()))
+        future.add_done_callback(self._release_if_cancelled)
+        self._dispatch()
+        return future
+
+    async def run(self, fn: Callable[..., T], *args, client: str = "") -> T:
+        return await asyncio.wrap_future(self.submit(fn, *args, client=client))
+
+    def start(self):
+        # Creates the pool up front instead of on the first call
+        self._get_pool()
+
+    @property
+    def ready(self) -> bool:
+        # Only NLP workers have to load anything before they can serve
+        return self.kind != "nlp" or (self._pool is not None and self._pool.ready)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self._running)
+
+    def stats(self) -> Dict:
+        stats = {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "waiting_clients": len(self._clients),
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "wait_seconds_total": round(self._wait_seconds, 4),
+            "service_seconds_total": round(self._service_seconds, 4),
+        }
+        if self.kind == "nlp" and self._pool is not None:
+            stats["workers"] = self._pool.stats()
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            waiting = [job for queue in self._waiting.values() for job in queue]
+            self._waiting.clear()
+            self._clients.clear()
+        for _, _, future, _ in waiting:
+            future.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
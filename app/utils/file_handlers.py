@@ -1,8 +1,19 @@
 import os
-import json
-from typing import List, Dict
+import hashlib
+import tempfile
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Optional
 from pathlib import Path
 from loguru import logger
+from multipart.exceptions import FormParserError
+from multipart.multipart import MultipartParser, parse_options_header
+
+
+class FileTooLargeError(ValueError):
+    pass
+
+
+class UnsupportedFileTypeError(ValueError):
+    pass
 
 
 class FileHandler:
@@ -18,16 +29,27 @@ class FileHandler:
         return size_mb <= max_size_mb
 
     @staticmethod
-    def save_results_to_json(
-        results: List[Dict], output_path: str = "data/output/results.json"
-    ):
-        try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            logger.info(f"Results saved to {output_path}")
-        except Exception as e:
-            logger.error(f"Failed to save results: {e}")
+    async def spool_multipart(
+        headers: Mapping[str, str],
+        stream: AsyncIterator[bytes],
+        field: str,
+        max_size_mb: Callable[[str], int],
+        spool_dir: Optional[str] = None,
+        max_files: int = 0,
+        fail_fast: bool = False,
+    ) -> List[Dict]:
+        # Spool the ``field`` files of a multipart body straight from the
+        # request stream; see MultipartSpooler
+        spooler = MultipartSpooler(field, max_size_mb, spool_dir, max_files, fail_fast)
+        return await spooler.spool(headers, stream)
+
+    @staticmethod
+    def remove_spooled(paths: List[Path]):
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
 
     @staticmethod
     def create_sample_files():
@@ -55,3 +77,155 @@ Location: Waterloo, Canada
         with open(sample_dir / "sample_research.txt", "w") as f:
             f.write(sample_content)
         logger.info(f"Sample files created in {sample_dir}")
+
+
+class MultipartSpooler:
+    """Spools the files of a multipart/form-data body to disk as it arrives.
+
+    Each file part named ``field`` goes to its own temp file as the body
+    streams in, hashed on the way, so neither the body nor a file is ever
+    held whole in memory or copied twice. A part of an unsupported
+    type, beyond ``max_files`` or over ``max_size_mb(filename)`` is dropped
+    as soon as that is known and the rest of its bytes are not stored.
+    ``spool`` returns one entry per file part: ``file_name`` plus either
+    ``path`` and ``file_hash`` or ``error``. With ``fail_fast`` the first
+    such error is raised instead. Spooled files are removed by the caller,
+    or here if the body cannot be read to the end.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        max_size_mb: Callable[[str], int],
+        spool_dir: Optional[str] = None,
+        max_files: int = 0,
+        fail_fast: bool = False,
+    ):
+        self.field = field
+        self.max_size_mb = max_size_mb
+        self.spool_dir = spool_dir
+        self.max_files = max_files
+        self.fail_fast = fail_fast
+        self.entries: List[Dict] = []
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        # The file part being written, if any
+        self._entry: Optional[Dict] = None
+        self._out = None
+        self._digest = None
+        self._size = 0
+        self._max_bytes = 0
+
+    async def spool(
+        self, headers: Mapping[str, str], stream: AsyncIterator[bytes]
+    ) -> List[Dict]:
+        content_type, params = parse_options_header(headers.get("content-type", ""))
+        if content_type != b"multipart/form-data":
+            return []
+        if b"boundary" not in params:
+            raise ValueError("Invalid multipart body: missing boundary")
+        parser = MultipartParser(
+            params[b"boundary"],
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+        try:
+            async for chunk in stream:
+                parser.write(chunk)
+            parser.finalize()
+            if self._out is not None:
+                raise ValueError("Invalid multipart body: truncated")
+        except FormParserError as e:
+            self._remove_all()
+            raise ValueError(f"Invalid multipart body: {str(e)}")
+        except BaseException:
+            self._remove_all()
+            raise
+        return self.entries
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if name != self.field or b"filename" not in options:
+            # Other form fields are not needed, so their data is skipped
+            return
+        filename = options[b"filename"].decode("utf-8", errors="replace")
+        entry = {"file_name": filename}
+        self.entries.append(entry)
+        if self.max_files and len(self.entries) > self.max_files:
+            self._reject(
+                entry, ValueError(f"Too many files: {filename} (max {self.max_files})")
+            )
+        elif not FileHandler.validate_file_type(filename):
+            error = UnsupportedFileTypeError(f"Unsupported file type: {filename}")
+            self._reject(entry, error)
+        else:
+            suffix = Path(filename).suffix.lower()
+            fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix, dir=self.spool_dir)
+            entry["path"] = Path(path)
+            self._entry = entry
+            self._out = os.fdopen(fd, "wb")
+            self._digest = hashlib.sha256()
+            self._size = 0
+            self._max_bytes = self.max_size_mb(filename) * 1024 * 1024
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._out is None:
+            return
+        chunk = data[start:end]
+        self._size += len(chunk)
+        if self._size > self._max_bytes:
+            entry = self._entry
+            self._close()
+            FileHandler.remove_spooled([entry.pop("path")])
+            filename = entry["file_name"]
+            limit = self.max_size_mb(filename)
+            error = FileTooLargeError(f"File too large: {filename} (max {limit}MB)")
+            self._reject(entry, error)
+            return
+        self._digest.update(chunk)
+        self._out.write(chunk)
+
+    def _on_part_end(self):
+        if self._out is not None:
+            self._entry["file_hash"] = self._digest.hexdigest()
+            self._close()
+
+    def _reject(self, entry: Dict, error: ValueError):
+        if self.fail_fast:
+            raise error
+        entry["error"] = str(error)
+
+    def _close(self):
+        self._out.close()
+        self._out = None
+        self._entry = None
+
+    def _remove_all(self):
+        if self._out is not None:
+            self._close()
+        FileHandler.remove_spooled(
+            [entry["path"] for entry in self.entries if "path" in entry]
+        )
@@ -0,0 +1,255 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, from sub-millisecond matcher calls to long PDFs
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in items
+        ]
+
+
+class Gauge(_Metric):
+    """Unlabelled gauge read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.fn = fn
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.fn())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum, count
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()
+            )
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+class StageTimings:
+    """Seconds spent per pipeline stage, one entry per timed section.
+
+    Only plain dicts and lists inside, so it pickles back from pool workers
+    and the parent can feed the entries into histograms.
+    """
+
+    def __init__(self):
+        self.observations: Dict[str, List[float]] = {}
+        # Running sum over all stages, so nested timers can leave out time
+        # already charged to an inner stage
+        self.total = 0.0
+
+    def add(self, stage: str, seconds: float):
+        self.observations.setdefault(stage, []).append(seconds)
+        self.total += seconds
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def merge(self, other: "StageTimings"):
+        for stage, seconds in other.observations.items():
+            self.observations.setdefault(stage, []).extend(seconds)
+        self.total += other.total
+
+    def totals(self) -> Dict[str, float]:
+        return {stage: sum(seconds) for stage, seconds in self.observations.items()}
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "metadata_stage_seconds",
+        "Time spent per extraction stage (screen, text_<format>, nlp, match, write)",
+        ["stage"],
+    )
+)
+DOCUMENTS = REGISTRY.register(
+    Counter(
+        "metadata_documents_total",
+        "Documents handled, by format and outcome (extracted, skipped, failed, cached)",
+        ["format", "outcome"],
+    )
+)
+BYTES = REGISTRY.register(
+    Counter(
+        "metadata_bytes_total",
+        "Bytes of uploaded documents run through extraction",
+        ["format"],
+    )
+)
+
+LANE_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "metadata_lane_wait_seconds",
+        "Time extraction calls waited for a worker, by scheduler lane",
+        ["lane"],
+    )
+)
+LANE_SERVICE_SECONDS = REGISTRY.register(
+    Histogram(
+        "metadata_lane_service_seconds",
+        "Time extraction calls ran on a worker, by scheduler lane",
+        ["lane"],
+    )
+)
+
+CHUNKS = REGISTRY.register(
+    Counter(
+        "metadata_chunks_total",
+        "Text chunks of incrementally extracted documents, by outcome (cached, parsed)",
+        ["outcome"],
+    )
+)
+CHUNK_BYTES = REGISTRY.register(
+    Counter(
+        "metadata_chunk_bytes_total",
+        "Text bytes of incrementally extracted documents, by outcome (cached, parsed)",
+        ["outcome"],
+    )
+)
+
+
+def observe_timings(timings: Optional[StageTimings]):
+    if timings is None:
+        return
+    for stage, seconds in timings.observations.items():
+        for value in seconds:
+            STAGE_SECONDS.observe(value, stage=stage)
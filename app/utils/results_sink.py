@@ -0,0 +1,226 @@
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+
+class JsonlResultsSink:
+    """Append-only JSON Lines writer with background batched flushing.
+
+    ``write`` only enqueues; a daemon thread drains the queue and appends
+    each batch with a single ``write`` on an O_APPEND descriptor while
+    holding an exclusive ``flock`` on a sidecar lock file. That keeps lines
+    whole when several uvicorn workers share the file, and lets whichever
+    worker notices the size limit rotate it safely. With the "interval"
+    policy, appends not yet fsynced are fsynced once the queue has been
+    idle for ``flush_interval``, and by ``flush`` and ``close``.
+    """
+
+    FSYNC_POLICIES = ("always", "interval", "never")
+
+    def __init__(
+        self,
+        path: str = "data/output/results.jsonl",
+        fsync: str = "interval",
+        flush_interval: float = 1.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_batch: int = 1000,
+        observe: Optional[Callable[[float], None]] = None,
+    ):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = Path(path)
+        self.fsync = fsync
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_batch = max_batch
+        # Called with the seconds each batch write took
+        self.observe = observe
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._last_fsync = 0.0
+        # Set while appends are written but not yet fsynced
+        self._unsynced = False
+        self._sync_lock = threading.Lock()
+        self.records_written = 0
+        self.rotations = 0
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._thread = threading.Thread(
+                    target=self._run, name="results-sink", daemon=True
+                )
+                self._thread.start()
+
+    def write(self, records: List[Dict]):
+        self._ensure_started()
+        for record in records:
+            self._queue.put(record)
+
+    def flush(self):
+        # Blocks until everything enqueued so far is on disk (fsynced unless
+        # the policy is "never")
+        if self._thread is not None:
+            self._queue.join()
+            self._sync()
+
+    def close(self):
+        # The writer thread fsyncs what is left before it exits
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._unsynced:
+                due = self._last_fsync + self.flush_interval
+                timeout = max(0.0, due - time.monotonic())
+            try:
+                record = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Idle with unsynced appends: the last burst gets its fsync
+                self._sync()
+                continue
+            batch = [record]
+            # Gather whatever else is already waiting into the same write
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            records = [r for r in batch if r is not None]
+            try:
+                if records:
+                    start = time.perf_counter()
+                    self._append(records)
+                    if self.observe is not None:
+                        self.observe(time.perf_counter() - start)
+            except Exception as e:
+                logger.error(f"Failed to write {len(records)} results: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._sync()
+                return
+
+    def _append(self, records: List[Dict]):
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+
+        lock_path = f"{self.path}.lock"
+        with open(lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._rotate_if_needed(len(payload))
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, payload)
+                    if self._should_fsync():
+                        os.fsync(fd)
+                        self._unsynced = False
+                    else:
+                        self._unsynced = self.fsync != "never"
+                finally:
+                    os.close(fd)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self.records_written += len(records)
+
+    def _sync(self):
+        # fsync appends that _should_fsync let through unsynced
+        with self._sync_lock:
+            if not self._unsynced:
+                return
+            self._unsynced = False
+            self._last_fsync = time.monotonic()
+        self._fsync_path(self.path)
+
+    @staticmethod
+    def _fsync_path(path: Path):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _should_fsync(self) -> bool:
+        if self.fsync == "always":
+            return True
+        if self.fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.flush_interval:
+                self._last_fsync = now
+                return True
+        return False
+
+    def _rotate_if_needed(self, incoming: int):
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+        rotated = self.path.with_name(f"{self.path.name}.{time.time_ns()}")
+        if self._unsynced:
+            # Later syncs only reach the new file
+            self._fsync_path(self.path)
+        os.rename(self.path, rotated)
+        self.rotations += 1
+        logger.info(f"Rotated results file to {rotated}")
+
+    def _files_newest_first(self) -> List[Path]:
+        rotated = sorted(
+            self.path.parent.glob(f"{self.path.name}.*[0-9]"),
+            key=lambda p: int(p.suffix[1:]),
+            reverse=True,
+        )
+        return ([self.path] if self.path.exists() else []) + rotated
+
+    def find(self, file_hash: str) -> List[Dict]:
+        # Newest records first; the substring test skips JSON parsing of
+        # every line that cannot match
+        matches = []
+        for path in self._files_newest_first():
+            with open(path, encoding="utf-8") as f:
+                lines = [line for line in f if file_hash in line]
+            for line in reversed(lines):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("file_hash") == file_hash:
+                    matches.append(record)
+        return matches
+
+    def stats(self) -> Dict:
+        return {
+            "path": str(self.path),
+            "pending": self._queue.qsize(),
+            "records_written": self.records_written,
+            "rotations": self.rotations,
+            "fsync": self.fsync,
+        }
@@ -0,0 +1,84 @@
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple, TypeVar
+from .executor import ExtractionExecutor
+
+T = TypeVar("T")
+
+FAST = "fast"
+BULK = "bulk"
+# Formats cheap enough to extract that only their size decides the lane
+FAST_FORMATS = (".txt", ".md")
+
+
+class LaneScheduler:
+    """Routes extraction work to a lane by document format and size.
+
+    Small text and markdown files go to the fast lane, everything else to
+    the bulk lane. Each lane is its own ExtractionExecutor, with its own
+    pool, concurrency limit and queue, so a large PDF never holds up a
+    small note. Within a lane, clients are served round-robin.
+    """
+
+    def __init__(self, lanes: Dict[str, ExtractionExecutor], fast_max_bytes: int):
+        self.lanes = lanes
+        self.fast_max_bytes = fast_max_bytes
+
+    def classify(self, filename: str, size: int) -> str:
+        if Path(filename).suffix.lower() in FAST_FORMATS and size <= self.fast_max_bytes:
+            return FAST
+        return BULK
+
+    def group(self, items: Iterable[Tuple[str, int]]) -> Dict[str, List[int]]:
+        # Positions of ``(filename, size)`` items per lane, in input order
+        groups: Dict[str, List[int]] = {}
+        for i, (filename, size) in enumerate(items):
+            groups.setdefault(self.classify(filename, size), []).append(i)
+        return groups
+
+    def batches(self, lane: str, items: List[Tuple[int, int]]) -> List[List[int]]:
+        # Splits ``(position, size)`` items of one lane into extraction calls.
+        # Fast-lane files go as one nlp.pipe batch. Bulk files are spread
+        # over at most max_workers calls, largest first onto the lightest,
+        # so a request takes no more slots than the lane has workers.
+        if lane == FAST:
+            return [[position for position, _ in items]]
+        count = min(len(items), max(1, self.lanes[lane].max_workers))
+        calls: List[List[int]] = [[] for _ in range(count)]
+        loads = [0] * count
+        for position, size in sorted(items, key=lambda item: -item[1]):
+            lightest = loads.index(min(loads))
+            calls[lightest].append(position)
+            loads[lightest] += size
+        return [sorted(call) for call in calls]
+
+    def submit(
+        self, lane: str, fn: Callable[..., T], *args, client: str = "", block: bool = False
+    ) -> "Future[T]":
+        return self.lanes[lane].submit(fn, *args, client=client, block=block)
+
+    def start(self):
+        for lane in self.lanes.values():
+            lane.start()
+
+    @property
+    def ready(self) -> bool:
+        return all(lane.ready for lane in self.lanes.values())
+
+    @property
+    def in_flight(self) -> int:
+        return sum(lane.in_flight for lane in self.lanes.values())
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(lane.queue_depth for lane in self.lanes.values())
+
+    def stats(self) -> Dict:
+        return {
+            "fast_max_bytes": self.fast_max_bytes,
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+        }
+
+    def shutdown(self, wait: bool = True):
+        for lane in self.lanes.values():
+            lane.shutdown(wait=wait)
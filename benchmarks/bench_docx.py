@@ -0,0 +1,72 @@
+"""DOCX text extraction: streaming XML reader against python-docx.
+
+Generates seeded .docx files (see benchmarks.corpus) and times, per size,
+the python-docx object model the extractor used to build against
+DocxReader, which stream-parses the XML parts. Also checks that both see
+the same body paragraphs.
+
+Usage: python -m benchmarks.bench_docx [--sizes 100KB,1MB,10MB] [--files 3]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.extraction.docx_reader import DocxReader
+from benchmarks.corpus import generate_corpus, parse_size
+
+
+def python_docx_paragraphs(path: Path) -> List[str]:
+    from docx import Document
+
+    return [p.text for p in Document(str(path)).paragraphs if p.text.strip()]
+
+
+def streamed_paragraphs(path: Path) -> List[str]:
+    return list(DocxReader.iter_paragraphs(path))
+
+
+def best_of(fn: Callable, paths: List[Path], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100KB,1MB,10MB")
+    parser.add_argument("--files", default=3, type=int, help="Files per size")
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument("--seed", default=0, type=int)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'python-docx s':>14} {'streaming s':>12} {'speed-up':>9} {'MB/s':>8}")
+    with tempfile.TemporaryDirectory(prefix="bench-docx-") as tmp:
+        for size in args.sizes.split(","):
+            documents = generate_corpus(
+                Path(tmp) / size, args.seed, args.files, [parse_size(size)], ["docx"]
+            )
+            paths = [Path(d["path"]) for d in documents]
+            for path in paths:
+                if python_docx_paragraphs(path) != streamed_paragraphs(path):
+                    raise SystemExit(f"Paragraphs differ for {path.name}")
+
+            baseline = best_of(python_docx_paragraphs, paths, args.repeat)
+            streamed = best_of(streamed_paragraphs, paths, args.repeat)
+            text_mb = parse_size(size) * len(paths) / 1024 / 1024
+            print(
+                f"{size:>8} {baseline:>14.3f} {streamed:>12.3f} "
+                f"{baseline / streamed:>8.2f}x {text_mb / streamed:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Key-term match time as the dictionary grows from 30 to 100k terms.
+
+Compares the PhraseMatcher-backed KeyTermDictionary with the token-pattern
+Matcher it replaced. Runs on a blank English tokenizer, so no trained model
+is required.
+
+Usage: python -m benchmarks.bench_key_terms [--sizes 30,1000,10000,100000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import spacy
+from spacy.matcher import Matcher
+
+from app.extraction.key_terms import KeyTermDictionary
+
+SAMPLE = Path("data/sample_documents/sample_research.txt")
+
+
+def synthetic_terms(count: int, seed: int = 13):
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choices(alphabet, k=rng.randint(4, 10))) for _ in range(5000)]
+    terms = set()
+    while len(terms) < count:
+        terms.add(" ".join(rng.choices(words, k=rng.randint(1, 3))))
+    return sorted(terms)
+
+
+def time_calls(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="30,1000,10000,100000")
+    parser.add_argument("--repeat", default=50, type=int)
+    parser.add_argument(
+        "--matcher-limit",
+        default=10000,
+        type=int,
+        help="largest dictionary to also run through the token Matcher",
+    )
+    args = parser.parse_args()
+
+    nlp = spacy.blank("en")
+    text = SAMPLE.read_text() * 20 if SAMPLE.exists() else "machine learning " * 500
+    doc = nlp.make_doc(text)
+    print(f"document: {len(doc)} tokens\n")
+    print(f"{'terms':>8} {'compile s':>10} {'reload s':>9} {'phrase ms':>10} {'matcher ms':>11}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        terms = synthetic_terms(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            terms_dir = Path(tmp) / "terms"
+            terms_dir.mkdir()
+            (terms_dir / "terms.txt").write_text("\n".join(terms))
+            artifact = str(Path(tmp) / "terms.msgpack")
+
+            compiled = KeyTermDictionary(nlp, str(terms_dir), artifact, reload_interval=0)
+            compiled.match(doc)
+            reloaded = KeyTermDictionary(nlp, str(terms_dir), artifact, reload_interval=0)
+            reloaded.match(doc)
+            phrase_ms = time_calls(lambda: reloaded.match(doc), args.repeat)
+
+        matcher_ms = float("nan")
+        if size <= args.matcher_limit:
+            matcher = Matcher(nlp.vocab)
+            matcher.add(
+                "KEY_TERM",
+                [[{"LOWER": word} for word in term.split()] for term in terms],
+            )
+            matcher_ms = time_calls(lambda: matcher(doc), args.repeat)
+
+        print(
+            f"{size:>8} {compiled.load_seconds:>10.3f} {reloaded.load_seconds:>9.3f} "
+            f"{phrase_ms:>10.3f} {matcher_ms:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Throughput of the NLP worker pool from 1 to N processes.
+
+Generates a seeded corpus (see benchmarks.corpus), then for each process
+count starts an NLPWorkerPool, waits for every worker to load the model,
+and times extracting the whole corpus one document per call with all
+calls in flight. Reports docs/s, speed-up over one process and parallel
+efficiency; a final in-process thread run shows the GIL-bound baseline.
+
+Usage: python -m benchmarks.bench_nlp_pool [--processes 1,2,4] [--files 32]
+           [--size 20KB] [--formats txt,md]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.extraction.metadata_extractor import (
+    METADATA_FIELDS,
+    extract_metadata_batch,
+    warm_up,
+)
+from app.extraction.nlp_pool import NLPWorkerPool
+from benchmarks.corpus import generate_corpus, parse_size
+from benchmarks.suite import quiet_logging
+
+
+def run_all(submit: Callable, files: List) -> float:
+    start = time.perf_counter()
+    futures = [submit(extract_metadata_batch, [item], METADATA_FIELDS) for item in files]
+    for future in futures:
+        future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    default_processes = ",".join(
+        str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)
+    )
+    parser.add_argument("--processes", default=default_processes)
+    parser.add_argument("--files", default=32, type=int, help="Files per format")
+    parser.add_argument("--size", default="20KB")
+    parser.add_argument("--formats", default="txt,md")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument(
+        "--bytes",
+        action="store_true",
+        help="Send file contents (through shared memory) instead of paths",
+    )
+    args = parser.parse_args()
+    quiet_logging()
+
+    with tempfile.TemporaryDirectory(prefix="bench-pool-") as tmp:
+        documents = generate_corpus(
+            Path(tmp), args.seed, args.files, [parse_size(args.size)], args.formats.split(",")
+        )
+        files = [
+            (Path(d["path"]).name, Path(d["path"]).read_bytes() if args.bytes else Path(d["path"]))
+            for d in documents
+        ]
+        print(f"{len(files)} documents of {args.size}, {os.cpu_count()} CPUs")
+        print(f"{'processes':>9} {'docs/s':>10} {'speed-up':>9} {'efficiency':>11}")
+
+        base = None
+        for processes in (int(n) for n in args.processes.split(",")):
+            pool = NLPWorkerPool(processes, max_documents=0, log_level="WARNING")
+            try:
+                while not pool.ready:
+                    time.sleep(0.1)
+                # One untimed pass so every worker has seen each format
+                run_all(pool.submit, files[: processes * 2])
+                elapsed = run_all(pool.submit, files)
+            finally:
+                pool.shutdown()
+            rate = len(files) / elapsed
+            base = base or rate
+            print(
+                f"{processes:>9} {rate:>10.2f} {rate / base:>8.2f}x "
+                f"{rate / base / processes:>10.0%}"
+            )
+
+        warm_up()
+        threads = max(int(n) for n in args.processes.split(","))
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            elapsed = run_all(executor.submit, files)
+        rate = len(files) / elapsed
+        print(f"{threads:>7}t {rate:>10.2f} {rate / base:>8.2f}x   (threads, one process)")
+
+
+if __name__ == "__main__":
+    main()
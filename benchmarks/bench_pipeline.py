@@ -0,0 +1,78 @@
+"""Compare docs/sec of the legacy three-parse path and the single-parse pipeline,
+and of the reduced pipeline variants used for ?fields= requests.
+
+Usage: python -m benchmarks.bench_pipeline [--corpus DIR] [--repeat N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.extraction.metadata_extractor import MetadataExtractor
+from app.extraction.text_extractor import TextExtractor
+from app.utils.file_handlers import FileHandler
+
+
+def load_corpus(corpus_dir: Path) -> List[str]:
+    texts = []
+    for path in sorted(corpus_dir.rglob("*")):
+        if path.is_file() and FileHandler.validate_file_type(path.name):
+            texts.append(TextExtractor.extract_text(path.name, path.read_bytes()))
+    return texts
+
+
+def legacy_three_parse(extractor: MetadataExtractor, text: str):
+    # The pre-refactor path: pattern matching, authors and entities each
+    # re-run the full pipeline over the same text
+    extractor.pattern_matcher.extract_patterns(text)
+    extractor.extract_authors_ner(text)
+    extractor.extract_additional_entities(text)
+
+
+def measure(fn: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    return (len(texts) * repeat) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default="data/sample_documents", type=Path)
+    parser.add_argument("--repeat", default=20, type=int)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus)
+    if not texts:
+        sys.exit(f"No supported documents found in {args.corpus}")
+
+    extractor = MetadataExtractor()
+    # Warm up both paths so model loading is not counted
+    legacy_three_parse(extractor, texts[0])
+    extractor.extract_from_text(texts[0])
+
+    before = measure(lambda t: legacy_three_parse(extractor, t), texts, args.repeat)
+    after = measure(extractor.extract_from_text, texts, args.repeat)
+
+    print(f"documents:     {len(texts)} x {args.repeat}")
+    print(f"three-parse:   {before:8.1f} docs/sec")
+    print(f"single-parse:  {after:8.1f} docs/sec")
+    print(f"speedup:       {after / before:8.2f}x")
+
+    print("\nfield selection:")
+    for fields in (["key_terms"], ["dates", "key_terms"], ["authors"]):
+        selected = frozenset(fields)
+        extractor.extract_from_text(texts[0], selected)
+        rate = measure(
+            lambda t: extractor.extract_from_text(t, selected), texts, args.repeat
+        )
+        print(f"  {','.join(fields):<16} {rate:8.1f} docs/sec ({rate / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Generate a reproducible synthetic corpus of .txt, .md, .docx and .pdf files.
+
+The same seed, sizes and formats always give the same text, so benchmark
+runs on different machines or commits read identical input. Sizes are the
+amount of text per document; binary formats end up somewhat larger or
+smaller on disk. No network access is needed.
+
+Usage: python -m benchmarks.corpus OUT_DIR [--seed N] [--files N]
+           [--sizes 1KB,100KB,10MB] [--formats txt,md,docx,pdf]
+"""
+import argparse
+import io
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+FORMATS = ("txt", "md", "docx", "pdf")
+
+FILLER = (
+    "the a of and to in for on with by from as at this that these results "
+    "study report analysis system model approach method data evaluation "
+    "performance proposed shows describes improves compares measures across "
+    "several new large small baseline significant further recent current "
+    "section table figure experiment dataset sample error rate accuracy "
+    "process design framework benchmark review summary overview project team"
+).split()
+FIRST_NAMES = ["John", "Sarah", "Maria", "David", "Aisha", "Wei", "Olga", "Carlos"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Chen", "Kumar", "Novak", "Okafor", "Silva"]
+ORGANIZATIONS = ["Stanford University", "Google", "Microsoft", "MIT", "OpenAI", "IBM"]
+PLACES = ["California", "London", "Berlin", "Tokyo", "Nairobi", "Toronto"]
+KEY_TERMS = [
+    "machine learning", "artificial intelligence", "deep learning",
+    "neural network", "data science", "natural language processing",
+    "computer vision", "robotics", "algorithm", "big data",
+]
+MONTHS = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if value.endswith(unit):
+            return int(float(value[: -len(unit)]) * _UNITS[unit])
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _date(rng: random.Random) -> str:
+    year, month, day = rng.randint(1990, 2030), rng.randint(1, 12), rng.randint(1, 28)
+    style = rng.randrange(3)
+    if style == 0:
+        return f"{year}-{month:02d}-{day:02d}"
+    if style == 1:
+        return f"{day:02d}/{month:02d}/{year}"
+    return f"{MONTHS[month - 1]} {day:02d}, {year}"
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(FILLER) for _ in range(rng.randint(8, 18))]
+    # Sprinkle in the things the extractor looks for
+    roll = rng.random()
+    if roll < 0.15:
+        words.insert(rng.randrange(len(words)), f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+    elif roll < 0.25:
+        words.insert(rng.randrange(len(words)), rng.choice(ORGANIZATIONS))
+    elif roll < 0.32:
+        words.insert(rng.randrange(len(words)), rng.choice(PLACES))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words)), rng.choice(KEY_TERMS))
+    if rng.random() < 0.1:
+        words.append(f"on {_date(rng)}")
+    return words[0].capitalize() + " " + " ".join(words[1:]) + "."
+
+
+def make_paragraphs(rng: random.Random, size: int) -> List[str]:
+    # Header with the usual front-matter, then filler up to ``size`` chars
+    paragraphs = [
+        f"Technical Report {rng.randint(1, 999)}",
+        f"Author: {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        f"Date: {_date(rng)}",
+    ]
+    total = sum(len(p) + 1 for p in paragraphs)
+    while total < size:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 1
+    return paragraphs
+
+
+def write_txt(path: Path, paragraphs: List[str]):
+    path.write_text("\n".join(paragraphs), encoding="utf-8")
+
+
+def write_md(path: Path, paragraphs: List[str]):
+    lines = [f"# {paragraphs[0]}", "", f"- {paragraphs[1]}", f"- {paragraphs[2]}", ""]
+    for i, paragraph in enumerate(paragraphs[3:]):
+        if i % 10 == 0:
+            lines.extend([f"## Section {i // 10 + 1}", ""])
+        lines.extend([paragraph, ""])
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def write_docx(path: Path, paragraphs: List[str]):
+    from docx import Document
+
+    document = Document()
+    document.add_heading(paragraphs[0], level=1)
+    for paragraph in paragraphs[1:]:
+        document.add_paragraph(paragraph)
+    document.save(str(path))
+
+
+def _wrap(paragraphs: List[str], width: int = 90) -> List[str]:
+    lines = []
+    for paragraph in paragraphs:
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + len(word) + 1 > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+    return lines
+
+
+def write_pdf(path: Path, paragraphs: List[str], lines_per_page: int = 50):
+    # Minimal uncompressed PDF, one Helvetica text line per row
+    lines = [
+        line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        for line in _wrap(paragraphs)
+    ]
+    pages = [lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(
+            f"({line}) Tj T*" for line in page
+        ) + " ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        kids.append(f"{len(objects) - 1} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n".encode()
+    )
+    path.write_bytes(out.getvalue())
+
+
+WRITERS = {"txt": write_txt, "md": write_md, "docx": write_docx, "pdf": write_pdf}
+
+
+def generate_corpus(
+    out_dir: Path,
+    seed: int = 0,
+    files: int = 8,
+    sizes: Sequence[int] = (1024,),
+    formats: Sequence[str] = FORMATS,
+) -> List[Dict]:
+    """Write ``files`` documents per (format, size) pair into ``out_dir``.
+
+    Returns one entry per document with its path, format and text size.
+    A manifest makes reruns with the same parameters reuse the files.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown formats: {', '.join(sorted(unknown))}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    params = {"seed": seed, "files": files, "sizes": list(sizes), "formats": list(formats)}
+    manifest_path = out_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest["params"] == params and all(
+            Path(entry["path"]).exists() for entry in manifest["documents"]
+        ):
+            return manifest["documents"]
+
+    documents = []
+    for fmt in formats:
+        for size in sizes:
+            for i in range(files):
+                # Seeded per document, so adding sizes or formats leaves the
+                # existing documents unchanged
+                rng = random.Random(f"{seed}:{size}:{i}")
+                path = out_dir / f"{fmt}_{format_size(size)}_{i:04d}.{fmt}"
+                WRITERS[fmt](path, make_paragraphs(rng, size))
+                documents.append(
+                    {"path": str(path), "format": fmt, "size": format_size(size)}
+                )
+    manifest_path.write_text(json.dumps({"params": params, "documents": documents}))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--files", default=8, type=int, help="Files per format and size")
+    parser.add_argument("--sizes", default="1KB,100KB")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    args = parser.parse_args()
+
+    documents = generate_corpus(
+        args.out_dir,
+        seed=args.seed,
+        files=args.files,
+        sizes=[parse_size(s) for s in args.sizes.split(",")],
+        formats=args.formats.split(","),
+    )
+    print(f"{len(documents)} documents in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""Load test of the API over HTTP, driven by a saved scenario.
+
+Starts `uvicorn app.main:app` in a subprocess with the scenario's server
+settings (workers and environment, e.g. EXTRACTION_WORKERS, NLP_BATCH_SIZE
+or EXTRACTION_EXECUTOR), waits for GET /ready, then replays a seeded mixed
+corpus (see benchmarks.corpus) against it with an async httpx client at a
+fixed request rate (open loop) or as fast as ``concurrency`` allows
+(closed loop, rate 0). Reports throughput, p50/p95/p99 latency, the share
+of 207 responses and of errors (transport failures and 4xx/5xx), and the
+RSS of the server process tree sampled over the run. Results are written
+as JSON together with the scenario, so any run can be repeated as-is.
+
+Scenarios are JSON files (see benchmarks/scenarios); settings given on the
+command line override them. ``--compare`` prints earlier results side by
+side.
+
+Usage: python -m benchmarks.load SCENARIO [--duration 30] [--rate 4]
+           [--concurrency 8] [--workers 2] [--env KEY=VALUE ...]
+           [--url http://host:port] [--output FILE]
+       python -m benchmarks.load --compare RESULTS [RESULTS ...]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import httpx
+
+from benchmarks.corpus import generate_corpus, parse_size
+from benchmarks.suite import percentile
+
+ROOT = Path(__file__).parent.parent
+ENDPOINTS = ("/extract", "/extract-single")
+
+DEFAULTS = {
+    "endpoint": "/extract",
+    "files_per_request": 1,
+    "rate": 0,
+    "concurrency": 4,
+    "clients": 1,
+    "duration": 30,
+    "warmup": 5,
+    "query": {},
+    "corpus": {
+        "seed": 0,
+        "files": 8,
+        "sizes": ["1KB", "100KB"],
+        "formats": ["txt", "md", "docx", "pdf"],
+    },
+    "server": {"workers": 1, "env": {}},
+}
+# Server environment unless the scenario sets it: repeated documents are
+# extracted every time rather than served from the caches. Queue limits
+# stay at their defaults, so 503s under overload show up in the report.
+SERVER_ENV = {
+    "RESULT_CACHE_MAX_BYTES": "0",
+    "CHUNK_CACHE_MAX_BYTES": "0",
+}
+
+
+def load_scenario(path: Path) -> Dict:
+    scenario = json.loads(path.read_text())
+    merged = {**DEFAULTS, **scenario}
+    merged["corpus"] = {**DEFAULTS["corpus"], **scenario.get("corpus", {})}
+    merged["server"] = {**DEFAULTS["server"], **scenario.get("server", {})}
+    merged.setdefault("name", path.stem)
+    if merged["endpoint"] not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint {merged['endpoint']}, expected {ENDPOINTS}")
+    if merged["endpoint"] == "/extract-single":
+        merged["files_per_request"] = 1
+    return merged
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """RSS of a process and all its descendants (Linux only, else 0)."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            continue
+        pending.extend(_children(current))
+    return total
+
+
+class Server:
+    """uvicorn serving app.main:app in a subprocess, state in a temp dir."""
+
+    def __init__(self, workers: int, env: Dict[str, str], workdir: Path):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.log_path = workdir / "server.log"
+        self.env = {
+            **os.environ,
+            **SERVER_ENV,
+            "RESULTS_PATH": str(workdir / "results.jsonl"),
+            "JOBS_DIR": str(workdir / "jobs"),
+            "JOBS_DB": str(workdir / "jobs" / "jobs.sqlite"),
+            **{key: str(value) for key, value in env.items()},
+        }
+        self.command = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(self.port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self, timeout: float = 300):
+        log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(
+            self.command, cwd=ROOT, env=self.env, stdout=log, stderr=subprocess.STDOUT
+        )
+        log.close()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"Server exited with {self.process.returncode}:\n"
+                    f"{self.log_path.read_text()[-2000:]}"
+                )
+            try:
+                if httpx.get(f"{self.url}/ready", timeout=2).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        self.stop()
+        raise RuntimeError(f"Server not ready after {timeout:.0f}s")
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class RssSampler(threading.Thread):
+    """Samples the server's tree RSS and the completed request count."""
+
+    def __init__(self, pid: Optional[int], interval: float, completed: List[int]):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.completed = completed
+        self.samples: List[Dict] = []
+        self.started = time.perf_counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.sample()
+            self._done.wait(self.interval)
+
+    def sample(self):
+        self.samples.append({
+            "t": round(time.perf_counter() - self.started, 2),
+            "rss_mb": round(tree_rss_bytes(self.pid) / 1024 ** 2, 1) if self.pid else None,
+            "completed": self.completed[0],
+        })
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.sample()
+
+
+def build_requests(scenario: Dict, workdir: Path) -> List[List[Tuple[str, bytes]]]:
+    # Documents in a seeded shuffle, cut into requests of files_per_request,
+    # so every request mixes formats and sizes the same way on each run
+    corpus = scenario["corpus"]
+    documents = generate_corpus(
+        workdir / "corpus",
+        corpus["seed"],
+        corpus["files"],
+        [parse_size(size) for size in corpus["sizes"]],
+        corpus["formats"],
+    )
+    payloads = [
+        (Path(d["path"]).name, Path(d["path"]).read_bytes()) for d in documents
+    ]
+    random.Random(corpus["seed"]).shuffle(payloads)
+    size = scenario["files_per_request"]
+    cycle = payloads * size
+    return [cycle[i : i + size] for i in range(0, len(cycle), size)]
+
+
+async def send(
+    client: httpx.AsyncClient,
+    scenario: Dict,
+    files: List[Tuple[str, bytes]],
+    client_id: str,
+) -> Tuple[str, int]:
+    # Outcome (HTTP status or exception name) and per-file errors in a 207
+    field = "files" if scenario["endpoint"] == "/extract" else "file"
+    try:
+        response = await client.post(
+            scenario["endpoint"],
+            params=scenario["query"],
+            files=[(field, (name, content)) for name, content in files],
+            headers={"X-Client-Id": client_id},
+        )
+    except httpx.HTTPError as e:
+        return type(e).__name__, len(files)
+    if response.status_code == 207:
+        return "207", len(response.json().get("errors", []))
+    return str(response.status_code), len(files) if response.status_code >= 400 else 0
+
+
+async def run_load(
+    url: str, scenario: Dict, requests: List, duration: float, completed: List[int]
+) -> List[Dict]:
+    # Open loop at ``rate``: request i is due at i / rate seconds, and its
+    # latency counts from then, so time spent waiting for a free slot is
+    # not hidden. Closed loop at rate 0: each slot sends its next request
+    # as soon as the previous one is answered.
+    rate = scenario["rate"]
+    concurrency = scenario["concurrency"]
+    records: List[Dict] = []
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    timeout = httpx.Timeout(None)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def one(i: int, due: float):
+            files = requests[i % len(requests)]
+            client_id = f"client-{i % scenario['clients']}"
+            async with slots:
+                outcome, failed = await send(client, scenario, files, client_id)
+            finished = loop.time()
+            completed[0] += 1
+            records.append({
+                "start": due - start,
+                "latency": finished - due,
+                "outcome": outcome,
+                "files": len(files),
+                "failed_files": failed,
+            })
+
+        if rate > 0:
+            tasks = []
+            for i in range(int(duration * rate)):
+                due = start + i / rate
+                await asyncio.sleep(max(0.0, due - loop.time()))
+                tasks.append(asyncio.create_task(one(i, due)))
+            await asyncio.gather(*tasks)
+        else:
+            counter = iter(range(sys.maxsize))
+
+            async def worker():
+                while loop.time() - start < duration:
+                    await one(next(counter), loop.time())
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return records
+
+
+def summarize(records: List[Dict], elapsed: float) -> Dict:
+    latencies = [r["latency"] for r in records]
+    outcomes = Counter(r["outcome"] for r in records)
+    errors = sum(
+        n for outcome, n in outcomes.items() if not outcome.isdigit() or int(outcome) >= 400
+    )
+    total = len(records) or 1
+    files = sum(r["files"] for r in records)
+    return {
+        "requests": len(records),
+        "files": files,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_sec": round(len(records) / elapsed, 3) if elapsed else 0.0,
+        "files_per_sec": round(files / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies, default=0) * 1000, 1),
+        "outcomes": dict(sorted(outcomes.items())),
+        "error_rate": round(errors / total, 4),
+        "multi_status_rate": round(outcomes.get("207", 0) / total, 4),
+        "failed_files": sum(r["failed_files"] for r in records),
+    }
+
+
+def run(scenario: Dict, url: Optional[str], sample_interval: float) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="bench-load-") as tmp:
+        workdir = Path(tmp)
+        requests = build_requests(scenario, workdir)
+        server = None
+        if url is None:
+            settings = scenario["server"]
+            server = Server(settings["workers"], settings["env"], workdir)
+            print(f"Starting {' '.join(server.command[2:])}")
+            server.start()
+            url = server.url
+        try:
+            if scenario["warmup"]:
+                # Every format through every worker before measuring
+                warmup = {**scenario, "rate": 0}
+                asyncio.run(run_load(url, warmup, requests, scenario["warmup"], [0]))
+            completed = [0]
+            sampler = RssSampler(
+                server.process.pid if server else None, sample_interval, completed
+            )
+            sampler.start()
+            started = time.perf_counter()
+            records = asyncio.run(
+                run_load(url, scenario, requests, scenario["duration"], completed)
+            )
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+        finally:
+            if server is not None:
+                server.stop()
+
+    summary = summarize(records, elapsed)
+    rss = [s["rss_mb"] for s in sampler.samples if s["rss_mb"] is not None]
+    summary["peak_rss_mb"] = max(rss) if rss else None
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "url": url if server is None else "local",
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "scenario": scenario,
+        "summary": summary,
+        "samples": sampler.samples,
+    }
+
+
+def print_summary(report: Dict):
+    s = report["summary"]
+    print(
+        f"{s['requests']} requests ({s['files']} files) in {s['elapsed_s']}s: "
+        f"{s['requests_per_sec']} req/s, {s['files_per_sec']} files/s"
+    )
+    print(
+        f"latency p50 {s['p50_ms']} ms  p95 {s['p95_ms']} ms  p99 {s['p99_ms']} ms  "
+        f"max {s['max_ms']} ms"
+    )
+    print(
+        f"outcomes {s['outcomes']}  errors {s['error_rate']:.2%}  "
+        f"207 {s['multi_status_rate']:.2%}  failed files {s['failed_files']}"
+    )
+    if s["peak_rss_mb"] is not None:
+        print(f"server RSS peak {s['peak_rss_mb']} MB")
+
+
+def compare(paths: List[Path]):
+    print(
+        f"{'scenario':<28} {'req/s':>8} {'files/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7} {'207':>6} {'RSS MB':>7}"
+    )
+    for path in paths:
+        report = json.loads(path.read_text())
+        s = report["summary"]
+        rss = f"{s['peak_rss_mb']:>7.1f}" if s["peak_rss_mb"] is not None else f"{'-':>7}"
+        print(
+            f"{report['scenario']['name']:<28} {s['requests_per_sec']:>8.2f} "
+            f"{s['files_per_sec']:>8.2f} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} "
+            f"{s['p99_ms']:>9.1f} {s['error_rate']:>7.2%} "
+            f"{s['multi_status_rate']:>6.2%} {rss}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("scenario", nargs="?", type=Path)
+    parser.add_argument("--compare", nargs="+", type=Path, metavar="RESULTS")
+    parser.add_argument("--url", default=None, help="Test a running server instead")
+    parser.add_argument("--duration", type=float)
+    parser.add_argument("--warmup", type=float, help="Unmeasured seconds before the run")
+    parser.add_argument("--rate", type=float, help="Requests per second (0 = closed loop)")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--workers", type=int, help="uvicorn worker processes")
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="KEY=VALUE",
+        help="Server environment, on top of the scenario's",
+    )
+    parser.add_argument("--name", help="Name for this run (default: the scenario's)")
+    parser.add_argument("--sample-interval", default=1.0, type=float)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+    if args.scenario is None:
+        parser.error("a scenario file is required")
+
+    scenario = load_scenario(args.scenario)
+    for key in ("duration", "warmup", "rate", "concurrency", "name"):
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+    if args.workers is not None:
+        scenario["server"]["workers"] = args.workers
+    for item in args.env:
+        key, _, value = item.partition("=")
+        scenario["server"]["env"] = {**scenario["server"]["env"], key: value}
+
+    report = run(scenario, args.url, args.sample_interval)
+    print_summary(report)
+    output = args.output or Path("benchmarks/results") / f"load-{scenario['name']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Benchmark suite over a seeded synthetic corpus, with regression checks.
+
+For every (format, size) group of the corpus it measures:
+- single: one extraction call per document (p50/p99 latency, docs/s, MB/s)
+- batch:  the whole group in one extract_metadata_batch call
+- api:    POST /extract-single through TestClient, end to end
+
+Each scenario also reports time per stage (text_<format>, nlp, match) and
+peak RSS. Results are written as JSON. With --baseline, the run is
+compared against an earlier results file and exits with status 1 when
+throughput, p50 latency or peak memory is worse by more than --threshold.
+
+Usage: python -m benchmarks.suite [--sizes 1KB,100KB] [--files 8]
+           [--scenarios single,batch,api] [--output FILE]
+           [--baseline FILE] [--threshold 0.2]
+"""
+import argparse
+import io
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import spacy
+from loguru import logger
+
+from app.extraction.metadata_extractor import MetadataExtractor
+from app.extraction.model_registry import ModelRegistry
+from app.utils.memory import get_peak_rss_bytes, reset_peak_rss
+from app.utils.metrics import StageTimings
+from benchmarks.corpus import FORMATS, generate_corpus, parse_size
+
+SCENARIOS = ("single", "batch", "api")
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    # Nearest-rank percentile, q in [0, 100]
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(
+    latencies: List[float], total_bytes: int, timings: StageTimings, docs: int
+) -> Dict:
+    elapsed = sum(latencies)
+    return {
+        "docs": docs,
+        "docs_per_sec": round(docs / elapsed, 3) if elapsed else 0.0,
+        "mb_per_sec": round(total_bytes / elapsed / 1024 ** 2, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "stages_ms_per_doc": {
+            stage: round(seconds * 1000 / docs, 3)
+            for stage, seconds in sorted(timings.totals().items())
+        },
+    }
+
+
+def run_single(extractor: MetadataExtractor, paths: List[Path], repeat: int) -> Dict:
+    latencies = []
+    timings = StageTimings()
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            extractor.extract_metadata_batch([(path.name, path)], timings=timings)
+            latencies.append(time.perf_counter() - start)
+    total_bytes = sum(p.stat().st_size for p in paths) * repeat
+    return summarize(latencies, total_bytes, timings, len(paths) * repeat)
+
+
+def run_batch(extractor: MetadataExtractor, paths: List[Path], repeat: int) -> Dict:
+    # Latency here is per batch call; docs/s is the number to watch
+    latencies = []
+    timings = StageTimings()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor.extract_metadata_batch([(p.name, p) for p in paths], timings=timings)
+        latencies.append(time.perf_counter() - start)
+    total_bytes = sum(p.stat().st_size for p in paths) * repeat
+    return summarize(latencies, total_bytes, timings, len(paths) * repeat)
+
+
+def make_api_runner(workdir: Path) -> Callable[[List[Path], int], Dict]:
+    from fastapi.testclient import TestClient
+    from app import main
+    from app.utils.cache import ResultCache
+    from app.utils.results_sink import JsonlResultsSink
+
+    # Measure extraction, not cache hits, and keep results out of data/
+    main.result_cache = ResultCache(0)
+    main.results_sink = JsonlResultsSink(str(workdir / "results.jsonl"), fsync="never")
+    main.MAX_UPLOAD_MB = 1024
+    # app.main installs its own INFO handlers on import
+    quiet_logging()
+    client = TestClient(main.app)
+
+    def run_api(paths: List[Path], repeat: int) -> Dict:
+        latencies = []
+        timings = StageTimings()
+        payloads = [(p.name, p.read_bytes()) for p in paths]
+        for _ in range(repeat):
+            for name, content in payloads:
+                start = time.perf_counter()
+                response = client.post(
+                    "/extract-single?timings=true",
+                    files={"file": (name, io.BytesIO(content))},
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name}: HTTP {response.status_code} {response.text}")
+                for stage, ms in response.json()["timings"].items():
+                    if stage != "total":
+                        timings.add(stage, ms / 1000)
+        total_bytes = sum(len(c) for _, c in payloads) * repeat
+        return summarize(latencies, total_bytes, timings, len(paths) * repeat)
+
+    return run_api
+
+
+def quiet_logging():
+    # Per-file INFO lines would be measured along with the extraction
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+
+def measure_memory(fn: Callable[[], Dict]) -> Dict:
+    reset_peak_rss()
+    result = fn()
+    result["peak_rss_mb"] = round(get_peak_rss_bytes() / 1024 ** 2, 1)
+    return result
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    # Lists every metric that got worse than the baseline by more than
+    # ``threshold`` (a fraction, 0.2 = 20%)
+    regressions = []
+    for key, result in current["results"].items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            continue
+        checks = [
+            ("docs_per_sec", result["docs_per_sec"] < old["docs_per_sec"] * (1 - threshold)),
+            ("p50_ms", result["p50_ms"] > old["p50_ms"] * (1 + threshold)),
+            ("peak_rss_mb", result["peak_rss_mb"] > old["peak_rss_mb"] * (1 + threshold)),
+        ]
+        for metric, worse in checks:
+            if worse:
+                regressions.append(f"{key} {metric}: {old[metric]} -> {result[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", default=None, type=Path,
+                        help="Where to generate the corpus (default: a temp dir)")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--files", default=8, type=int, help="Files per format and size")
+    parser.add_argument("--sizes", default="1KB,100KB")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument("--output", default="benchmarks/results/latest.json", type=Path)
+    parser.add_argument("--baseline", default=None, type=Path)
+    parser.add_argument("--threshold", default=0.2, type=float)
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",")
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    quiet_logging()
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        corpus_dir = args.corpus or Path(tmp) / "corpus"
+        documents = generate_corpus(
+            corpus_dir, args.seed, args.files, sizes, args.formats.split(",")
+        )
+
+        extractor = MetadataExtractor()
+        # Load the model and warm up every format outside the measurements
+        for _, group in groupby(documents, key=lambda d: d["format"]):
+            first = Path(next(group)["path"])
+            extractor.extract_metadata_batch([(first.name, first)])
+        runners = {
+            "single": lambda paths: run_single(extractor, paths, args.repeat),
+            "batch": lambda paths: run_batch(extractor, paths, args.repeat),
+        }
+        if "api" in scenarios:
+            run_api = make_api_runner(Path(tmp))
+            runners["api"] = lambda paths: run_api(paths, args.repeat)
+
+        results = {}
+        for (fmt, size), group in groupby(
+            documents, key=lambda d: (d["format"], d["size"])
+        ):
+            paths = [Path(d["path"]) for d in group]
+            for scenario in scenarios:
+                key = f"{scenario}/{fmt}/{size}"
+                results[key] = measure_memory(lambda: runners[scenario](paths))
+                print(
+                    f"{key:<20} {results[key]['docs_per_sec']:>10.2f} docs/s  "
+                    f"p50 {results[key]['p50_ms']:>9.2f} ms  "
+                    f"p99 {results[key]['p99_ms']:>9.2f} ms  "
+                    f"peak {results[key]['peak_rss_mb']:>7.1f} MB"
+                )
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "files": args.files,
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "model": ModelRegistry.fingerprint(),
+            "spacy": spacy.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
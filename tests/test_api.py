@@ -3,11 +3,20 @@ from fastapi.testclient import TestClient
 import sys
 from pathlib import Path
 import io
+import hashlib
+import threading
+import time
+import json
 
 # Add the app directory to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from app import main
 from app.main import app
+from app.utils.executor import ExtractionExecutor
+from app.utils.middleware import MaxBodySizeMiddleware
+from app.utils.scheduler import BULK, FAST, LaneScheduler
+from fastapi import FastAPI, File, UploadFile
 
 client = TestClient(app)
 
@@ -25,6 +34,30 @@ class TestAPI:
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
 
+    def test_readiness_after_warm_up(self, monkeypatch):
+        """Test that /ready answers 503 until the model is warm"""
+        from app.extraction import metadata_extractor
+
+        monkeypatch.setattr(metadata_extractor, "_warm_up_stats", None)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+        metadata_extractor.warm_up(document="")
+        response = client.get("/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["warm_up_seconds"] >= 0
+
+    def test_model_stats(self):
+        """Test model registry statistics endpoint"""
+        response = client.get("/models")
+        assert response.status_code == 200
+        data = response.json()
+        assert "models" in data
+        assert data["rss_bytes"] > 0
+
     def test_single_file_upload(self):
         """Test single file upload endpoint"""
         # Create a test file
@@ -81,6 +114,255 @@ class TestAPI:
         assert isinstance(data["results"][0]["authors"], list)
         assert isinstance(data["results"][0]["key_terms"], list)
 
+    def test_multiple_file_upload_partial_failure(self):
+        """Test that one bad file yields 207 with the other results intact"""
+        files = [
+            ("files", ("good.md", io.BytesIO(b"Notes on machine learning, 2024-02-01"), "text/markdown")),
+            ("files", ("broken.docx", io.BytesIO(b"not a docx archive"), "application/octet-stream")),
+        ]
+
+        response = client.post("/extract", files=files)
+
+        assert response.status_code == 207
+        data = response.json()
+        assert [r["file_name"] for r in data["results"]] == ["good.md"]
+        assert len(data["errors"]) == 1
+        assert "broken.docx" in data["errors"][0]
+
+    def test_extract_rejected_when_queue_full(self, monkeypatch):
+        """Test that a saturated extraction lane sheds load with 503"""
+        lanes = {
+            lane: ExtractionExecutor(kind="thread", max_workers=1, max_queue=0)
+            for lane in (FAST, BULK)
+        }
+        monkeypatch.setattr(main, "scheduler", LaneScheduler(lanes, 1024))
+        release = threading.Event()
+        lanes[FAST].submit(release.wait)  # occupy the only fast slot
+
+        try:
+            files = [("files", ("doc.txt", io.BytesIO(b"Machine learning notes"), "text/plain"))]
+            response = client.post("/extract", files=files)
+        finally:
+            release.set()
+            main.scheduler.shutdown()
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(main.EXTRACTION_RETRY_AFTER)
+
+    def test_many_bulk_files_admitted_on_idle_server(self, monkeypatch):
+        """Test that a request with more bulk files than lane slots is not rejected"""
+        from tests.test_extraction import make_pdf
+
+        lanes = {
+            lane: ExtractionExecutor(kind="thread", max_workers=1, max_queue=0)
+            for lane in (FAST, BULK)
+        }
+        monkeypatch.setattr(main, "scheduler", LaneScheduler(lanes, 1024))
+        pdf = make_pdf(["Quarterly report on robotics"])
+        files = [
+            ("files", (f"report{i}.pdf", io.BytesIO(pdf), "application/pdf")) for i in range(3)
+        ]
+        try:
+            response = client.post("/extract", files=files, headers={"X-Client-Id": "many"})
+        finally:
+            main.scheduler.shutdown()
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 3
+
+    def test_rejected_request_waits_for_started_work(self, monkeypatch):
+        """Test that spooled files outlive extraction already running at a 503"""
+        from tests.test_extraction import make_pdf
+
+        lanes = {
+            lane: ExtractionExecutor(kind="thread", max_workers=1, max_queue=0)
+            for lane in (FAST, BULK)
+        }
+        monkeypatch.setattr(main, "scheduler", LaneScheduler(lanes, 1024))
+        seen = []
+
+        def slow_batch(files, fields, metadata_first):
+            time.sleep(0.3)
+            seen.extend(path.exists() for _, path in files)
+            return [main.MetadataExtractor.empty_metadata() for _ in files]
+
+        monkeypatch.setattr(main, "_run_batch_fn", lambda timings: slow_batch)
+        release = threading.Event()
+        lanes[FAST].submit(release.wait)  # the text file cannot be admitted
+        files = [
+            ("files", ("report.pdf", io.BytesIO(make_pdf(["Robotics"])), "application/pdf")),
+            ("files", ("notes.txt", io.BytesIO(b"Machine learning notes"), "text/plain")),
+        ]
+        try:
+            response = client.post("/extract", files=files, headers={"X-Client-Id": "busy"})
+        finally:
+            release.set()
+            main.scheduler.shutdown()
+        assert response.status_code == 503
+        assert seen == [True]
+
+    def test_mixed_batch_uses_both_lanes(self):
+        """Test that a batch is split between the fast and bulk lanes"""
+        from tests.test_extraction import make_pdf
+
+        before = {
+            lane: stats["completed"]
+            for lane, stats in client.get("/scheduler").json()["lanes"].items()
+        }
+        files = [
+            ("files", ("lanes.md", io.BytesIO(b"# Lane notes on deep learning"), "text/markdown")),
+            ("files", ("lanes.pdf", io.BytesIO(make_pdf(["Lane report on robotics"])), "application/pdf")),
+        ]
+        response = client.post("/extract", files=files, headers={"X-Client-Id": "lanes"})
+        assert response.status_code == 200
+        assert [r["file_name"] for r in response.json()["results"]] == ["lanes.md", "lanes.pdf"]
+
+        lanes = client.get("/scheduler").json()["lanes"]
+        assert lanes["fast"]["completed"] == before["fast"] + 1
+        assert lanes["bulk"]["completed"] == before["bulk"] + 1
+
+    def test_repeated_upload_served_from_cache(self):
+        """Test that re-uploading identical bytes hits the result cache"""
+        content = b"Cache check: deep learning report dated 2024-03-01"
+        files = [("files", ("first.txt", io.BytesIO(content), "text/plain"))]
+        first = client.post("/extract", files=files)
+        hits_before = client.get("/cache").json()["memory_hits"]
+
+        files = [("files", ("second.txt", io.BytesIO(content), "text/plain"))]
+        second = client.post("/extract", files=files)
+
+        assert second.status_code == 200
+        assert client.get("/cache").json()["memory_hits"] == hits_before + 1
+        assert second.json()["results"][0]["file_name"] == "second.txt"
+        assert (
+            second.json()["results"][0]["key_terms"]
+            == first.json()["results"][0]["key_terms"]
+        )
+
+    def test_results_readable_by_hash(self):
+        """Test that extracted results can be fetched back by content hash"""
+        content = b"Sink check: data science memo from 2024-05-05"
+        files = [("files", ("memo.txt", io.BytesIO(content), "text/plain"))]
+        assert client.post("/extract", files=files).status_code == 200
+        main.results_sink.flush()
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        response = client.get(f"/results/{content_hash}")
+        assert response.status_code == 200
+        assert response.json()["results"][0]["file_name"] == "memo.txt"
+        assert client.get("/results/0000").status_code == 404
+
+    def test_field_selection(self):
+        """Test that ?fields limits the response to the requested metadata"""
+        content = b"Fields check by John Smith: machine learning notes, 2024-06-01"
+        files = {"file": ("fields.txt", io.BytesIO(content), "text/plain")}
+        response = client.post("/extract-single?fields=dates,key_terms", files=files)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert "machine learning" in data["key_terms"]
+        assert data["authors"] == []
+
+        files = {"file": ("fields.txt", io.BytesIO(content), "text/plain")}
+        response = client.post("/extract-single?fields=dates,colour", files=files)
+        assert response.status_code == 400
+        assert "colour" in response.json()["detail"]
+
+    def test_metadata_first(self):
+        """Test that ?metadata_first answers from embedded metadata, cached separately"""
+        from tests.test_extraction import make_pdf
+
+        pdf = make_pdf(
+            ["Metadata first check on robotics"],
+            info={"Author": "Grace Hopper", "CreationDate": "D:20230704"},
+        )
+        url = "/extract-single?fields=authors,dates"
+        response = client.post(url, files={"file": ("info.pdf", io.BytesIO(pdf), "application/pdf")})
+        assert response.status_code == 200
+        assert response.json()["sources"]["authors"] == "embedded+text"
+
+        response = client.post(
+            url + "&metadata_first=true",
+            files={"file": ("info.pdf", io.BytesIO(pdf), "application/pdf")},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["authors"] == ["Grace Hopper"]
+        assert data["dates"] == ["2023-07-04"]
+        assert data["embedded"] == {"author": "Grace Hopper", "created": "2023-07-04"}
+        assert data["sources"] == {"authors": "embedded", "dates": "embedded"}
+
+    def test_edited_upload_reports_chunk_cache_use(self):
+        """Test that a re-upload after an edit reports reused chunks per request"""
+        from tests.test_extraction import long_report
+
+        def upload(text):
+            files = [("files", ("long.txt", io.BytesIO(text.encode()), "text/plain"))]
+            response = client.post("/extract", files=files)
+            assert response.status_code == 200
+            return response.json()
+
+        first = upload(long_report(lines=700))
+        second = upload(long_report(lines=700, edited=350))
+        assert second["chunks"]["cached"] > 0
+        assert second["chunks"]["bytes_reprocessed"] < second["chunks"]["bytes"]
+        assert second["chunks"]["hit_ratio"] > first["chunks"]["hit_ratio"]
+        assert second["results"][0]["chunks"] == second["chunks"]
+
+        # Chunk-cache use is not part of the saved or cached results
+        main.results_sink.flush()
+        content_hash = hashlib.sha256(long_report(lines=700).encode()).hexdigest()
+        assert "chunks" not in client.get(f"/results/{content_hash}").json()["results"][0]
+        assert "chunks" not in upload(long_report(lines=700))["results"][0]
+
+    def test_job_submit_poll_and_stream(self):
+        """Test that a job runs in the background and streams each result"""
+        files = [
+            ("files", ("job1.txt", io.BytesIO(b"Job one about machine learning, 2024-03-01"), "text/plain")),
+            ("files", ("job2.txt", io.BytesIO(b"Job two about data science and robotics"), "text/plain")),
+            ("files", ("job3.xyz", io.BytesIO(b"content"), "application/octet-stream")),
+        ]
+        response = client.post("/jobs?fields=key_terms", files=files)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["total"] == 3
+
+        # The stream stays open until the last file is done
+        with client.stream("GET", f"/jobs/{job_id}/results") as stream:
+            assert stream.headers["content-type"] == "application/x-ndjson"
+            rows = [json.loads(line) for line in stream.iter_lines() if line]
+        assert [row["seq"] for row in rows] == [1, 2, 3]
+        by_name = {row["file_name"]: row for row in rows}
+        assert "machine learning" in by_name["job1.txt"]["result"]["key_terms"]
+        assert by_name["job2.txt"]["status"] == "done"
+        assert "Unsupported file type" in by_name["job3.xyz"]["error"]
+
+        job = client.get(f"/jobs/{job_id}").json()
+        assert job["status"] == "completed"
+        assert (job["completed"], job["failed"]) == (2, 1)
+        assert job["fields"] == ["key_terms"]
+
+        resumed = client.get(f"/jobs/{job_id}/results?after=2")
+        assert [json.loads(line)["seq"] for line in resumed.text.splitlines()] == [3]
+        assert client.get("/jobs/unknown").status_code == 404
+
+    def test_metrics_and_timings(self):
+        """Test the /metrics endpoint and the opt-in timings block"""
+        content = b"Metrics check: Machine Learning notes by John Smith, 2024-07-01"
+        files = {"file": ("metrics.txt", io.BytesIO(content), "text/plain")}
+        response = client.post("/extract-single?timings=true", files=files)
+        assert response.status_code == 200
+        block = response.json()["timings"]
+        assert {"text_txt", "nlp", "match", "total"} <= set(block)
+
+        files = {"file": ("metrics.txt", io.BytesIO(content), "text/plain")}
+        assert "timings" not in client.post("/extract-single", files=files).json()
+
+        text = client.get("/metrics").text
+        assert 'metadata_stage_seconds_count{stage="nlp"}' in text
+        assert 'metadata_documents_total{format="txt",outcome="extracted"}' in text
+        assert 'metadata_documents_total{format="txt",outcome="cached"}' in text
+        assert "metadata_extraction_queue_depth 0" in text
+
     def test_unsupported_file_type(self):
         """Test upload of unsupported file type"""
         files = {
@@ -103,6 +385,7 @@ class TestAPI:
         assert len(data["dates"]) == 0
         assert len(data["authors"]) == 0
         assert len(data["key_terms"]) == 0
+        assert data["skipped"] == "empty"
 
     def test_large_file_upload(self):
         """Test upload of file that's too large"""
@@ -115,6 +398,24 @@ class TestAPI:
         assert response.status_code == 413
         assert "File too large" in response.json()["detail"]
 
+    def test_request_body_limit_while_streaming(self):
+        """Test that oversized bodies are refused before the handler reads them"""
+        limited = FastAPI()
+        limited.add_middleware(MaxBodySizeMiddleware, max_body_bytes=1024)
+
+        @limited.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            return {"size": len(await file.read())}
+
+        limited_client = TestClient(limited)
+        small = {"file": ("a.txt", io.BytesIO(b"x" * 100), "text/plain")}
+        large = {"file": ("b.txt", io.BytesIO(b"x" * 4096), "text/plain")}
+
+        assert limited_client.post("/upload", files=small).status_code == 200
+        response = limited_client.post("/upload", files=large)
+        assert response.status_code == 413
+        assert response.json()["detail"] == "Request body too large"
+
     def test_no_files_provided(self):
         """Test extract endpoint with no files"""
         response = client.post("/extract", files=[])
@@ -0,0 +1,72 @@
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.batch import BatchRunner, _truncate_partial_line, iter_files
+
+
+def _make_tree(root: Path):
+    (root / "a" / "b").mkdir(parents=True)
+    for i in range(4):
+        (root / "a" / f"doc{i}.txt").write_text(
+            f"Report {i} on machine learning by John Smith, 2024-01-0{i + 1}"
+        )
+    # Same bytes as doc0.txt under another name
+    (root / "a" / "b" / "copy.md").write_text(
+        "Report 0 on machine learning by John Smith, 2024-01-01"
+    )
+    (root / "a" / "b" / "image.png").write_bytes(b"\x89PNG")
+    (root / "a" / "b" / "broken.docx").write_bytes(b"not a docx archive")
+
+
+class TestBatch:
+    def test_walk_filters_supported_types(self, tmp_path):
+        """Test that only supported file types are picked up"""
+        _make_tree(tmp_path)
+        names = [path.name for path in iter_files(tmp_path)]
+        assert "image.png" not in names
+        assert sorted(names) == sorted(
+            ["broken.docx", "copy.md", "doc0.txt", "doc1.txt", "doc2.txt", "doc3.txt"]
+        )
+
+    def test_run_and_resume(self, tmp_path):
+        """Test a full run, then a rerun that skips everything by hash"""
+        root = tmp_path / "tree"
+        _make_tree(root)
+        output = tmp_path / "out.jsonl"
+
+        stats = BatchRunner(root, output, workers=2, shard_size=2).run()
+        assert (stats["done"], stats["failed"], stats["skipped"]) == (4, 1, 1)
+        assert stats["files_per_second"] > 0
+        assert {"hash", "text_txt", "nlp", "match", "write"} <= set(stats["stage_seconds"])
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert len(records) == 5
+        by_path = {record["path"]: record for record in records}
+        assert "error" in by_path["a/b/broken.docx"]
+        done = [r for r in records if "error" not in r]
+        assert all("machine learning" in r["key_terms"] for r in done)
+
+        # Extracted files are skipped by hash; the failed one is retried
+        stats = BatchRunner(root, output, workers=1).run()
+        assert (stats["done"], stats["failed"], stats["skipped"]) == (0, 1, 5)
+        assert len(output.read_text().splitlines()) == 6
+
+        (root / "a" / "b" / "broken.docx").unlink()
+        stats = BatchRunner(root, output, workers=1).run()
+        assert (stats["done"], stats["failed"], stats["skipped"]) == (0, 0, 5)
+
+    def test_partial_last_line_is_dropped(self, tmp_path):
+        """Test that a line cut off by a crash is removed before appending"""
+        output = tmp_path / "out.jsonl"
+        output.write_text('{"a": 1}\n{"b": ')
+        _truncate_partial_line(output)
+        assert output.read_text() == '{"a": 1}\n'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,73 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.cache import LRUCache, ResultCache
+
+
+class TestResultCache:
+    @pytest.fixture
+    def metadata(self):
+        return {
+            "dates": ["2024-01-15"],
+            "authors": ["Jane Smith"],
+            "key_terms": ["machine learning"],
+            "organizations": [],
+            "locations": [],
+        }
+
+    def test_memory_hit_and_miss(self, metadata):
+        """Test that a stored result is served for the same content and version"""
+        cache = ResultCache(max_bytes=1024 * 1024)
+        content_hash = ResultCache.hash_content(b"document bytes")
+
+        assert cache.get(content_hash, "v1") is None
+        cache.put(content_hash, "v1", metadata)
+        assert cache.get(content_hash, "v1") == metadata
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_version_change_invalidates(self, metadata):
+        """Test that a new model/pattern version never sees old results"""
+        cache = ResultCache(max_bytes=1024 * 1024)
+        content_hash = ResultCache.hash_content(b"document bytes")
+        cache.put(content_hash, "v1", metadata)
+
+        assert cache.get(content_hash, "v2") is None
+        assert cache.stats()["memory_entries"] == 0
+
+    def test_lru_size_eviction(self):
+        """Test that the memory tier evicts least recently used entries by size"""
+        lru = LRUCache(max_bytes=100)
+        lru.put("a", {"n": 1}, 40)
+        lru.put("b", {"n": 2}, 40)
+        lru.get("a")
+        lru.put("c", {"n": 3}, 40)
+
+        assert lru.get("b") is None
+        assert lru.get("a") == {"n": 1}
+        assert lru.current_bytes == 80
+        assert lru.evictions == 1
+
+    def test_disk_tier_survives_new_instance(self, tmp_path, metadata):
+        """Test that the SQLite tier serves results to a fresh process"""
+        path = str(tmp_path / "results.sqlite")
+        content_hash = ResultCache.hash_content(b"document bytes")
+        ResultCache(max_bytes=1024, disk_path=path).put(content_hash, "v1", metadata)
+
+        cache = ResultCache(max_bytes=1024, disk_path=path)
+        assert cache.get(content_hash, "v1") == metadata
+        assert cache.stats()["disk_hits"] == 1
+
+        # A version bump purges the stale rows
+        assert cache.get(content_hash, "v2") is None
+        assert cache.disk.get(f"v1:{content_hash}") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
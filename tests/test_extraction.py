@@ -1,13 +1,98 @@
+import asyncio
+import hashlib
 import pytest
+import spacy
+import subprocess
 import sys
+import time
+import zipfile
+from collections import Counter
 from pathlib import Path
 
 # Add the app directory to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from app.config import SPACY_EXCLUDE, SPACY_MODEL
+from app.extraction import metadata_extractor, text_extractor
+from app.extraction.chunking import iter_content_chunks, iter_text_chunks, iter_windows
+from app.extraction.docx_reader import DocxReader
+from app.extraction.key_terms import KeyTermDictionary
 from app.extraction.metadata_extractor import MetadataExtractor
+from app.extraction.model_registry import ModelRegistry
+from app.extraction.postprocess import normalize_dates, parse_date, rank_entities
 from app.extraction.text_extractor import TextExtractor
+from app.utils.cache import ResultCache
 from app.utils.file_handlers import FileHandler
+from app.utils.metrics import StageTimings
+
+
+def make_pdf(pages, info=None):
+    """Build a minimal uncompressed PDF with one line of Helvetica per page"""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        content_id = len(objects) + 2
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        kids.append(f"{len(objects) - 1} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    trailer_info = ""
+    if info:
+        objects.append("<< " + " ".join(f"/{key} ({value})" for key, value in info.items()) + " >>")
+        trailer_info = f" /Info {len(objects)} 0 R"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R{trailer_info} >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return out
+
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+CORE_NS = (
+    'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/"'
+)
+
+
+def make_docx(path, body, header="", footer="", core=None):
+    """Write a minimal DOCX archive from WordprocessingML fragments"""
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "word/document.xml", f"<w:document {W_NS}><w:body>{body}</w:body></w:document>"
+        )
+        if header:
+            archive.writestr("word/header1.xml", f"<w:hdr {W_NS}>{header}</w:hdr>")
+        if footer:
+            archive.writestr("word/footer1.xml", f"<w:ftr {W_NS}>{footer}</w:ftr>")
+        if core is not None:
+            archive.writestr(
+                "docProps/core.xml", f"<cp:coreProperties {CORE_NS}>{core}</cp:coreProperties>"
+            )
+    return path
+
+
+def para(*runs):
+    """A paragraph of runs, with a tab stop definition that is not text"""
+    props = '<w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+    return "<w:p>" + props + "".join(f"<w:r>{run}</w:r>" for run in runs) + "</w:p>"
 
 
 class TestMetadataExtraction:
@@ -45,6 +130,140 @@ class TestMetadataExtraction:
         assert len(key_terms) > 0
         assert "machine learning" in key_terms
 
+    def test_single_parse_matches_separate_passes(self, extractor, sample_text):
+        """Test that the shared-Doc pipeline agrees with the per-extractor passes"""
+        metadata = extractor.extract_from_text(sample_text)
+        dates, key_terms = extractor.pattern_matcher.extract_patterns(sample_text)
+        entities = extractor.extract_additional_entities(sample_text)
+
+        assert metadata["authors"] == extractor.extract_authors_ner(sample_text)
+        assert metadata["key_terms"] == key_terms
+        assert metadata["dates"] == normalize_dates(dates + entities["dates_ner"])
+        assert metadata["organizations"] == rank_entities(
+            Counter(entities["organizations"])
+        )
+
+    def test_dates_normalized_and_collapsed(self, extractor):
+        """Test that overlapping date matches collapse to one ISO value"""
+        text = "Report by Jane Smith\nDate: March 15, 2024\nPage 3456 of the Appendix"
+        dates, _ = extractor.pattern_matcher.extract_patterns(text)
+        assert dates == ["2024-03-15"]
+
+    def test_pdf_and_docx_libraries_imported_lazily(self):
+        """Test that importing the API does not load pdfminer or python-docx"""
+        code = (
+            "import sys, app.main; "
+            "print(any(m.split('.')[0] in ('pdfminer', 'docx') for m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "False"
+
+    def test_model_shared_between_extractors(self, extractor):
+        """Test that the extractor and pattern matcher share one loaded model"""
+        assert extractor.nlp is extractor.pattern_matcher.nlp
+        assert extractor.nlp is ModelRegistry.get()
+        stats = ModelRegistry.stats()
+        assert len(stats["models"]) == 1
+        model_stats = next(iter(stats["models"].values()))
+        assert model_stats["load_seconds"] >= 0
+        assert "rss_delta_bytes" in model_stats
+
+    def test_model_cached_per_exclude_list(self, extractor):
+        """Test that another exclude list loads its own copy of the model"""
+        extra = extractor.nlp.pipe_names[0]
+        excluded = sorted({*SPACY_EXCLUDE, extra})
+        try:
+            nlp = ModelRegistry.get(exclude=excluded)
+            assert nlp is not ModelRegistry.get()
+            assert extra not in nlp.pipe_names
+            assert nlp is ModelRegistry.get(exclude=list(reversed(excluded)))
+            assert len(ModelRegistry.stats()["models"]) == 2
+        finally:
+            key = ModelRegistry._key(SPACY_MODEL, excluded)
+            ModelRegistry._models.pop(key, None)
+            ModelRegistry._stats.pop(key, None)
+
+    def test_batch_extraction_isolates_errors(self, extractor, sample_text):
+        """Test that batched extraction keeps order and isolates bad files"""
+        files = [
+            ("good.txt", sample_text.encode()),
+            ("broken.docx", b"not a docx archive"),
+            ("empty.md", b""),
+        ]
+        results = extractor.extract_metadata_batch(files, batch_size=2)
+
+        assert len(results) == 3
+        assert results[0] == extractor.extract_from_text(sample_text)
+        assert isinstance(results[1], ValueError)
+        assert results[2] == extractor.skipped_metadata("empty")
+
+    def test_batch_nlp_time_spread_over_documents(self, extractor, sample_text):
+        """Test that each spaCy batch's time is shared by its documents"""
+        files = [(f"doc{i}.txt", sample_text.encode("utf-8")) for i in range(5)]
+        timings = StageTimings()
+        extractor.extract_metadata_batch(files, batch_size=2, timings=timings)
+
+        nlp = timings.observations["nlp"]
+        assert len(nlp) == 5
+        assert nlp[0] == nlp[1] and nlp[2] == nlp[3]
+
+    def test_key_terms_from_files_and_hot_reload(self, extractor, tmp_path):
+        """Test dictionary compilation, artifact reuse and hot reloading"""
+        terms_dir = tmp_path / "terms"
+        terms_dir.mkdir()
+        (terms_dir / "ai.txt").write_text("# comment\nMachine Learning\ngraph theory\n")
+        artifact = tmp_path / "terms.msgpack"
+
+        dictionary = KeyTermDictionary(
+            nlp=extractor.nlp,
+            terms_dir=str(terms_dir),
+            artifact_path=str(artifact),
+            reload_interval=0.01,
+        )
+        doc = extractor.nlp.make_doc("Graph theory meets machine learning and ethics")
+        assert dictionary.match(doc) == ["graph theory", "machine learning"]
+        assert dictionary.loaded_from == "term files"
+        assert artifact.exists()
+
+        # A fresh worker loads the compiled artifact instead of the term files
+        fresh = KeyTermDictionary(
+            nlp=extractor.nlp, terms_dir=str(terms_dir), artifact_path=str(artifact)
+        )
+        assert fresh.match(doc) == ["graph theory", "machine learning"]
+        assert fresh.loaded_from == "artifact"
+
+        # Token sequences from another model's tokenizer are not reused
+        blank = spacy.blank("en")
+        other = KeyTermDictionary(
+            nlp=blank, terms_dir=str(terms_dir), artifact_path=str(artifact)
+        )
+        assert other.match(blank.make_doc(doc.text)) == ["graph theory", "machine learning"]
+        assert other.loaded_from == "term files"
+
+        old_fingerprint = dictionary.fingerprint()
+        (terms_dir / "ethics.txt").write_text("ethics\n")
+        time.sleep(0.02)
+        assert dictionary.match(doc) == ["ethics", "graph theory", "machine learning"]
+        assert dictionary.fingerprint() != old_fingerprint
+
+    def test_field_selection_uses_smallest_pipeline(self, extractor, sample_text):
+        """Test that field subsets only run the components they need"""
+        key_terms_only = frozenset(["key_terms"])
+        assert set(extractor.disabled_for(key_terms_only)) == set(extractor.nlp.pipe_names)
+        assert "ner" in extractor.disabled_for(frozenset(["dates", "key_terms"]))
+        assert "ner" not in extractor.disabled_for(frozenset(["authors"]))
+
+        full = extractor.extract_from_text(sample_text)
+        partial = extractor.extract_from_text(sample_text, key_terms_only)
+        assert partial["key_terms"] == full["key_terms"]
+        assert partial["authors"] == [] and partial["dates"] == []
+
     def test_file_validation(self):
         """Test file validation functions"""
         assert FileHandler.validate_file_type("test.pdf") == True
@@ -60,12 +279,259 @@ class TestMetadataExtraction:
         assert FileHandler.validate_file_size(small_content) == True
         assert FileHandler.validate_file_size(large_content) == False
 
+    def test_multipart_spooled_while_streaming(self, tmp_path):
+        """Test that uploads spool from the body stream and stop at the size limit"""
+        boundary = "test-boundary"
+
+        def part(filename: str, content: bytes) -> bytes:
+            head = (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            )
+            return head.encode() + content + b"\r\n"
+
+        body = (
+            part("big.txt", b"x" * (3 * 1024 * 1024))
+            + part("notes.txt", b"hello")
+            + part("image.xyz", b"?")
+            + f"--{boundary}--\r\n".encode()
+        )
+        largest = [0]
+
+        async def stream():
+            for start in range(0, len(body), 64 * 1024):
+                sizes = [path.stat().st_size for path in tmp_path.iterdir()]
+                largest[0] = max([largest[0], *sizes])
+                yield body[start : start + 64 * 1024]
+
+        headers = {"content-type": f"multipart/form-data; boundary={boundary}"}
+        entries = asyncio.run(
+            FileHandler.spool_multipart(
+                headers, stream(), "files", lambda filename: 1, spool_dir=str(tmp_path)
+            )
+        )
+
+        assert largest[0] <= 1024 * 1024
+        assert entries[0]["error"] == "File too large: big.txt (max 1MB)"
+        assert "path" not in entries[0]
+        assert entries[1]["file_hash"] == hashlib.sha256(b"hello").hexdigest()
+        assert entries[1]["path"].read_bytes() == b"hello"
+        assert entries[2]["error"] == "Unsupported file type: image.xyz"
+        assert list(tmp_path.iterdir()) == [entries[1]["path"]]
+
     def test_text_extraction(self):
         """Test text extraction from different formats"""
         txt_content = b"Sample text content"
         extracted = TextExtractor.extract_from_txt(txt_content)
         assert extracted == "Sample text content"
 
+    def test_text_extraction_from_spooled_file(self, tmp_path):
+        """Test that spooled uploads are read from disk like raw bytes"""
+        path = tmp_path / "upload.txt"
+        path.write_bytes("Caf\xe9 notes".encode("latin-1"))
+        assert TextExtractor.extract_text("notes.txt", path) == "Caf\xe9 notes"
+
+        empty = tmp_path / "empty.md"
+        empty.write_bytes(b"")
+        assert TextExtractor.extract_text("empty.md", empty) == ""
+
+    def test_docx_text_streamed_with_tables_headers_and_footers(self, tmp_path):
+        """Test that DOCX text covers headers, tables and footers, in reading order"""
+        body = (
+            para("<w:t>Quarterly </w:t>", "<w:t>Report</w:t>")
+            + para("<w:t>Name</w:t>", "<w:tab/>", "<w:t>Value</w:t>")
+            + "<w:tbl><w:tr><w:tc>" + para("<w:t>Cell A</w:t>") + "</w:tc><w:tc>"
+            + para("<w:t>Cell B</w:t>") + "</w:tc></w:tr></w:tbl>"
+            + para("<w:t>   </w:t>")
+            + para("<w:t>Line one</w:t>", "<w:br/>", "<w:t>line two</w:t>")
+            + '<w:p><w:r><w:delText>deleted</w:delText></w:r></w:p>'
+        )
+        path = make_docx(
+            tmp_path / "report.docx",
+            body,
+            header=para("<w:t>Prepared by Jane Smith</w:t>"),
+            footer=para("<w:t>Page footer</w:t>"),
+        )
+        assert list(DocxReader.iter_paragraphs(path)) == [
+            "Prepared by Jane Smith",
+            "Quarterly Report",
+            "Name\tValue",
+            "Cell A",
+            "Cell B",
+            "Line one\nline two",
+            "Page footer",
+        ]
+        text = TextExtractor.extract_from_docx(path)
+        assert TextExtractor.extract_from_docx(path.read_bytes()) == text
+
+    def test_docx_matches_python_docx_on_body_text(self, tmp_path):
+        """Test that the streaming reader returns the paragraphs python-docx sees"""
+        from docx import Document
+
+        document = Document()
+        document.add_heading("Annual Report", level=1)
+        for i in range(50):
+            document.add_paragraph(f"Paragraph {i} about machine learning.")
+        path = tmp_path / "large.docx"
+        document.save(str(path))
+
+        expected = [p.text for p in Document(str(path)).paragraphs if p.text.strip()]
+        assert list(DocxReader.iter_paragraphs(path)) == expected
+        assert DocxReader.core_properties(path)["creator"] == "python-docx"
+        # The template's author and dates are not the document's own
+        assert TextExtractor.extract_embedded("large.docx", path) == {}
+
+    def test_placeholder_creators_not_authors(self, extractor, tmp_path):
+        """Test that placeholder creators like "Microsoft Office User" are dropped"""
+        path = make_docx(
+            tmp_path / "memo.docx",
+            para("<w:t>Memo on machine learning for the whole team.</w:t>"),
+            core=(
+                "<dc:creator>Microsoft Office User</dc:creator>"
+                "<dcterms:created>2023-11-02T09:30:00Z</dcterms:created>"
+            ),
+        )
+        assert TextExtractor.extract_embedded("memo.docx", path) == {"created": "2023-11-02"}
+        metadata = extractor.extract_metadata("memo.docx", path)
+        assert "Microsoft Office User" not in metadata["authors"]
+        assert metadata["sources"]["authors"] != "embedded"
+
+    def test_docx_core_properties_add_authors_and_dates(self, extractor, tmp_path):
+        """Test that DOCX core properties become authors and ISO dates"""
+        path = make_docx(
+            tmp_path / "notes.docx",
+            para("<w:t>Meeting notes on machine learning for the whole team.</w:t>"),
+            core=(
+                "<dc:creator>Ada Lovelace</dc:creator>"
+                "<dcterms:created>2023-11-02T09:30:00Z</dcterms:created>"
+                "<dcterms:modified>2024-01-15T08:00:00Z</dcterms:modified>"
+            ),
+        )
+        assert DocxReader.core_properties(path) == {
+            "creator": "Ada Lovelace",
+            "created": "2023-11-02T09:30:00Z",
+            "modified": "2024-01-15T08:00:00Z",
+        }
+        metadata = extractor.extract_metadata("notes.docx", path)
+        assert "Ada Lovelace" in metadata["authors"]
+        assert {"2023-11-02", "2024-01-15"} <= set(metadata["dates"])
+        [batched] = extractor.extract_metadata_batch(
+            [("notes.docx", path.read_bytes())], fields=frozenset(["key_terms"])
+        )
+        assert batched["authors"] == [] and batched["dates"] == []
+
+    def test_docx_without_core_properties(self, tmp_path):
+        """Test that a DOCX without docProps/core.xml has no properties"""
+        path = make_docx(tmp_path / "bare.docx", para("<w:t>Text</w:t>"))
+        assert DocxReader.core_properties(path) == {}
+
+    def test_embedded_metadata_from_pdf_info(self):
+        """Test that the PDF Info dictionary yields title, author and ISO dates"""
+        pdf = make_pdf(
+            ["Annual Report"],
+            info={
+                "Title": "Annual Report",
+                "Author": "Grace Hopper",
+                "CreationDate": "D:20240315103000+01'00'",
+                "ModDate": "D:garbage",
+            },
+        )
+        assert TextExtractor.extract_embedded("report.pdf", pdf) == {
+            "title": "Annual Report",
+            "author": "Grace Hopper",
+            "created": "2024-03-15",
+        }
+        assert TextExtractor.extract_embedded("report.pdf", make_pdf(["Text"])) == {}
+        assert TextExtractor.extract_embedded("notes.txt", b"Author: Nobody") == {}
+
+    def test_embedded_metadata_merged_with_source_tags(self, extractor):
+        """Test that embedded author and dates merge into text results, tagged"""
+        pdf = make_pdf(
+            ["Machine learning notes on the project"],
+            info={"Author": "Grace Hopper", "CreationDate": "D:20240315"},
+        )
+        metadata = extractor.extract_metadata("notes.pdf", pdf)
+        assert "Grace Hopper" in metadata["authors"]
+        assert "2024-03-15" in metadata["dates"]
+        assert metadata["embedded"] == {"author": "Grace Hopper", "created": "2024-03-15"}
+        assert metadata["sources"]["authors"] == "embedded+text"
+        assert metadata["sources"]["key_terms"] == "text"
+
+        # Without embedded metadata the result keeps its usual shape
+        plain = extractor.extract_metadata("plain.pdf", make_pdf(["Machine learning notes"]))
+        assert "embedded" not in plain and "sources" not in plain
+
+    def test_metadata_first_skips_text_when_embedded_is_enough(self, extractor):
+        """Test that metadata-first answers authors and dates without text or NLP"""
+        pdf = make_pdf(
+            ["Machine learning notes by Alan Turing"],
+            info={"Author": "Grace Hopper", "CreationDate": "D:20240315"},
+        )
+        timings = StageTimings()
+        [metadata] = extractor.extract_metadata_batch(
+            [("notes.pdf", pdf)],
+            fields=frozenset(["authors", "dates"]),
+            timings=timings,
+            metadata_first=True,
+        )
+        assert metadata["authors"] == ["Grace Hopper"]
+        assert metadata["dates"] == ["2024-03-15"]
+        assert metadata["sources"] == {"authors": "embedded", "dates": "embedded"}
+        assert set(timings.totals()) == {"screen", "embedded"}
+
+        # Fields the embedded metadata cannot answer still come from the text
+        metadata = extractor.extract_metadata(
+            "notes.pdf", pdf, fields=frozenset(["authors", "key_terms"]), metadata_first=True
+        )
+        assert metadata["authors"] == ["Grace Hopper"]
+        assert "machine learning" in metadata["key_terms"]
+        assert metadata["sources"] == {"authors": "embedded", "key_terms": "text"}
+
+        # Nothing embedded: extracted from the text as usual
+        [metadata] = extractor.extract_metadata_batch(
+            [("plain.pdf", make_pdf(["Machine learning notes"]))], metadata_first=True
+        )
+        assert "machine learning" in metadata["key_terms"]
+
+    def test_pdf_pages_stream(self):
+        """Test page-by-page PDF extraction and the page limit"""
+        pdf = make_pdf(["Machine learning overview", "Deep learning details"])
+        pages = list(TextExtractor.iter_pdf_pages(pdf))
+        assert len(pages) == 2
+        assert "Machine learning" in pages[0]
+        assert "Deep learning" in pages[1]
+        assert len(list(TextExtractor.iter_pdf_pages(pdf, max_pages=1))) == 1
+
+    def test_text_chunks_are_bounded(self):
+        """Test that streamed pages are regrouped into bounded chunks"""
+        pages = ["alpha beta gamma\n" * 20, "delta\n", "epsilon " * 50]
+        chunks = list(iter_text_chunks(pages, 100))
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert "".join(chunks) == "".join(pages)
+
+    def test_pdf_metadata_pages_limit_entities(self, extractor):
+        """Test that pages past the metadata window only contribute key terms"""
+        pdf = make_pdf(
+            ["Report on machine learning", "Dated 2024-01-15 on deep learning"]
+        )
+        pages = TextExtractor.iter_pdf_pages(pdf)
+        metadata = extractor.extract_from_pages(pages, metadata_pages=1)
+        assert metadata["key_terms"] == ["deep learning", "machine learning"]
+        assert metadata["dates"] == []
+
+        full = extractor.extract_metadata("report.pdf", pdf)
+        assert full["dates"] == ["2024-01-15"]
+
+    def test_version_covers_page_limits(self, monkeypatch):
+        """Test that changing a PDF page limit changes the cache version"""
+        version = MetadataExtractor.version()
+        monkeypatch.setattr(metadata_extractor, "PDF_METADATA_PAGES", 3)
+        assert MetadataExtractor.version() != version
+        monkeypatch.undo()
+        monkeypatch.setattr(metadata_extractor, "PDF_MAX_PAGES", 10)
+        assert MetadataExtractor.version() != version
+
     def test_metadata_extraction_full_pipeline(self, extractor):
         """Test the complete metadata extraction pipeline"""
         sample_content = b"""
@@ -95,5 +561,184 @@ class TestMetadataExtraction:
         assert len(metadata["key_terms"]) >= 0
 
 
+def long_report(lines=600, edited=None):
+    """Varied report lines, about 30k characters; ``edited`` replaces one line"""
+    cities = ["Boston", "Denver", "Seattle", "Austin", "Chicago"]
+    text = [
+        f"Section {i}: Review by Jane Smith of machine learning work in "
+        f"{cities[i % len(cities)]}, dated March {i % 28 + 1}, 2024.\n"
+        for i in range(lines)
+    ]
+    if edited is not None:
+        text[edited] = "Section Edited: Notes by Alan Turing on deep learning in Paris.\n"
+    return "".join(text)
+
+
+class TestIncrementalExtraction:
+    @pytest.fixture
+    def chunk_cache(self, monkeypatch):
+        cache = ResultCache(max_bytes=16 * 1024 * 1024)
+        monkeypatch.setattr(metadata_extractor, "_chunk_cache", cache)
+        return cache
+
+    def test_content_chunks_survive_an_edit(self):
+        """Test that an edit changes only the chunks around it"""
+        before = list(iter_content_chunks([long_report()], 2000, 100000))
+        after = list(iter_content_chunks([long_report(edited=300)], 2000, 100000))
+        assert "".join(before) == long_report()
+        assert len(before) > 5
+        assert all(len(chunk) <= 100000 for chunk in before)
+        assert len(set(after) - set(before)) <= 2
+
+    def test_edited_document_reparses_only_changed_chunks(self, chunk_cache):
+        """Test that re-extraction after an edit serves unchanged chunks from cache"""
+        extractor = MetadataExtractor()
+        first = extractor.extract_metadata("report.txt", long_report().encode())
+        assert first["chunks"]["cached"] == 0
+        assert first["chunks"]["bytes_reprocessed"] == first["chunks"]["bytes"]
+
+        edited = long_report(edited=300).encode()
+        second = extractor.extract_metadata("report.txt", edited)
+        usage = second["chunks"]
+        assert usage["total"] - usage["cached"] <= 2
+        assert usage["hit_ratio"] > 0.5
+        assert usage["bytes_reprocessed"] < usage["bytes"] / 2
+        assert "deep learning" in second["key_terms"]
+
+        # Same merged result as a cold extraction of the edited text
+        chunk_cache.memory.clear()
+        cold = extractor.extract_metadata("report.txt", edited)
+        assert cold["chunks"]["cached"] == 0
+        assert {k: v for k, v in cold.items() if k != "chunks"} == {
+            k: v for k, v in second.items() if k != "chunks"
+        }
+
+    def test_short_text_parsed_whole(self, chunk_cache):
+        """Test that texts under CHUNK_CACHE_MIN_CHARS skip the chunk cache"""
+        metadata = MetadataExtractor().extract_metadata(
+            "short.txt", b"Memo by Jane Smith on machine learning, March 15, 2024."
+        )
+        assert "chunks" not in metadata
+        assert len(chunk_cache.memory) == 0
+
+
+class TestStreamedText:
+    def test_incremental_decode_across_blocks(self):
+        """Test block-wise decoding: split characters, encoding detection, BOM"""
+        text = "Caf\xe9 r\xe9sum\xe9 \u2014 notes\n" * 20
+        assert "".join(TextExtractor.iter_txt(text.encode("utf-8"), read_bytes=7)) == text
+        pieces = list(TextExtractor.iter_txt(text.encode("utf-8"), read_bytes=100))
+        assert "".join(pieces) == text
+        assert all(piece.endswith("\n") for piece in pieces)
+
+        latin = "Caf\xe9 notes\n" * 5
+        assert "".join(TextExtractor.iter_txt(latin.encode("latin-1"), read_bytes=4)) == latin
+
+        bom = b"\xef\xbb\xbfMemo\n"
+        assert "".join(TextExtractor.iter_txt(bom)) == "Memo\n"
+        assert TextExtractor.extract_from_txt(bom) == "Memo\n"
+
+    def test_latin1_after_utf8_prefix(self, monkeypatch, tmp_path):
+        """Test that Latin-1 bytes past a UTF-8 sample are not replaced"""
+        monkeypatch.setattr(text_extractor, "PRESCREEN_SAMPLE_BYTES", 64)
+        head = "Caf\xe9 notes \u2014 summary\n" * 4
+        tail = "Report by Fran\xe7ois M\xfcller\n" * 3
+        content = head.encode("utf-8") + tail.encode("latin-1")
+        assert TextExtractor.detect_encoding(content[:64]) == "utf-8"
+
+        assert TextExtractor.extract_from_txt(content) == head + tail
+        path = tmp_path / "mixed.txt"
+        path.write_bytes(content)
+        assert TextExtractor.extract_from_txt(path) == head + tail
+        for read_bytes in (5, 37, 1024):
+            pieces = TextExtractor.iter_txt(content, read_bytes=read_bytes)
+            assert "".join(pieces) == head + tail
+
+    def test_windows_cover_each_chunk_once(self):
+        """Test that window cores are the chunks, with overlap on either side"""
+        chunks = list(iter_text_chunks([long_report(lines=40)], 500))
+        windows = list(iter_windows(chunks, 50))
+        assert [window[start:end] for window, (start, end) in windows] == chunks
+        assert windows[0][1][0] == 0
+        assert all(len(window) <= len(chunk) + 100 for (window, _), chunk in zip(windows, chunks))
+
+    def test_entity_cut_by_chunk_boundary(self):
+        """Test that an entity split between two chunks is still found"""
+        extractor = MetadataExtractor()
+        text = (
+            "Notes on machine learning from the Boston office. " * 3
+            + "Memo by Jane Smith on deep learning, dated March 15, 2024. "
+            + "Notes on machine learning. " * 3
+        )
+        # The first chunk ends in the middle of "Jane Smith"
+        chunk_chars = text.index("Smith") + 3
+        cut = extractor.extract_from_pages(
+            [text], metadata_pages=0, chunk_chars=chunk_chars, overlap_chars=0
+        )
+        assert cut["authors"] == []
+
+        stitched = extractor.extract_from_pages([text], metadata_pages=0, chunk_chars=chunk_chars)
+        assert stitched == extractor.extract_from_text(text)
+        assert stitched["authors"] == ["Jane Smith"]
+
+    def test_large_text_file_streamed(self, monkeypatch, tmp_path):
+        """Test that text past TEXT_IN_MEMORY_MB is never decoded as one string"""
+        cache = ResultCache(max_bytes=16 * 1024 * 1024)
+        monkeypatch.setattr(metadata_extractor, "_chunk_cache", cache)
+        extractor = MetadataExtractor()
+        content = long_report().encode()
+        whole = extractor.extract_metadata("report.txt", content)
+
+        def extract_text(filename, content):
+            raise AssertionError("decoded whole")
+
+        monkeypatch.setattr(metadata_extractor, "TEXT_IN_MEMORY_MB", 0.001)
+        monkeypatch.setattr(TextExtractor, "extract_text", extract_text)
+        path = tmp_path / "report.txt"
+        path.write_bytes(content)
+        assert extractor.streams_text("report.txt", path)
+        assert not extractor.streams_text("report.pdf", path)
+        streamed = extractor.extract_metadata("report.txt", path)
+        # Same chunks as the in-memory path, so all of them come from cache
+        assert streamed["chunks"]["cached"] == whole["chunks"]["total"]
+        assert {k: v for k, v in streamed.items() if k != "chunks"} == {
+            k: v for k, v in whole.items() if k != "chunks"
+        }
+        batched = extractor.extract_metadata_batch([("report.txt", content)])[0]
+        assert batched["chunks"] == streamed["chunks"]
+
+
+class TestPostprocessing:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("2025-07-28", "2025-07-28"),
+            ("28/07/2025", "2025-07-28"),
+            ("07/28/2025", "2025-07-28"),
+            ("July 28, 2025", "2025-07-28"),
+            ("Sept. 3rd 2025", "2025-09-03"),
+            ("the 28th of July, 2025", "2025-07-28"),
+            ("July  2025", "2025-07"),
+            ("2025", "2025"),
+            ("2025-02-30", None),
+            ("Report 2025", None),
+            ("last year", None),
+        ],
+    )
+    def test_parse_date(self, text, expected):
+        """Test parsing of the date formats the patterns match"""
+        assert parse_date(text) == expected
+
+    def test_normalize_dates_drops_coarser_duplicates(self):
+        """Test dedupe and removal of dates implied by a finer one"""
+        values = ["2024", "March 15, 2024", "2024-03-15", "March 2024", "1999", "soon"]
+        assert normalize_dates(values) == ["1999", "2024-03-15"]
+
+    def test_rank_entities(self):
+        """Test that entities are unique and ordered by frequency"""
+        counts = Counter(["MIT", "Google", "MIT", "Acme", "Google", "MIT"])
+        assert rank_entities(counts) == ["MIT", "Google", "Acme"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
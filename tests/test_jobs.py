@@ -0,0 +1,122 @@
+import os
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.jobs.manager import JobManager
+from app.jobs.store import JobStore
+
+
+def _wait_for(manager, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        # The upload directory is removed right after the last file is marked
+        if job["status"] == "completed" and not (manager.jobs_dir / job_id).exists():
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def _spool(job_dir, name, content):
+    path = job_dir / name
+    path.write_text(content)
+    return {"file_name": name, "path": str(path), "file_hash": name}
+
+
+def _handler(filename, path, content_hash, fields):
+    text = Path(path).read_text()
+    if "boom" in text:
+        raise ValueError("Failed to extract metadata: boom")
+    return {"file_name": filename, "length": len(text), "fields": sorted(fields)}
+
+
+class TestJobs:
+    def test_job_runs_and_streams_results(self, tmp_path):
+        """Test that every file of a job finishes and is returned in order"""
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")), _handler,
+                             jobs_dir=str(tmp_path / "jobs"))
+        job_id, job_dir = manager.new_job_dir()
+        files = [
+            _spool(job_dir, "a.txt", "hello"),
+            _spool(job_dir, "b.txt", "boom"),
+            {"file_name": "c.exe", "error": "Unsupported file type: c.exe"},
+        ]
+        submitted = manager.submit(job_id, frozenset(["dates"]), files)
+        assert submitted["total"] == 3
+
+        job = _wait_for(manager, job_id)
+        assert job["completed"] == 1
+        assert job["failed"] == 2
+        assert job["finished_at"] is not None
+        assert not job_dir.exists()
+
+        rows = manager.results_after(job_id)
+        assert [row["seq"] for row in rows] == [1, 2, 3]
+        # Rejected uploads are recorded at submit time, so they come first
+        assert rows[0]["file_name"] == "c.exe"
+        by_name = {row["file_name"]: row for row in rows}
+        assert by_name["a.txt"]["result"] == {
+            "file_name": "a.txt", "length": 5, "fields": ["dates"]
+        }
+        assert "boom" in by_name["b.txt"]["error"]
+        assert manager.results_after(job_id, after=3) == []
+        manager.shutdown()
+
+    def test_state_survives_restart(self, tmp_path):
+        """Test that files left queued or running by a dead process resume"""
+        db = str(tmp_path / "jobs.sqlite")
+        release = threading.Event()
+
+        def blocking_handler(*args):
+            release.wait(10)
+            return _handler(*args)
+
+        first = JobManager(JobStore(db), blocking_handler,
+                           jobs_dir=str(tmp_path / "jobs"), max_workers=1)
+        job_id, job_dir = first.new_job_dir()
+        files = [_spool(job_dir, f"{i}.txt", f"file {i}") for i in range(3)]
+        first.submit(job_id, frozenset(["dates"]), files)
+        while first.get(job_id)["running"] != 1:
+            time.sleep(0.01)
+
+        # Simulate the process dying: nothing more is picked up and the
+        # running file is still claimed by the old owner
+        first.shutdown(wait=False)
+        first.owner = f"{os.getpid()}:dead"
+        with first.store._lock:
+            first.store._conn.execute(
+                "UPDATE job_files SET owner = ? WHERE status = 'running'",
+                (first.owner,),
+            )
+            first.store._conn.commit()
+        release.set()
+
+        second = JobManager(JobStore(db), _handler, jobs_dir=str(tmp_path / "jobs"))
+        assert second.resume() >= 2
+        job = _wait_for(second, job_id)
+        assert job["completed"] == 3
+        assert sorted(r["index"] for r in second.results_after(job_id)) == [0, 1, 2]
+        second.shutdown()
+
+    def test_finished_jobs_expire(self, tmp_path):
+        """Test that finished jobs are purged after the retention period"""
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")), _handler,
+                             jobs_dir=str(tmp_path / "jobs"), retention_seconds=1)
+        job_id, job_dir = manager.new_job_dir()
+        manager.submit(job_id, frozenset(["dates"]), [_spool(job_dir, "a.txt", "x")])
+        _wait_for(manager, job_id)
+        assert manager.purge_expired() == 0
+        time.sleep(1.1)
+        assert manager.purge_expired() == 1
+        assert manager.get(job_id) is None
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,70 @@
+import pickle
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.extraction.metadata_extractor import MetadataExtractor
+from app.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry, StageTimings
+
+
+class TestMetrics:
+    def test_prometheus_text_format(self):
+        """Test counters, gauges and histograms render as Prometheus text"""
+        registry = MetricsRegistry()
+        docs = registry.register(Counter("docs_total", "Documents", ["format"]))
+        latency = registry.register(
+            Histogram("stage_seconds", "Stage time", ["stage"], buckets=[0.1, 1.0])
+        )
+        registry.register(Gauge("queue_depth", "Waiting calls", lambda: 3))
+
+        docs.inc(format="pdf")
+        docs.inc(2, format="pdf")
+        latency.observe(0.05, stage="nlp")
+        latency.observe(0.5, stage="nlp")
+        latency.observe(5.0, stage="nlp")
+
+        text = registry.render()
+        assert "# TYPE docs_total counter" in text
+        assert 'docs_total{format="pdf"} 3' in text
+        assert 'stage_seconds_bucket{stage="nlp",le="0.1"} 1' in text
+        assert 'stage_seconds_bucket{stage="nlp",le="1"} 2' in text
+        assert 'stage_seconds_bucket{stage="nlp",le="+Inf"} 3' in text
+        assert 'stage_seconds_count{stage="nlp"} 3' in text
+        assert "queue_depth 3" in text
+
+        with pytest.raises(ValueError):
+            docs.inc(stage="nlp")
+
+    def test_nested_stages_are_not_double_counted(self):
+        """Test that time charged to an inner stage is left out of the outer one"""
+        timings = StageTimings()
+
+        def pages():
+            for _ in range(3):
+                time.sleep(0.02)
+                yield "page"
+
+        inner = MetadataExtractor._timed(pages(), timings, "text_pdf")
+        for _ in MetadataExtractor._timed(inner, timings, "nlp"):
+            pass
+
+        totals = timings.totals()
+        assert len(timings.observations["text_pdf"]) == 3
+        assert totals["text_pdf"] >= 0.06
+        assert totals["nlp"] < 0.02
+
+        # Timings travel back from process pool workers
+        copy = pickle.loads(pickle.dumps(timings))
+        assert copy.totals() == totals
+
+    def test_timed_without_timings_is_passthrough(self):
+        """Test that disabled timing leaves the iterator untouched"""
+        assert list(MetadataExtractor._timed(iter([1, 2]), None, "nlp")) == [1, 2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,124 @@
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.extraction import metadata_extractor, nlp_pool
+from app.extraction.metadata_extractor import (
+    METADATA_FIELDS,
+    extract_metadata_batch,
+    extract_metadata_batch_timed,
+    get_metadata_extractor,
+)
+from app.extraction.nlp_pool import NLPWorkerPool
+from app.utils.executor import ExtractionExecutor
+from app.utils.metrics import StageTimings
+
+TEXT = b"Annual Report by Jane Smith, published March 15, 2024 on machine learning."
+
+
+class TestNLPWorkerPool:
+    @pytest.fixture(scope="class")
+    def pool(self):
+        pool = NLPWorkerPool(1, max_documents=2)
+        yield pool
+        pool.shutdown()
+
+    def test_results_match_in_process_extraction(self, pool, tmp_path):
+        """Test that pooled results equal in-process ones for bytes and paths"""
+        spooled = tmp_path / "spooled.txt"
+        spooled.write_bytes(TEXT)
+        files = [("report.txt", TEXT), ("spooled.txt", spooled), ("broken.docx", b"nope")]
+
+        results, timings = pool.submit(
+            extract_metadata_batch_timed, files, METADATA_FIELDS
+        ).result(timeout=120)
+
+        expected = get_metadata_extractor().extract_metadata_batch(files[:2])
+        assert results[:2] == expected
+        assert isinstance(results[2], ValueError)
+        assert isinstance(timings, StageTimings)
+        assert "nlp" in timings.totals()
+
+    def test_shared_memory_released(self, pool):
+        """Test that shared-memory blocks are unlinked after each batch"""
+        if not nlp_pool.SHM_DIR.is_dir():
+            pytest.skip("No POSIX shared memory directory")
+        before = set(os.listdir(nlp_pool.SHM_DIR))
+        pool.submit(extract_metadata_batch, [("a.txt", TEXT)], METADATA_FIELDS).result(
+            timeout=120
+        )
+        assert set(os.listdir(nlp_pool.SHM_DIR)) - before == set()
+
+    def test_shared_memory_released_when_handoff_fails(self, monkeypatch):
+        """Test that blocks already created are unlinked if a later one fails"""
+        if not nlp_pool.SHM_DIR.is_dir():
+            pytest.skip("No POSIX shared memory directory")
+        real = nlp_pool.shared_memory.SharedMemory
+        created = []
+
+        def create(*args, **kwargs):
+            if created:
+                raise OSError(28, "No space left on device")
+            created.append(real(*args, **kwargs))
+            return created[-1]
+
+        monkeypatch.setattr(nlp_pool.shared_memory, "SharedMemory", create)
+        before = set(os.listdir(nlp_pool.SHM_DIR))
+        with pytest.raises(OSError):
+            nlp_pool._share_sources([("a.txt", TEXT), ("b.txt", TEXT)])
+        assert created
+        assert set(os.listdir(nlp_pool.SHM_DIR)) - before == set()
+
+    def test_workers_restart_after_document_budget(self, pool):
+        """Test that a worker is replaced once it has handled max_documents"""
+        restarts = pool.restarts
+        for _ in range(3):
+            result = pool.submit(
+                extract_metadata_batch, [("a.txt", TEXT)], METADATA_FIELDS
+            ).result(timeout=120)
+            assert result[0]["authors"] == ["Jane Smith"]
+            # A routine replacement does not take the pool out of rotation
+            assert pool.ready
+        assert pool.restarts > restarts
+
+    def test_start_failures_fail_batches(self, monkeypatch):
+        """Test that a pool whose workers cannot start fails its batches and shuts down"""
+
+        def warm_up():
+            raise OSError("model not found")
+
+        # Forked workers see the patched warm-up
+        monkeypatch.setattr(metadata_extractor, "warm_up", warm_up)
+        pool = NLPWorkerPool(1, start_method="fork", max_start_failures=2)
+        try:
+            queued = pool.submit(extract_metadata_batch, [("a.txt", TEXT)], METADATA_FIELDS)
+            with pytest.raises(RuntimeError, match="model not found"):
+                queued.result(timeout=60)
+            with pytest.raises(RuntimeError, match="model not found"):
+                pool.submit(extract_metadata_batch, [], METADATA_FIELDS).result(timeout=5)
+            assert not pool.ready
+            assert "model not found" in pool.stats()["error"]
+        finally:
+            pool.shutdown()
+
+    def test_extraction_executor_nlp_kind(self):
+        """Test the NLP pool behind the extraction executor"""
+        executor = ExtractionExecutor(kind="nlp", max_workers=1)
+        try:
+            executor.start()
+            result = executor.submit(
+                extract_metadata_batch, [("a.txt", TEXT)], METADATA_FIELDS
+            ).result(timeout=120)
+            assert executor.ready
+            assert executor.stats()["workers"]["processes"] == 1
+        finally:
+            executor.shutdown()
+        assert result[0]["dates"] == ["2024-03-15"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
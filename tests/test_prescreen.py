@@ -0,0 +1,104 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.extraction import prescreen
+from app.extraction.prescreen import PreScreen
+from tests.test_extraction import make_pdf
+
+
+def make_image_pdf():
+    """Build a one-page PDF that only paints an image XObject"""
+    stream = "q 612 0 0 792 0 0 cm /Im1 Do Q"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /XObject << /Im1 5 0 R >> >> /Contents 4 0 R >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /XObject /Subtype /Image /Width 1 /Height 1 "
+        "/ColorSpace /DeviceGray /BitsPerComponent 8 /Length 1 >>\nstream\n\x00\nendstream",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return out
+
+
+class TestPreScreen:
+    @pytest.mark.parametrize(
+        "filename, content, reason",
+        [
+            ("empty.txt", b"", prescreen.EMPTY),
+            ("blank.md", b"   \n\n\t ", prescreen.EMPTY),
+            ("image.txt", b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, prescreen.BINARY_CONTENT),
+            ("nul.txt", b"Title\x00\x00\x00body", prescreen.BINARY_CONTENT),
+            ("wide.txt", "Report".encode("utf-16"), prescreen.UNSUPPORTED_ENCODING),
+            ("table.txt", b"1,2,3\n4,5,6\n" * 50, prescreen.LOW_TEXT_DENSITY),
+            ("greek.txt", "Αναφορά για την ανάλυση δεδομένων. ".encode() * 20, prescreen.NON_LATIN_SCRIPT),
+            ("scan.pdf", make_image_pdf(), prescreen.NO_TEXT_LAYER),
+        ],
+    )
+    def test_rejected_documents(self, filename, content, reason):
+        """Test that documents without extractable text get a reason code"""
+        assert PreScreen.screen(filename, content) == reason
+
+    def test_text_documents_pass(self):
+        """Test that ordinary text, including Latin-1 and accents, passes"""
+        text = "Annual Report by Jane Smith, published January 15, 2024. "
+        assert PreScreen.screen("report.txt", text.encode() * 10) is None
+        assert PreScreen.screen("notes.md", "Café résumé naïve".encode("latin-1")) is None
+        assert PreScreen.screen("report.pdf", make_pdf(["Annual Report"])) is None
+
+    def test_sample_may_end_mid_character(self):
+        """Test that cutting a multi-byte character at the sample edge is fine"""
+        content = ("Résumé " * 100).encode()
+        assert PreScreen.screen("cut.txt", content, sample_bytes=2) is None
+
+    def test_malformed_files_left_to_extraction(self):
+        """Test that broken files pass the screen and fail in extraction"""
+        assert PreScreen.screen("broken.docx", b"not a docx archive") is None
+        assert PreScreen.screen("broken.pdf", b"not a pdf") is None
+
+    def test_reads_files_from_disk(self, tmp_path):
+        """Test screening a spooled file instead of in-memory bytes"""
+        scan = tmp_path / "scan.pdf"
+        scan.write_bytes(make_image_pdf())
+        report = tmp_path / "report.pdf"
+        report.write_bytes(make_pdf(["Annual Report"]))
+
+        assert PreScreen.screen(scan.name, scan) == prescreen.NO_TEXT_LAYER
+        assert PreScreen.screen(report.name, report) is None
+
+    def test_skipped_documents_bypass_nlp(self, monkeypatch):
+        """Test that a skipped document never reaches the spaCy pipeline"""
+        from app.extraction.metadata_extractor import MetadataExtractor
+
+        extractor = MetadataExtractor()
+        monkeypatch.setattr(
+            MetadataExtractor, "extract_from_text", lambda *a, **k: pytest.fail("parsed")
+        )
+        results = extractor.extract_metadata_batch(
+            [("scan.pdf", make_image_pdf()), ("image.txt", b"\x89PNG\r\n\x1a\n")]
+        )
+        assert results == [
+            extractor.skipped_metadata(prescreen.NO_TEXT_LAYER),
+            extractor.skipped_metadata(prescreen.BINARY_CONTENT),
+        ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.results_sink import JsonlResultsSink
+
+
+def _write_from_process(path, worker, count):
+    sink = JsonlResultsSink(path, fsync="never", max_bytes=4096)
+    for i in range(count):
+        sink.write([{"file_hash": f"{worker}-{i}", "payload": "x" * 50}])
+    sink.close()
+
+
+class TestResultsSink:
+    def test_append_and_find_by_hash(self, tmp_path):
+        """Test that results are appended as JSON lines and found by hash"""
+        path = tmp_path / "results.jsonl"
+        sink = JsonlResultsSink(str(path), fsync="always")
+        sink.write([{"file_hash": "abc", "file_name": "a.txt"}])
+        sink.write([{"file_hash": "def", "file_name": "b.txt"}])
+        sink.write([{"file_hash": "abc", "file_name": "a-again.txt"}])
+        sink.flush()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[1])["file_name"] == "b.txt"
+
+        found = sink.find("abc")
+        assert [r["file_name"] for r in found] == ["a-again.txt", "a.txt"]
+        assert sink.find("missing") == []
+        sink.close()
+
+    def test_rotation_by_size(self, tmp_path):
+        """Test that the file rotates once it would exceed the size limit"""
+        path = tmp_path / "results.jsonl"
+        sink = JsonlResultsSink(str(path), fsync="never", max_bytes=200)
+        for i in range(10):
+            sink.write([{"file_hash": f"h{i}", "payload": "x" * 40}])
+            sink.flush()
+        sink.close()
+
+        rotated = list(tmp_path.glob("results.jsonl.*[0-9]"))
+        assert rotated
+        assert path.stat().st_size <= 200
+        assert sink.find("h0")[0]["file_hash"] == "h0"
+        assert sink.find("h9")[0]["file_hash"] == "h9"
+
+    def test_interval_policy_syncs_final_records(self, tmp_path, monkeypatch):
+        """Test that the last burst is fsynced when the writer goes idle and on close"""
+        import app.utils.results_sink as results_sink
+
+        calls = []
+        real_fsync = results_sink.os.fsync
+        monkeypatch.setattr(
+            results_sink.os, "fsync", lambda fd: calls.append(fd) or real_fsync(fd)
+        )
+        sink = JsonlResultsSink(str(tmp_path / "results.jsonl"), flush_interval=0.2)
+        sink.write([{"file_hash": "a"}])
+        sink.write([{"file_hash": "b"}])
+        sink.flush()
+        synced = len(calls)
+        assert synced >= 1
+
+        sink.write([{"file_hash": "c"}])
+        time.sleep(0.6)
+        assert len(calls) == synced + 1
+
+        sink.write([{"file_hash": "d"}])
+        sink.close()
+        assert len(calls) == synced + 2
+
+    def test_concurrent_processes_keep_lines_whole(self, tmp_path):
+        """Test that several worker processes can share one sink file"""
+        path = str(tmp_path / "results.jsonl")
+        workers = [
+            multiprocessing.Process(target=_write_from_process, args=(path, w, 100))
+            for w in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        records = []
+        for file in tmp_path.glob("results.jsonl*"):
+            if file.suffix == ".lock":
+                continue
+            records.extend(json.loads(line) for line in file.read_text().splitlines())
+        assert len(records) == 300
+        assert len({r["file_hash"] for r in records}) == 300
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
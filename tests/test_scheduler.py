@@ -0,0 +1,111 @@
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.executor import ExtractionExecutor, QueueFullError
+from app.utils.scheduler import BULK, FAST, LaneScheduler
+
+
+class TestScheduler:
+    def test_round_robin_across_clients(self):
+        """Test that one client's burst does not starve another client"""
+        executor = ExtractionExecutor(kind="thread", max_workers=1, max_queue=10)
+        gate = threading.Event()
+        order = []
+        try:
+            blocker = executor.submit(gate.wait, client="a")
+            futures = [
+                executor.submit(order.append, name, client=name[0])
+                for name in ("a1", "a2", "a3", "b1")
+            ]
+            assert executor.queue_depth == 4
+            gate.set()
+            blocker.result(timeout=5)
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            executor.shutdown()
+        assert order == ["a1", "b1", "a2", "a3"]
+
+    def test_queue_limit_and_cancellation(self):
+        """Test rejection beyond the queue and that cancelled jobs free their slot"""
+        executor = ExtractionExecutor(kind="thread", max_workers=1, max_queue=1)
+        gate = threading.Event()
+        try:
+            executor.submit(gate.wait)
+            waiting = executor.submit(lambda: "never")
+            with pytest.raises(QueueFullError):
+                executor.submit(lambda: "rejected")
+            assert waiting.cancel()
+            gate.set()
+            assert executor.submit(lambda: "ok").result(timeout=5) == "ok"
+        finally:
+            executor.shutdown()
+        assert executor.in_flight == 0
+        assert executor.stats()["rejected"] == 1
+
+    def test_blocking_submit_waits_for_a_slot(self):
+        """Test that a blocking submit waits for a free slot instead of raising"""
+        executor = ExtractionExecutor(kind="thread", max_workers=1, max_queue=0)
+        gate = threading.Event()
+        submitted = []
+        try:
+            executor.submit(gate.wait)
+            waiter = threading.Thread(
+                target=lambda: submitted.append(executor.submit(lambda: "ok", block=True))
+            )
+            waiter.start()
+            waiter.join(timeout=0.2)
+            assert waiter.is_alive() and not submitted
+            gate.set()
+            waiter.join(timeout=5)
+            assert submitted[0].result(timeout=5) == "ok"
+        finally:
+            executor.shutdown()
+        assert executor.stats()["rejected"] == 0
+
+    def test_wait_and_service_time_observed(self):
+        """Test that every job reports its queue wait and run time"""
+        observed = []
+        executor = ExtractionExecutor(
+            kind="thread",
+            max_workers=1,
+            observe=lambda kind, seconds: observed.append((kind, seconds)),
+        )
+        try:
+            executor.submit(lambda: 42).result(timeout=5)
+        finally:
+            executor.shutdown()
+        assert sorted(kind for kind, _ in observed) == ["service", "wait"]
+        assert all(seconds >= 0 for _, seconds in observed)
+        assert executor.stats()["completed"] == 1
+
+    def test_lanes_by_format_and_size(self):
+        """Test that small text goes to the fast lane and the rest to bulk"""
+        lanes = {FAST: ExtractionExecutor(), BULK: ExtractionExecutor()}
+        scheduler = LaneScheduler(lanes, fast_max_bytes=1024)
+        assert scheduler.classify("notes.md", 100) == FAST
+        assert scheduler.classify("NOTES.TXT", 1024) == FAST
+        assert scheduler.classify("big.txt", 1025) == BULK
+        assert scheduler.classify("small.pdf", 10) == BULK
+        assert scheduler.classify("small.docx", 10) == BULK
+        groups = scheduler.group([("a.md", 10), ("b.pdf", 10), ("c.txt", 10)])
+        assert groups == {FAST: [0, 2], BULK: [1]}
+        assert set(scheduler.stats()["lanes"]) == {FAST, BULK}
+
+    def test_bulk_files_spread_over_worker_count(self):
+        """Test that a lane's files take at most max_workers calls, balanced by size"""
+        lanes = {FAST: ExtractionExecutor(), BULK: ExtractionExecutor(max_workers=2)}
+        scheduler = LaneScheduler(lanes, fast_max_bytes=1024)
+        items = [(0, 100), (1, 10), (2, 60), (3, 50), (4, 5)]
+        assert scheduler.batches(BULK, items) == [[0, 1, 4], [2, 3]]
+        assert scheduler.batches(BULK, items[:1]) == [[0]]
+        assert scheduler.batches(FAST, items) == [[0, 1, 2, 3, 4]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])